@@ -1,4 +1,12 @@
 """Utility scripts and modules for visualizationg data and images related to Anchor."""
-from anchor_python_visualization import histogram_plot, visualize_features
+import importlib
+from types import ModuleType
 
 __all__ = ["histogram_plot", "visualize_features"]
+
+
+def __getattr__(name: str) -> ModuleType:
+    """Imports each script only when first accessed, so running one script never imports the other."""
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
@@ -1,16 +1,30 @@
 """Methods for loading embeddings and determining labels."""
+from anchor_python_visualization.embeddings._image_paths import (
+    PLACEHOLDER_FOR_SUBSTITUTION,
+)
 from anchor_python_visualization.embeddings.exceptions import InsufficientRowsException
 from anchor_python_visualization.embeddings.features import (
     COLUMN_NAME_IDENTIFIER,
-    PLACEHOLDER_FOR_SUBSTITUTION,
+    DEFAULT_ENGINE,
+    ENGINES,
     load_features,
 )
 from anchor_python_visualization.embeddings.label import LabelledFeatures
+from anchor_python_visualization.embeddings.sampling import (
+    DEFAULT_SAMPLING_STRATEGY,
+    SAMPLING_STRATEGIES,
+    Sampling,
+)
 
 __all__ = [
     "InsufficientRowsException",
     "COLUMN_NAME_IDENTIFIER",
+    "DEFAULT_ENGINE",
+    "ENGINES",
     "PLACEHOLDER_FOR_SUBSTITUTION",
     "load_features",
     "LabelledFeatures",
+    "DEFAULT_SAMPLING_STRATEGY",
+    "SAMPLING_STRATEGIES",
+    "Sampling",
 ]
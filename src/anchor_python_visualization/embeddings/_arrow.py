@@ -0,0 +1,56 @@
+"""Reads a CSV file with the multi-threaded parser of Apache Arrow, if the pyarrow package is installed."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+from typing import List, Optional
+
+import pandas as pd
+
+
+def read_csv_arrow(
+    file_path_to_csv: str, encoding: Optional[str], columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Reads a CSV file using all cores, so the columns have the same types as via :func:`pd.read_csv`.
+
+    Arrow infers dates and times, which pandas does not, so any such columns are instead read as
+    strings. Similarly, empty strings are treated as missing values, as pandas does.
+
+    Args:
+        file_path_to_csv: the path to the CSV file.
+        encoding: the encoding of the CSV file, or None for UTF-8.
+        columns: if set, only these columns are parsed, otherwise all columns.
+
+    Returns:
+        a data-frame with the columns, text and number, in the order they occur in the file.
+
+    Raises:
+        ImportError: if the pyarrow package is not installed.
+        ValueError: if Arrow cannot parse the file, e.g. when a value later in a column does not
+            match the type inferred from the first rows.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    read_options = csv.ReadOptions(encoding=encoding or "utf8", use_threads=True)
+
+    # Determine the types inferred from the first block, to read any temporal columns as strings
+    with csv.open_csv(file_path_to_csv, read_options=read_options) as reader:
+        column_types = {
+            field.name: pa.string()
+            for field in reader.schema
+            if pa.types.is_temporal(field.type)
+        }
+
+    table = csv.read_csv(
+        file_path_to_csv,
+        read_options=read_options,
+        convert_options=csv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True,
+            include_columns=columns,
+        ),
+    )
+    return table.to_pandas()
@@ -0,0 +1,211 @@
+"""Opens feature-values stored as a binary matrix (NumPy or HDF5), memory-mapped where possible."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import os
+import struct
+import zipfile
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ._table import ParsedTable, split_numeric_and_string
+
+EXTENSIONS_NUMPY = [".npy", ".npz"]
+"""Extensions (lower-case) of files with a matrix in the NumPy format, or an archive of such files."""
+
+EXTENSIONS_HDF5 = [".h5", ".hdf5"]
+"""Extensions (lower-case) of files with a matrix as a HDF5 dataset."""
+
+NAME_FEATURES: str = "features"
+"""The name of the matrix in a :code:`.npz` archive or HDF5 file, if there are several."""
+
+SUFFIX_SIDECAR: str = ".identifiers.csv"
+"""Replaces the extension of a binary file, to form the path of a CSV file with identifiers.
+
+e.g. :code:`features.identifiers.csv` for :code:`features.npy`.
+"""
+
+PREFIX_COLUMN_NAME: str = "feature"
+"""Prefixes the (zero-based) index of each column, to form its name."""
+
+_SIZE_LOCAL_FILE_HEADER: int = 30
+"""The size in bytes of the fixed part of a local file header in a zip archive."""
+
+_OFFSET_LENGTHS_LOCAL_FILE_HEADER: int = 26
+"""The offset in bytes, in a local file header, of the lengths of the file-name and extra field."""
+
+
+def is_binary(file_path: str) -> bool:
+    """Whether a file has an extension of a binary matrix, case-insensitive."""
+    extension = os.path.splitext(file_path)[1].casefold()
+    return extension in EXTENSIONS_NUMPY or extension in EXTENSIONS_HDF5
+
+
+def read_binary(file_path: str, encoding: Optional[str]) -> ParsedTable:
+    """Opens a binary matrix of feature-values, and the identifiers from a sidecar CSV file.
+
+    The format is selected by the extension of the file. The matrix is memory-mapped, without
+    copying, unless it is compressed or chunked, in which case it is read into memory.
+
+    * :code:`.npy` - a single matrix.
+    * :code:`.npz` - the matrix called :const:`NAME_FEATURES`, or otherwise the only matrix.
+    * :code:`.h5` or :code:`.hdf5` - the dataset called :const:`NAME_FEATURES`, or otherwise the only
+      dataset. This requires the h5py package.
+
+    Each column of the matrix is named :const:`PREFIX_COLUMN_NAME` followed by its index.
+
+    The sidecar CSV file (see :const:`SUFFIX_SIDECAR`) is optional and should have a row for each
+    row of the matrix. Identifiers are derived from its columns, as from the non-feature columns of a
+    CSV file.
+
+    Args:
+        file_path: the path to the binary file.
+        encoding: the encoding of the sidecar CSV file, or None to use the default.
+
+    Returns:
+        the parsed table, with the matrix as feature-values, and the columns of the sidecar as
+        candidates for identifiers.
+
+    Raises:
+        ImportError: if a HDF5 file is opened, but the h5py package is not installed.
+        ValueError: if the file does not contain a single two-dimensional matrix, or the sidecar has
+            a different number of rows.
+    """
+    extension = os.path.splitext(file_path)[1].casefold()
+    if extension == EXTENSIONS_NUMPY[0]:
+        matrix = np.load(file_path, mmap_mode="r")
+    elif extension == EXTENSIONS_NUMPY[1]:
+        matrix = _open_npz(file_path)
+    elif extension in EXTENSIONS_HDF5:
+        matrix = _open_hdf5(file_path)
+    else:
+        raise ValueError("Unknown extension for a binary matrix: {}".format(file_path))
+
+    if matrix.ndim != 2:
+        raise ValueError(
+            f"The matrix in {file_path} has {matrix.ndim} dimensions, but two are required."
+        )
+
+    features = pd.DataFrame(
+        matrix,
+        columns=[PREFIX_COLUMN_NAME + str(index) for index in range(matrix.shape[1])],
+        copy=False,
+    )
+    sidecar = _read_sidecar(file_path, encoding, matrix.shape[0])
+    return ParsedTable(features, sidecar.string_columns, sidecar.numeric_columns)
+
+
+def _open_npz(file_path: str) -> np.ndarray:
+    """Opens a matrix from a :code:`.npz` archive, memory-mapped if it is stored uncompressed."""
+    with zipfile.ZipFile(file_path) as archive:
+        member = _select_name(
+            [name for name in archive.namelist() if name.endswith(".npy")],
+            NAME_FEATURES + ".npy",
+            file_path,
+        )
+        info = archive.getinfo(member)
+        if info.compress_type == zipfile.ZIP_STORED:
+            return _memory_map_npz_member(file_path, info)
+
+    print(
+        "{} is compressed, so reading it into memory, rather than memory-mapping.".format(
+            file_path
+        )
+    )
+    with np.load(file_path) as archive:
+        return archive[member[: -len(".npy")]]
+
+
+def _memory_map_npz_member(file_path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    """Memory-maps an (uncompressed) NumPy array stored as a member of a zip archive."""
+    with open(file_path, "rb") as file:
+        # The local file header has variable-length fields, which may differ from the central directory
+        file.seek(info.header_offset + _OFFSET_LENGTHS_LOCAL_FILE_HEADER)
+        length_name, length_extra = struct.unpack("<HH", file.read(4))
+        file.seek(
+            info.header_offset + _SIZE_LOCAL_FILE_HEADER + length_name + length_extra
+        )
+
+        if np.lib.format.read_magic(file) == (1, 0):
+            header = np.lib.format.read_array_header_1_0(file)
+        else:
+            header = np.lib.format.read_array_header_2_0(file)
+        shape, fortran_order, dtype = header
+        offset = file.tell()
+
+    return np.memmap(
+        file_path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+def _open_hdf5(file_path: str) -> np.ndarray:
+    """Opens a matrix from a HDF5 file, memory-mapped if it is stored contiguously and uncompressed."""
+    import h5py
+
+    with h5py.File(file_path, "r") as file:
+        names = []
+        file.visititems(
+            lambda name, item: names.append(name)
+            if isinstance(item, h5py.Dataset)
+            else None
+        )
+        dataset = file[_select_name(names, NAME_FEATURES, file_path)]
+
+        offset = dataset.id.get_offset()
+        if (
+            offset is not None
+            and dataset.chunks is None
+            and dataset.compression is None
+        ):
+            return np.memmap(
+                file_path,
+                dtype=dataset.dtype,
+                mode="r",
+                offset=offset,
+                shape=dataset.shape,
+            )
+
+        print(
+            "{} is chunked or compressed, so reading it into memory, rather than memory-mapping.".format(
+                file_path
+            )
+        )
+        return dataset[()]
+
+
+def _select_name(names: List[str], preferred: str, file_path: str) -> str:
+    """Selects :code:`preferred` if it exists among several names, or otherwise the only name."""
+    if preferred in names:
+        return preferred
+    elif len(names) == 1:
+        return names[0]
+    else:
+        raise ValueError(
+            f"{file_path} must contain a single matrix, or one called '{preferred}', but contains: {names}"
+        )
+
+
+def _read_sidecar(
+    file_path: str, encoding: Optional[str], number_rows: int
+) -> ParsedTable:
+    """Reads the sidecar CSV file with identifiers, if it exists, otherwise a table without columns."""
+    path_sidecar = os.path.splitext(file_path)[0] + SUFFIX_SIDECAR
+    if not os.path.isfile(path_sidecar):
+        return split_numeric_and_string(pd.DataFrame(index=pd.RangeIndex(number_rows)))
+
+    sidecar = pd.read_csv(path_sidecar, index_col=None, header=0, encoding=encoding)
+    if len(sidecar) != number_rows:
+        raise ValueError(
+            f"{path_sidecar} has {len(sidecar)} rows, but the matrix in {file_path} has {number_rows} rows."
+        )
+    return split_numeric_and_string(sidecar)
@@ -0,0 +1,173 @@
+"""A persistent cache on the file-system of parsed feature-tables, to avoid parsing the same CSV again."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .label import FEATURE_DTYPE
+
+_FILENAME_FEATURES: str = "features.npy"
+"""The feature-values as a single matrix of type :const:`FEATURE_DTYPE`, which is memory-mapped when opened.
+
+As this is the type of :attr:`LabelledFeatures.values`, the memory-mapped matrix is used without
+copying.
+"""
+
+_FILENAME_IDENTIFIERS: str = "identifiers.pkl"
+"""The row-names (identifiers) of the feature-values."""
+
+_FILENAME_METADATA: str = "metadata.json"
+"""The key of the entry and the column-names of the feature-values."""
+
+_FILENAME_POSITIONS: str = "positions.npy"
+"""The position of each row in the original file(s), only if a sample of rows was retained."""
+
+_FILENAME_LABELS_TEMPLATE: str = "labels_{}.pkl"
+"""The labels derived for a particular :code:`max_label_index`."""
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheEntry:
+    """The cached feature-table for a particular file, in a directory of its own.
+
+    The entry is written entirely to a temporary directory and then renamed, so a partially written
+    entry is never read.
+    """
+
+    directory: str
+    """The directory where the files for this entry are (or will be) stored."""
+
+    key: Dict[str, Any]
+    """The properties of the file (and how it was read) that uniquely identify the entry."""
+
+    def exists(self) -> bool:
+        """Whether the feature-values have already been stored in the cache."""
+        return os.path.isdir(self.directory)
+
+    def load_features(self) -> pd.DataFrame:
+        """Opens the cached feature-values, memory-mapped, without copying.
+
+        Returns:
+            a data-frame with identifiers as row-names, backed by a read-only memory-mapped matrix.
+        """
+        with open(self._resolved_path(_FILENAME_METADATA), encoding="utf-8") as file:
+            metadata = json.load(file)
+
+        return pd.DataFrame(
+            np.load(self._resolved_path(_FILENAME_FEATURES), mmap_mode="r"),
+            columns=metadata["columns"],
+            index=pd.read_pickle(self._resolved_path(_FILENAME_IDENTIFIERS)),
+            copy=False,
+        )
+
+    def store_features(
+        self, features: pd.DataFrame, positions: Optional[np.ndarray] = None
+    ) -> None:
+        """Stores the feature-values in the cache.
+
+        The columns are stored together as a single matrix, converted to :const:`FEATURE_DTYPE`.
+
+        Args:
+            features: the feature-values, with identifiers as row-names.
+            positions: the position of each row in the original file(s), if only a sample of rows
+                was retained.
+        """
+        parent = os.path.dirname(self.directory)
+        os.makedirs(parent, exist_ok=True)
+        temporary = tempfile.mkdtemp(dir=parent)
+        try:
+            np.save(
+                os.path.join(temporary, _FILENAME_FEATURES),
+                np.ascontiguousarray(features.to_numpy(), dtype=FEATURE_DTYPE),
+            )
+            pd.to_pickle(features.index, os.path.join(temporary, _FILENAME_IDENTIFIERS))
+            if positions is not None:
+                np.save(os.path.join(temporary, _FILENAME_POSITIONS), positions)
+            with open(
+                os.path.join(temporary, _FILENAME_METADATA), "w", encoding="utf-8"
+            ) as file:
+                json.dump(
+                    {"key": self.key, "columns": [str(c) for c in features.columns]},
+                    file,
+                )
+            os.rename(temporary, self.directory)
+        except OSError:
+            # Another process may have stored the same entry concurrently
+            shutil.rmtree(temporary, ignore_errors=True)
+            if not self.exists():
+                raise
+
+    def load_positions(self) -> Optional[np.ndarray]:
+        """Loads the cached position of each row in the original file(s), if they exist."""
+        path = self._resolved_path(_FILENAME_POSITIONS)
+        if os.path.isfile(path):
+            return np.load(path)
+        else:
+            return None
+
+    def load_labels(self, max_label_index: int) -> Optional[pd.Series]:
+        """Loads cached labels derived with a particular :code:`max_label_index`, if they exist."""
+        path = self._resolved_path(_FILENAME_LABELS_TEMPLATE.format(max_label_index))
+        if os.path.isfile(path):
+            return pd.read_pickle(path)
+        else:
+            return None
+
+    def store_labels(self, labels: pd.Series, max_label_index: int) -> None:
+        """Stores labels derived with a particular :code:`max_label_index` in the cache."""
+        path = self._resolved_path(_FILENAME_LABELS_TEMPLATE.format(max_label_index))
+        # Write to a temporary file and rename, so partially written labels are never read
+        temporary = path + ".tmp{}".format(os.getpid())
+        pd.to_pickle(labels, temporary)
+        os.replace(temporary, path)
+
+    def _resolved_path(self, filename: str) -> str:
+        """Resolves a filename to the directory of the entry."""
+        return os.path.join(self.directory, filename)
+
+
+def cache_entry_for(
+    cache_directory: str, file_paths: List[str], **options: Any
+) -> CacheEntry:
+    """Determines the cache-entry for particular file(s).
+
+    The entry is keyed by the absolute path, size and modification time of each file, as well as any
+    options that change how they are read.
+
+    Args:
+        cache_directory: the directory where all cache-entries are stored.
+        file_paths: the paths to the files that are read (e.g. shards), in order.
+        options: any further options that change how the files are read (e.g. the encoding).
+
+    Returns:
+        the entry, which may or may not already exist.
+    """
+    key = {
+        "files": [_describe_file(path) for path in file_paths],
+        "dtype": np.dtype(FEATURE_DTYPE).name,
+        **options,
+    }
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8"))
+    return CacheEntry(os.path.join(cache_directory, digest.hexdigest()), key)
+
+
+def _describe_file(file_path: str) -> Dict[str, Any]:
+    """The absolute path, size and modification time of a file."""
+    status = os.stat(file_path)
+    return {
+        "path": os.path.abspath(file_path),
+        "size": status.st_size,
+        "mtime": status.st_mtime_ns,
+    }
@@ -0,0 +1,179 @@
+"""Streams a CSV file in chunks into a single preallocated array of reduced precision."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ._columns import SelectedColumns
+from ._table import ParsedTable
+
+FEATURE_DTYPE = np.float32
+"""The type the feature-values are converted to, as they are read."""
+
+_BLOCK_SIZE_COUNT: int = 1 << 24
+"""The number of bytes read at a time, when counting line-breaks."""
+
+
+def read_csv_chunked(
+    file_path_to_csv: str,
+    encoding: Optional[str],
+    chunk_size: int,
+    columns: SelectedColumns,
+) -> ParsedTable:
+    """Reads a CSV file in chunks, filling the feature-values into a single preallocated array.
+
+    Which columns are numeric is determined once, beforehand, in :code:`columns`. Numeric columns
+    are converted to :const:`FEATURE_DTYPE` as each chunk is read, and only the left-most string
+    and numeric columns are otherwise retained (as candidates for identifiers).
+
+    Args:
+        file_path_to_csv: the path to the CSV file.
+        encoding: the encoding of the CSV file, or None to use the default.
+        chunk_size: the maximum number of rows to parse at a time.
+        columns: the columns to parse, as determined from the first rows.
+
+    Returns:
+        the parsed table, with feature-values of type :const:`FEATURE_DTYPE`.
+
+    Raises:
+        ValueError: if a column that is numeric in the first rows, contains non-numeric values later.
+    """
+    numeric_names = columns.features
+    string_name = columns.string_identifier
+    numeric_identifier_name = columns.numeric_identifier
+
+    matrix = np.empty(
+        (_upper_bound_number_rows(file_path_to_csv), len(numeric_names)),
+        dtype=FEATURE_DTYPE,
+    )
+    string_chunks: List[pd.Series] = []
+    numeric_chunks: List[pd.Series] = []
+    number_rows = 0
+    for chunk in read_chunks(file_path_to_csv, encoding, chunk_size, columns):
+        end = number_rows + len(chunk)
+        if end > len(matrix):
+            matrix = _grow(matrix, number_rows, end)
+
+        matrix[number_rows:end] = chunk[numeric_names].to_numpy(dtype=FEATURE_DTYPE)
+
+        if string_name is not None:
+            string_chunks.append(chunk[string_name])
+        if numeric_identifier_name is not None:
+            numeric_chunks.append(chunk[numeric_identifier_name])
+
+        number_rows = end
+
+    _trim(matrix, number_rows)
+    return ParsedTable(
+        pd.DataFrame(matrix, columns=numeric_names, copy=False),
+        _combine_chunks(string_chunks, number_rows),
+        _combine_chunks(numeric_chunks, number_rows),
+    )
+
+
+def read_chunks(
+    file_path_to_csv: str,
+    encoding: Optional[str],
+    chunk_size: int,
+    columns: SelectedColumns,
+) -> Iterator[pd.DataFrame]:
+    """Reads successive chunks of a CSV file, with numeric columns already of :const:`FEATURE_DTYPE`.
+
+    Only the feature-values and identifier candidates in :code:`columns` are parsed. The left-most
+    numeric column keeps its inferred type, as it may be used for identifiers.
+
+    Args:
+        file_path_to_csv: the path to the CSV file.
+        encoding: the encoding of the CSV file, or None to use the default.
+        chunk_size: the maximum number of rows to parse at a time.
+        columns: the columns to parse, as determined from the first rows.
+
+    Yields:
+        a data-frame for each chunk, in order.
+
+    Raises:
+        ValueError: if a column that is numeric in the first rows, contains non-numeric values later.
+    """
+    numeric_identifier_name = columns.numeric_identifier
+    dtypes = {
+        name: FEATURE_DTYPE
+        for name in columns.features
+        if name != numeric_identifier_name
+    }
+    if columns.string_identifier is not None:
+        dtypes[columns.string_identifier] = str
+
+    try:
+        yield from pd.read_csv(
+            file_path_to_csv,
+            index_col=None,
+            header=0,
+            encoding=encoding,
+            usecols=columns.names_to_read(include_uncertain=False),
+            dtype=dtypes,
+            chunksize=chunk_size,
+        )
+    except ValueError as error:
+        raise ValueError(
+            f"A column that is numeric in the first rows of {file_path_to_csv}"
+            " contains non-numeric values, so it cannot be read in chunks."
+        ) from error
+
+
+def _combine_chunks(chunks: List[pd.Series], number_rows: int) -> pd.DataFrame:
+    """Combines a column read in successive chunks into a data-frame.
+
+    If there are no chunks, a data-frame with no columns, but :code:`number_rows` rows is returned.
+    """
+    if chunks:
+        return pd.concat(chunks, ignore_index=True).to_frame()
+    else:
+        return pd.DataFrame(index=pd.RangeIndex(number_rows))
+
+
+def _upper_bound_number_rows(file_path: str) -> int:
+    """An upper-bound on the number of rows (excluding the header) from counting line-breaks.
+
+    This is only an upper-bound, as blank lines and line-breaks inside quoted values are also
+    counted.
+    """
+    count = 0
+    last_byte = b"\n"
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(_BLOCK_SIZE_COUNT), b""):
+            count += block.count(b"\n")
+            last_byte = block[-1:]
+
+    if last_byte != b"\n":
+        # The final line has no trailing line-break
+        count += 1
+
+    return max(count - 1, 0)
+
+
+def _grow(matrix: np.ndarray, number_rows_filled: int, minimum_rows: int) -> np.ndarray:
+    """Reallocates a larger matrix, copying the rows already filled.
+
+    This only occurs if the line-breaks in a file were not recognised when counting rows.
+    """
+    grown = np.empty(
+        (max(minimum_rows, 2 * len(matrix)), matrix.shape[1]), dtype=matrix.dtype
+    )
+    grown[:number_rows_filled] = matrix[:number_rows_filled]
+    return grown
+
+
+def _trim(matrix: np.ndarray, number_rows: int) -> None:
+    """Shrinks a matrix, in place, to the rows that were filled.
+
+    Unlike slicing, this releases the memory for any rows beyond those filled, when the number of
+    rows was overestimated. No views of the matrix may exist.
+    """
+    if len(matrix) != number_rows:
+        matrix.resize((number_rows, matrix.shape[1]), refcheck=False)
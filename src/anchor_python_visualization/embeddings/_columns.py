@@ -0,0 +1,130 @@
+"""Selects which columns to parse from a CSV file, by sniffing its header and first rows."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+import fnmatch
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+NUMBER_ROWS_SNIFF: int = 1000
+"""How many rows are read initially to determine which columns are numeric."""
+
+
+@dataclasses.dataclass(frozen=True)
+class SelectedColumns:
+    """The columns to parse from a CSV file, so that free-text columns are skipped."""
+
+    all_names: List[str]
+    """The names of all columns in the file, in the order they occur."""
+
+    features: List[str]
+    """Numeric columns to use as feature-values, in the order they occur."""
+
+    string_identifier: Optional[str]
+    """The left-most string column, which is a candidate for identifiers, if it exists."""
+
+    numeric_identifier: Optional[str]
+    """The left-most numeric column, which is a candidate for identifiers, if it exists."""
+
+    uncertain: List[str]
+    """Non-numeric columns to the left of :attr:`string_identifier` that are not (yet) strings.
+
+    e.g. boolean or empty columns, which may contain strings only in later rows.
+    """
+
+    def names_to_read(self, include_uncertain: bool = True) -> List[str]:
+        """The names of the columns to parse, in the order they occur.
+
+        Args:
+            include_uncertain: whether to also parse :attr:`uncertain` columns. This guarantees the
+                left-most string column is identical to when all columns are parsed.
+
+        Returns:
+            the names of the features and identifier candidates, and (optionally) uncertain columns.
+        """
+        selected = set(self.features)
+        selected.update(
+            name
+            for name in (self.string_identifier, self.numeric_identifier)
+            if name is not None
+        )
+        if include_uncertain:
+            selected.update(self.uncertain)
+        return [name for name in self.all_names if name in selected]
+
+
+def select_columns(
+    file_path_to_csv: str,
+    encoding: Optional[str],
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> SelectedColumns:
+    """Selects the columns to parse from the first :const:`NUMBER_ROWS_SNIFF` rows of a CSV file.
+
+    The identifier candidates are selected from all columns, irrespective of :code:`include` and
+    :code:`exclude`, so excluding a column from the feature-values does not change the identifiers.
+
+    Args:
+        file_path_to_csv: the path to the CSV file.
+        encoding: the encoding of the CSV file, or None to use the default.
+        include: if set, only numeric columns whose name matches at least one of these wildcard
+            patterns (e.g. :code:`intensity.*`) are used as feature-values.
+        exclude: if set, numeric columns whose name matches any of these wildcard patterns are not
+            used as feature-values.
+
+    Returns:
+        the selected columns.
+    """
+    sniffed = pd.read_csv(
+        file_path_to_csv,
+        index_col=None,
+        header=0,
+        encoding=encoding,
+        nrows=NUMBER_ROWS_SNIFF,
+    )
+    numeric = list(sniffed.select_dtypes(include=np.number).columns)
+    strings = list(sniffed.select_dtypes(include=["object"]).columns)
+
+    string_identifier = strings[0] if strings else None
+    all_names = list(sniffed.columns)
+    return SelectedColumns(
+        all_names,
+        [name for name in numeric if _is_selected(name, include, exclude)],
+        string_identifier,
+        numeric[0] if numeric else None,
+        _uncertain_columns(all_names, numeric, string_identifier),
+    )
+
+
+def _is_selected(
+    name: str, include: Optional[Sequence[str]], exclude: Optional[Sequence[str]]
+) -> bool:
+    """Whether a column-name matches any include pattern (if set) and no exclude pattern (if set)."""
+    if include and not _matches_any(name, include):
+        return False
+    return not (exclude and _matches_any(name, exclude))
+
+
+def _matches_any(name: str, patterns: Sequence[str]) -> bool:
+    """Whether a column-name matches at least one wildcard pattern, case-sensitive."""
+    return any(fnmatch.fnmatchcase(str(name), pattern) for pattern in patterns)
+
+
+def _uncertain_columns(
+    all_names: List[str], numeric: List[str], string_identifier: Optional[str]
+) -> List[str]:
+    """Non-numeric columns to the left of :code:`string_identifier` (or all, if it is None)."""
+    numeric_set = set(numeric)
+    uncertain = []
+    for name in all_names:
+        if name == string_identifier:
+            break
+        if name not in numeric_set:
+            uncertain.append(name)
+    return uncertain
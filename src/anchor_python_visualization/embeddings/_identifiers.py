@@ -1,16 +1,21 @@
 """Selects or create unique identifiers for the data-frame."""
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
 
 def select_or_create_identifiers(
-    string_columns: pd.DataFrame, numeric_columns: pd.DataFrame
+    string_columns: pd.DataFrame,
+    numeric_columns: pd.DataFrame,
+    positions: Optional[np.ndarray] = None,
 ) -> pd.Series:
     """Determines unique identifiers for the data-frame.
 
     Several approaches are tried, in the following order of priority:
     - The left-most string column (if each value is unique)
     - The left-most numeric column (if each value is unique)
-    - A range of numbers from 0..number(rows)
+    - A range of numbers from 0..number(rows), or :code:`positions` if set.
 
     Selects the first (left-most) string column as the identifiers or otherwise creates a range of
     numbers.
@@ -20,6 +25,8 @@ def select_or_create_identifiers(
     Args:
         string_columns: columns that contain strings, as a data-frame.
         numeric_columns: columns that contain numeric-values, as a data-frame.
+        positions: if set, the position of each row in the original file, to use instead of a range
+            of numbers (e.g. when only a sample of the rows is retained).
 
     Returns:
         a data-frame with one column, which are unique (string) identifiers.
@@ -29,6 +36,8 @@ def select_or_create_identifiers(
     elif _is_first_column_unique(numeric_columns):
         return numeric_columns.iloc[:, 0].astype(str)
     else:
+        if positions is not None:
+            return pd.Series(positions).astype(str)
         number_rows = max(len(string_columns), len(numeric_columns))
         return _create_numeric_sequence(number_rows)
 
@@ -0,0 +1,125 @@
+"""Derives paths to an image for each row of embeddings, from a directory or a template."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import os
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+PLACEHOLDER_FOR_SUBSTITUTION: str = "<IMAGE>"
+"""Optional placeholder used in image_dir argument."""
+
+_SEPARATOR = re.escape(os.sep)
+"""The directory-separator of the execution environment, escaped for a regular expression."""
+
+_PATTERN_NOT_NORMALIZED: str = r"^$|{0}{0}|(?:^|{0})\.\.?(?:{0}|$)|{0}$".format(
+    _SEPARATOR
+)
+"""Matches paths that :func:`os.path.normpath` would change, after alternative separators are replaced.
+
+i.e. empty paths, or with redundant separators, or with :code:`.` or :code:`..` components.
+"""
+
+_PATTERN_NOT_RELATIVE: str = "^[{}]{}".format(
+    re.escape(os.sep + (os.altsep or "")), "|^[a-zA-Z]:" if os.name == "nt" else ""
+)
+"""Matches paths that :func:`os.path.join` does not simply append to a directory.
+
+i.e. absolute paths, or (on Windows) paths with a drive.
+"""
+
+
+def maybe_image_paths(
+    identifiers: pd.Index,
+    image_directory_path: Optional[str],
+    image_directory_sequence: Optional[str],
+    positions: Optional[np.ndarray] = None,
+) -> Optional[pd.Series]:
+    """Maybe creates a series of image-paths derived from the identifiers.
+
+    No paths are created if image_directory_path is None, and instead None is returned.
+
+    The paths for all rows are derived together, with the directory or template prepared only once.
+
+    Args:
+      identifiers: the identifiers of the rows the images refer to.
+      image_directory_path: iff present, the identifier (a relative path) for each feature row is
+        appended/substituted to form a complete path to an image.
+      image_directory_sequence: iff present, a six-digit integer sequence for each feature row is
+        appended/substituted to form a complete path to an image.
+      positions: if set, the position of each row in the original file, used for the integer
+        sequence instead of the order of the identifiers (e.g. when only a sample of rows is retained).
+
+    Returns:
+        a series with an identical number of rows in identical order, or None.
+    """
+    # If neither image_dir argument is set exit
+    if (image_directory_path is None) and (image_directory_sequence is None):
+        return None
+
+    # If image_dir_path is set, form complete image-paths for each feature-row by using the path
+    # (the identifier) to join or substitute
+    if image_directory_path:
+        return _join_or_substitute_all(image_directory_path, identifiers.to_series())
+
+    # If image_dir_sequence is set, form complete image-paths for each feature-row using a six digit
+    # sequence to join or substitute
+    if image_directory_sequence:
+        if positions is None:
+            positions = np.arange(len(identifiers))
+        sequence = pd.Series(positions).astype(str).str.zfill(6)
+        return _join_or_substitute_all(image_directory_sequence, sequence)
+
+
+def _join_or_substitute_all(image_directory: str, paths: pd.Series) -> pd.Series:
+    """Derives paths to images by either joining each path to a directory or substituting it.
+
+    The substitution occurs if the directory contains a sub-string :const:`PLACEHOLDER_FOR_SUBSTITUTION`,
+    in which case both the directory and paths are normed so that directory-separators match the
+    execution environment.
+
+    The template is split at :const:`PLACEHOLDER_FOR_SUBSTITUTION` (or the directory is completed
+    with a separator) only once. Each path is then concatenated with the parts. Only paths that
+    would be changed by normalization (or that are absolute when joining) are derived individually.
+
+    Args:
+        image_directory: either the absolute path to a directory OR a such a path with a placeholder
+            :code:`PLACEHOLDER_FOR_SUBSTITUTION` which can be substituted.
+        paths: the relative-paths to images.
+
+    Returns:
+        the derived paths, with identical index to :code:`paths`.
+    """
+    paths = paths.astype(str)
+    if PLACEHOLDER_FOR_SUBSTITUTION in image_directory:
+        before, after = os.path.normpath(image_directory).split(
+            PLACEHOLDER_FOR_SUBSTITUTION, 1
+        )
+        return before + _normalize_all(paths) + after
+    else:
+        joined = os.path.join(image_directory, "") + paths
+        not_relative = paths.str.contains(_PATTERN_NOT_RELATIVE)
+        if not_relative.any():
+            joined[not_relative] = paths[not_relative].map(
+                lambda path: os.path.join(image_directory, path)
+            )
+        return joined
+
+
+def _normalize_all(paths: pd.Series) -> pd.Series:
+    """Applies :func:`os.path.normpath` to each path, but only individually where it changes the path."""
+    if os.altsep:
+        normalized = paths.str.replace(os.altsep, os.sep, regex=False)
+    else:
+        normalized = paths.copy()
+
+    not_normalized = normalized.str.contains(_PATTERN_NOT_NORMALIZED)
+    if not_normalized.any():
+        normalized[not_normalized] = paths[not_normalized].map(os.path.normpath)
+    return normalized
@@ -5,47 +5,96 @@ __copyright__ = "Copyright (C) 2021 Owen Feehan"
 __license__ = "MIT"
 __version__ = "0.1"
 
-from typing import Iterable, List
+import re
+
+import numpy as np
+import pandas as pd
 
 
 def labels_from_identifiers(
-    identifiers: Iterable[str], max_label_index: int
-) -> Iterable[str]:
+    identifiers: pd.Index, max_label_index: int
+) -> pd.Categorical:
     """Derives labels from identifiers, by splitting by directory separators.
 
+    Each identifier is split into groups by slash (forward or backward), and the label joins
+    (with a forward slash) either the first :code:`max_label_index` groups (if positive), or all
+    groups except the last :code:`-max_label_index` (if negative).
+
+    The labels are derived for all identifiers at once, with the compute functions of Apache Arrow if
+    the pyarrow package is installed, or otherwise with pandas' string operations.
+
     Args:
         identifiers: the identifiers.
         max_label_index: maximum amount of groups to in include in label leftwards (if positive), or
         to exclude rightwards (if negative).
 
     Returns:
-        the labels, respectively corresponding to each identifier.
+        the labels, respectively corresponding to each identifier, with categories sorted
+        alphabetically.
     """
-
-    def extract_groups(identifier: str):
-        return _extract_label_from_groups(
-            _split_names_into_groups(identifier), max_label_index
+    if max_label_index == 0:
+        return pd.Categorical.from_codes(
+            np.zeros(len(identifiers), dtype=np.int8), categories=[""]
         )
 
-    return map(extract_groups, identifiers)
+    try:
+        return _labels_arrow(identifiers, max_label_index)
+    except ImportError:
+        return pd.Categorical(_labels_pandas(identifiers, max_label_index))
 
 
-def _extract_label_from_groups(groups: List[str], max_label_index: int) -> str:
-    """Derives a label from the groups
+def _labels_arrow(identifiers: pd.Index, max_label_index: int) -> pd.Categorical:
+    """Derives labels using the compute functions of Apache Arrow.
 
-    Args:
-        groups: the groups an identifier is divided into.
-        max_label_index: after splitting the identifier into groups, if positive, this is the
-            maximum amount of groups to in include in the label from the left-side, or if negative,
-            how many groups to exclude from the right-side.
-
-    Returns:
-      the label.
+    Raises:
+        ImportError: if the pyarrow package is not installed.
     """
-    return "/".join(groups[0:max_label_index])
+    import pyarrow as pa
+    import pyarrow.compute as pc
 
+    names = pa.array(identifiers, type=pa.string())
+    if isinstance(names, pa.ChunkedArray):
+        # Identifiers backed by Arrow may be split into several chunks (e.g. when read in chunks)
+        names = names.combine_chunks()
+    names = pc.replace_substring(names, "\\", "/")
 
-def _split_names_into_groups(name: str) -> List[str]:
-    """Tokenizes a string by slash, either forward or backward."""
-    name = name.replace("\\", "/")
-    return name.split("/")
+    if max_label_index > 0:
+        groups = pc.split_pattern(names, "/", max_splits=max_label_index)
+        labels = pc.binary_join(pc.list_slice(groups, 0, max_label_index), "/")
+    else:
+        number_excluded = -max_label_index
+        # The first element is everything before the last number_excluded groups, if they exist
+        groups = pc.split_pattern(names, "/", max_splits=number_excluded, reverse=True)
+        labels = pc.if_else(
+            pc.equal(pc.list_value_length(groups), number_excluded + 1),
+            pc.list_element(groups, 0),
+            "",
+        )
+
+    encoded = labels.dictionary_encode()
+
+    # Sort the categories, so they are identical to when derived with pandas
+    order = pc.array_sort_indices(encoded.dictionary).to_numpy()
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return pd.Categorical.from_codes(
+        rank[encoded.indices.to_numpy(zero_copy_only=False)],
+        categories=encoded.dictionary.take(pa.array(order)).to_pylist(),
+    )
+
+
+def _labels_pandas(identifiers: pd.Index, max_label_index: int) -> pd.Series:
+    """Derives labels using pandas' string operations, via regular expressions."""
+    names = pd.Series(identifiers, dtype=object).str.replace("\\", "/", regex=False)
+
+    if max_label_index > 0:
+        # Up to max_label_index groups from the left
+        return names.str.extract(
+            r"^((?:[^/]*/){0,%d}[^/]*)" % (max_label_index - 1), expand=False
+        )
+    else:
+        # Reversed, so the excluded groups are matched from the left, which is much faster
+        reversed_labels = names.str[::-1].str.extract(
+            r"^(?:[^/]*/){%d}(.*)$" % -max_label_index, flags=re.DOTALL, expand=False
+        )
+        return reversed_labels.fillna("").str[::-1]
@@ -0,0 +1,166 @@
+"""Retains a uniform random sample of rows while a CSV file streams in, without reading it entirely."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ._chunked import FEATURE_DTYPE, read_chunks
+from ._columns import SelectedColumns
+from ._table import ParsedTable, SampledRows
+from .sampling import Sampling
+
+
+def read_csv_reservoir(
+    file_path_to_csv: str,
+    encoding: Optional[str],
+    chunk_size: int,
+    columns: SelectedColumns,
+    sample_size: int,
+    sampling: Sampling,
+    shard_index: int = 0,
+) -> ParsedTable:
+    """Reads a CSV file in chunks, retaining only a uniform random sample of its rows.
+
+    Each row is assigned a uniformly-distributed random key, and the :code:`sample_size` rows with the
+    smallest keys are retained (a *bottom-k* reservoir). So at most :code:`sample_size + chunk_size`
+    rows are held in memory at any time. As the keys are drawn in order of row, the sample does not
+    depend on :code:`chunk_size`.
+
+    Args:
+        file_path_to_csv: the path to the CSV file.
+        encoding: the encoding of the CSV file, or None to use the default.
+        chunk_size: the maximum number of rows to parse at a time.
+        columns: the columns to parse, as determined from the first rows.
+        sample_size: the maximum number of rows to retain.
+        sampling: the seed (if any) for the random keys. The strategy is ignored, as the labels are
+            not yet known.
+        shard_index: the position of the file among several files (shards) that are sampled
+            together, so each has independent random keys.
+
+    Returns:
+        the retained rows, in the order they occur in the file, with feature-values of type
+        :const:`FEATURE_DTYPE`.
+
+    Raises:
+        ValueError: if a column that is numeric in the first rows, contains non-numeric values later.
+    """
+    numeric_names = columns.features
+    identifier_names = [
+        name
+        for name in (columns.string_identifier, columns.numeric_identifier)
+        if name is not None
+    ]
+
+    generator = _generator_for(shard_index, sampling)
+
+    # The retained rows occupy the start of the matrix, followed by the rows of the current chunk
+    matrix = np.empty((sample_size + chunk_size, len(numeric_names)), FEATURE_DTYPE)
+    identifiers = pd.DataFrame(columns=identifier_names)
+    keys = np.empty(0)
+    positions = np.empty(0, dtype=np.int64)
+
+    number_rows_read = 0
+    for chunk in read_chunks(file_path_to_csv, encoding, chunk_size, columns):
+        number_retained = len(keys)
+        end = number_retained + len(chunk)
+        matrix[number_retained:end] = chunk[numeric_names].to_numpy(FEATURE_DTYPE)
+
+        identifiers = _concatenate_rows(identifiers, chunk[identifier_names])
+        keys = np.concatenate((keys, generator.random(len(chunk))))
+        positions = np.concatenate(
+            (positions, np.arange(number_rows_read, number_rows_read + len(chunk)))
+        )
+        number_rows_read += len(chunk)
+
+        if end > sample_size:
+            retained = np.argpartition(keys, sample_size)[:sample_size]
+            matrix[:sample_size] = matrix[retained]
+            identifiers = identifiers.iloc[retained].reset_index(drop=True)
+            keys = keys[retained]
+            positions = positions[retained]
+
+    # Restore the order of rows in the file
+    order = np.argsort(positions)
+    identifiers = identifiers.iloc[order].reset_index(drop=True)
+    return ParsedTable(
+        pd.DataFrame(matrix[: len(keys)][order], columns=numeric_names, copy=False),
+        _select_column(identifiers, columns.string_identifier),
+        _select_column(identifiers, columns.numeric_identifier),
+        SampledRows(positions[order], keys[order], number_rows_read),
+    )
+
+
+def sample_rows(
+    table: ParsedTable, shard_index: int, sample_size: int, sampling: Sampling
+) -> ParsedTable:
+    """Retains a uniform random sample of rows from a table that was read entirely (e.g. memory-mapped).
+
+    The rows are selected with random keys, as in :func:`read_csv_reservoir`, so that samples of
+    several files can be combined with :func:`retain_smallest_keys`.
+
+    Args:
+        table: the table to sample rows from.
+        shard_index: the position of the file the table was read from, among several files
+            (shards) that are sampled together.
+        sample_size: the maximum number of rows to retain.
+        sampling: the seed (if any) for the random keys.
+
+    Returns:
+        the retained rows, in their existing order.
+    """
+    number_rows = len(table.features)
+    keys = _generator_for(shard_index, sampling).random(number_rows)
+    if number_rows > sample_size:
+        retained = np.argpartition(keys, sample_size)[:sample_size]
+        retained.sort()
+    else:
+        retained = np.arange(number_rows)
+    return dataclasses.replace(
+        table.subset(retained),
+        sampled=SampledRows(retained, keys[retained], number_rows),
+    )
+
+
+def retain_smallest_keys(table: ParsedTable, sample_size: int) -> ParsedTable:
+    """Retains only the :code:`sample_size` sampled rows with the smallest keys, in their existing order.
+
+    This combines the samples from several files (each retained with :func:`read_csv_reservoir`)
+    into a uniform sample of all their rows.
+    """
+    if table.sampled is None or len(table.sampled.keys) <= sample_size:
+        return table
+
+    retained = np.argpartition(table.sampled.keys, sample_size)[:sample_size]
+    retained.sort()
+    return table.subset(retained)
+
+
+def _generator_for(shard_index: int, sampling: Sampling) -> np.random.Generator:
+    """A generator of random keys for a particular file (shard), independent of other files.
+
+    It is derived from the position of the file among the (sorted) shards, rather than its name, as
+    files in different directories may have identical names.
+    """
+    return sampling.generator(shard_index)
+
+
+def _concatenate_rows(first: pd.DataFrame, second: pd.DataFrame) -> pd.DataFrame:
+    """Concatenates the rows of two data-frames (with identical columns), discarding row names."""
+    if len(first) == 0:
+        return second.reset_index(drop=True)
+    return pd.concat([first, second], ignore_index=True)
+
+
+def _select_column(data_frame: pd.DataFrame, name: Optional[str]) -> pd.DataFrame:
+    """A data-frame with only a particular column, or no columns if :code:`name` is None."""
+    if name is not None:
+        return data_frame[[name]]
+    else:
+        return pd.DataFrame(index=data_frame.index)
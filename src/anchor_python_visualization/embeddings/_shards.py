@@ -0,0 +1,74 @@
+"""Reads feature-tables that are split across several files (shards), in parallel."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import concurrent.futures
+import glob
+import os
+from typing import Callable, List, Optional
+
+from ._table import ParsedTable, concatenate_tables
+
+EXTENSION_SHARDS: str = ".csv"
+"""The extension of the files that are read as shards, when a directory is specified."""
+
+
+def resolve_shard_paths(path: str) -> List[str]:
+    """Resolves a path to one or more files, each of which is a shard of a feature-table.
+
+    Args:
+        path: either a path to a single file, a directory (with shards as files with extension
+            :const:`EXTENSION_SHARDS`) or a wildcard pattern (e.g. :code:`D:/shards/part_*.csv`).
+            An existing file is never treated as a pattern, even if its name contains wildcard
+            characters (e.g. :code:`features[1].csv`).
+
+    Returns:
+        the paths to the shards, sorted alphabetically, so that rows are ordered consistently.
+
+    Raises:
+        FileNotFoundError: if no shards are found in a directory, or matching a pattern.
+    """
+    if os.path.isfile(path):
+        return [path]
+    elif os.path.isdir(path):
+        paths = glob.glob(os.path.join(glob.escape(path), "*" + EXTENSION_SHARDS))
+    elif any(character in path for character in "*?["):
+        paths = glob.glob(path, recursive=True)
+    else:
+        return [path]
+
+    paths = sorted(path for path in paths if os.path.isfile(path))
+    if not paths:
+        raise FileNotFoundError(
+            "No shards of a feature-table found at: {}".format(path)
+        )
+    return paths
+
+
+def read_shards(
+    file_paths: List[str],
+    read_shard: Callable[[int, str], ParsedTable],
+    number_workers: Optional[int] = None,
+) -> ParsedTable:
+    """Reads shards in parallel, in separate worker processes, and combines them.
+
+    Args:
+        file_paths: the paths to the shards, in the order their rows are combined.
+        read_shard: reads a single shard, given its position in :code:`file_paths` and its path. It
+            must be possible to pickle this function (e.g. a function defined at module-level, or a
+            :func:`functools.partial` of one).
+        number_workers: the maximum number of worker processes. If None, the number of processors.
+
+    Returns:
+        a single table with the rows of each shard in turn.
+    """
+    if len(file_paths) == 1:
+        return read_shard(0, file_paths[0])
+
+    print("Reading {} shards in parallel".format(len(file_paths)))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=number_workers) as executor:
+        tables = list(executor.map(read_shard, range(len(file_paths)), file_paths))
+    return concatenate_tables(tables)
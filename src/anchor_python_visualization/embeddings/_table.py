@@ -0,0 +1,164 @@
+"""Columns parsed from a table of features, before identifiers and labels are derived."""
+from __future__ import annotations
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ._identifiers import select_or_create_identifiers
+
+
+@dataclasses.dataclass(frozen=True)
+class SampledRows:
+    """Which rows of the original file(s) were retained in a random sample, of the same size and order."""
+
+    positions: np.ndarray
+    """The (zero-based) position of each retained row, in the original file(s)."""
+
+    keys: np.ndarray
+    """A uniformly-distributed random key for each retained row. Rows with the smallest keys are retained."""
+
+    number_rows_read: int
+    """The total number of rows in the original file(s)."""
+
+    def subset(self, indices: np.ndarray) -> SampledRows:
+        """Retains only particular rows, as in :meth:`ParsedTable.subset`."""
+        return SampledRows(
+            self.positions[indices], self.keys[indices], self.number_rows_read
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class ParsedTable:
+    """The columns of a feature-table, split into feature-values and candidates for identifiers.
+
+    All data-frames must have the same number of rows, ordered identically.
+    """
+
+    features: pd.DataFrame
+    """The numeric columns, which become the feature-values."""
+
+    string_columns: pd.DataFrame
+    """Non-numeric columns. Only the left-most column is consulted when deriving identifiers."""
+
+    numeric_columns: pd.DataFrame
+    """Numeric columns with their originally parsed types.
+
+    Only the left-most column is consulted when deriving identifiers. This differs from
+    :attr:`features` only when the feature-values have been converted to another type.
+    """
+
+    sampled: Optional[SampledRows] = None
+    """If only a random sample of the rows was retained while reading, which rows these are."""
+
+    def identifiers(self) -> pd.Series:
+        """Selects or creates unique (string) identifiers for each row.
+
+        Any identifiers that are created, are the position of each row in the original file(s).
+        """
+        return select_or_create_identifiers(
+            self.string_columns,
+            self.numeric_columns,
+            self.sampled.positions if self.sampled is not None else None,
+        )
+
+    def number_rows_read(self) -> int:
+        """The number of rows that were read, including any rows not retained in a sample."""
+        if self.sampled is not None:
+            return self.sampled.number_rows_read
+        else:
+            return len(self.features)
+
+    def subset(self, indices: np.ndarray) -> ParsedTable:
+        """Retains only particular rows.
+
+        Args:
+            indices: the (zero-based) positions of the rows to retain, in order.
+
+        Returns:
+            a newly created table, with only these rows.
+        """
+        return ParsedTable(
+            _take_rows(self.features, indices),
+            _take_rows(self.string_columns, indices),
+            _take_rows(self.numeric_columns, indices),
+            self.sampled.subset(indices) if self.sampled is not None else None,
+        )
+
+
+def split_numeric_and_string(
+    data_frame: pd.DataFrame, feature_names: Optional[List[str]] = None
+) -> ParsedTable:
+    """Splits a data-frame with all columns (text and number) into a :class:`ParsedTable`.
+
+    Args:
+        data_frame: the data-frame with all columns.
+        feature_names: if set, only numeric columns with these names are used as feature-values.
+
+    Returns:
+        the table, where the numeric columns are used as feature-values and identifier candidates.
+    """
+    numeric_columns = data_frame.select_dtypes(include=np.number)
+    string_columns = data_frame.select_dtypes(include=["object"])
+    if feature_names is not None:
+        names = set(feature_names)
+        features = numeric_columns[[c for c in numeric_columns.columns if c in names]]
+    else:
+        features = numeric_columns
+    return ParsedTable(features, string_columns, numeric_columns)
+
+
+def concatenate_tables(tables: List[ParsedTable]) -> ParsedTable:
+    """Concatenates the rows of several tables (with identical columns) into a single table.
+
+    Args:
+        tables: the tables to concatenate, in order.
+
+    Returns:
+        a table with the rows of each table in turn.
+    """
+    return ParsedTable(
+        _concatenate_rows([table.features for table in tables]),
+        _concatenate_rows([table.string_columns for table in tables]),
+        _concatenate_rows([table.numeric_columns for table in tables]),
+        _concatenate_sampled(tables),
+    )
+
+
+def _concatenate_sampled(tables: List[ParsedTable]) -> Optional[SampledRows]:
+    """Combines which rows were sampled, so positions refer to the concatenated tables.
+
+    Returns None, if no rows were sampled in any table.
+    """
+    if all(table.sampled is None for table in tables):
+        return None
+
+    offsets = np.cumsum([0] + [table.number_rows_read() for table in tables])
+    positions = []
+    keys = []
+    for table, offset in zip(tables, offsets):
+        if table.sampled is not None:
+            positions.append(table.sampled.positions + offset)
+            keys.append(table.sampled.keys)
+        else:
+            # All rows are retained
+            positions.append(np.arange(len(table.features)) + offset)
+            keys.append(np.zeros(len(table.features)))
+    return SampledRows(np.concatenate(positions), np.concatenate(keys), offsets[-1])
+
+
+def _take_rows(data_frame: pd.DataFrame, indices: np.ndarray) -> pd.DataFrame:
+    """Takes particular rows from a data-frame, discarding their existing row names."""
+    return data_frame.iloc[indices].reset_index(drop=True)
+
+
+def _concatenate_rows(data_frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates data-frames row-wise, discarding their existing row names."""
+    return pd.concat(data_frames, ignore_index=True)
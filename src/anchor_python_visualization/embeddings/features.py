@@ -6,144 +6,301 @@ __license__ = "MIT"
 __version__ = "0.1"
 
 import argparse
-import os
-from typing import Optional
+import functools
+from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
-from ._identifiers import select_or_create_identifiers
+from ._arrow import read_csv_arrow
+from ._binary import is_binary, read_binary
+from ._cache import CacheEntry, cache_entry_for
+from ._chunked import read_csv_chunked
+from ._columns import SelectedColumns, select_columns
+from ._image_paths import maybe_image_paths
 from ._labels import labels_from_identifiers
+from ._reservoir import read_csv_reservoir, retain_smallest_keys, sample_rows
+from ._shards import read_shards, resolve_shard_paths
+from ._table import ParsedTable, split_numeric_and_string
 from .label import LabelledFeatures
+from .sampling import Sampling
 
 COLUMN_NAME_IDENTIFIER: str = "identifier"
 """Name for index column."""
 
-PLACEHOLDER_FOR_SUBSTITUTION: str = "<IMAGE>"
-"""Optional placeholder used in image_dir argument."""
+ENGINES = ["c", "pyarrow"]
+"""Unique strings to select the parser used when reading a CSV file entirely.
+
+All are lower-case.
+
+* :code:`c` - the single-threaded C parser of pandas.
+* :code:`pyarrow` - the multi-threaded parser of Apache Arrow, falling back to :code:`c` if the pyarrow
+  package is not installed, or if it cannot parse the file.
+"""
+
+DEFAULT_ENGINE = "c"
+"""The default choice to use in :const:`ENGINES`."""
+
+DEFAULT_CHUNK_SIZE_RESERVOIR: int = 100000
+"""The number of rows read at a time when sampling while reading, if no chunk-size is specified."""
 
 
 def load_features(args: argparse.Namespace) -> LabelledFeatures:
-    """Loads the embeddings from a CSV file and determines identifiers and labels.
+    """Loads the embeddings from CSV file(s) and determines identifiers and labels.
 
      This determination occurs according to command-line arguments.
 
+     :code:`args.file_path_to_csv` may also be a directory or a wildcard pattern, to load several
+     CSV files (shards) with identical columns in parallel, using up to :code:`args.number_workers`
+     processes. The rows of each shard are combined in (alphabetical) order of path, and the
+     identifiers are determined as if the shards were a single file, so they are unique globally.
+
+     If :code:`args.chunk_size` is set, the CSV file is streamed in chunks of that many rows, and
+     the feature-values are converted to single-precision as they are read. Otherwise, the entire
+     file is read with the parser :code:`args.engine`, one of :const:`ENGINES`.
+
+     Only the numeric columns, and the columns needed to determine identifiers, are parsed. The
+     numeric columns used as feature-values can be further restricted by wildcard patterns in
+     :code:`args.include_columns` and :code:`args.exclude_columns`.
+
+     :code:`args.file_path_to_csv` may alternatively be a binary matrix of feature-values (with extension
+     :code:`.npy`, :code:`.npz`, :code:`.h5` or :code:`.hdf5`), which is memory-mapped rather than
+     parsed, with identifiers from an optional sidecar CSV file. In this case, the feature-values are
+     not cached or restricted by column.
+
+     If :code:`args.reservoir_size` is set, only a uniform random sample of this many rows is retained
+     as the CSV file(s) stream in chunks, seeded by :code:`args.seed`. Identifiers that are created
+     (and any image sequence) then refer to the position of each row in the CSV file(s).
+
+     If :code:`args.cache_directory` is set, the parsed feature-values, identifiers and labels are
+     cached in this directory, and opened (memory-mapped) from there on later calls, unless the
+     CSV file has changed.
+
     Args:
         args: the command-line arguments.
 
     Returns:
         newly-created instance of features after having being loaded.
     """
+    file_paths = resolve_shard_paths(args.file_path_to_csv)
 
-    # Read all columns, text and number
-    features = _read_csv(args.file_path_to_csv, encoding=args.encoding)
-
-    # Find the numeric and string columns
-    numeric_columns = features.select_dtypes(include=np.number)
-    string_columns = features.select_dtypes(include=["object"])
-
-    # Extract or create identifiers for the data-frame
-    identifiers = select_or_create_identifiers(string_columns, numeric_columns)
+    entry = _maybe_cache_entry(args, file_paths)
 
-    features_with_identifiers = _add_row_names(numeric_columns.copy(), identifiers)
+    features_with_identifiers, positions = _read_features_with_identifiers(
+        args, file_paths, entry
+    )
 
     # Take the first string col as the row names (index)
-    return LabelledFeatures(
+    return LabelledFeatures.from_data_frame(
         features_with_identifiers,
-        _derive_group_label_from_identifiers(
-            features_with_identifiers, args.max_label_index
+        _derive_group_label_maybe_cached(
+            features_with_identifiers, args.max_label_index, entry
         ),
-        _maybe_image_paths(
-            features_with_identifiers, args.image_path, args.image_sequence
+        maybe_image_paths(
+            features_with_identifiers.index,
+            args.image_path,
+            args.image_sequence,
+            positions,
         ),
     )
 
 
-def _read_csv(file_path_to_csv: str, encoding: str) -> pd.DataFrame:
-    """Reads the CSV from the file-system with a particular encoding."""
-    return pd.read_csv(file_path_to_csv, index_col=None, header=0, encoding=encoding)
+def _maybe_cache_entry(
+    args: argparse.Namespace, file_paths: List[str]
+) -> Optional[CacheEntry]:
+    """The cache-entry for the CSV file(s), if caching is enabled.
 
+    Binary files are never cached, as they are already memory-mapped without parsing.
+    """
+    if args.cache_directory is not None and not is_binary(file_paths[0]):
+        return cache_entry_for(
+            args.cache_directory,
+            file_paths,
+            encoding=args.encoding,
+            single_precision=args.chunk_size is not None
+            or args.reservoir_size is not None,
+            include_columns=args.include_columns,
+            exclude_columns=args.exclude_columns,
+            reservoir_size=args.reservoir_size,
+            seed=args.seed if args.reservoir_size is not None else None,
+        )
+    else:
+        return None
 
-def _maybe_image_paths(
-    features: pd.DataFrame,
-    image_directory_path: Optional[str],
-    image_directory_sequence: Optional[str],
-) -> Optional[pd.Series]:
-    """Maybe creates a series of image-paths derived from the index names in data/frame.
 
-    No paths are created if image_directory_path is None, and instead None is returned.
+def _read_features_with_identifiers(
+    args: argparse.Namespace, file_paths: List[str], entry: Optional[CacheEntry]
+) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """Reads the feature-values with identifiers as row-names, from the cache if possible.
 
-    Args:
-      features: data-frame the images refer to.
-      image_directory_path: iff present, the index name of data-frame (a relative path) for each
-        feature row is appended/substituted to form a complete path to an image.
-      image_directory_sequence: iff present, a six-digit integer sequence for each feature row is
-        appended/substituted to form a complete path to an image.
+    If a cache-entry is specified but does not yet exist, it is stored after reading and then opened
+    from the cache, so the same (memory-mapped) representation is returned on each call.
 
     Returns:
-        a series with an identical number of rows in identical order, or None.
+        the feature-values, and the position of each row in the CSV file(s), if only a sample of
+        rows was retained.
     """
-    # If neither image_dir argument is set exit
-    if (image_directory_path is None) and (image_directory_sequence is None):
-        return None
+    if entry is not None and entry.exists():
+        return entry.load_features(), entry.load_positions()
 
-    # If image_dir_path is set, form complete image-paths for each feature-row by using the path
-    # (the label in the index) of the data frame to join or substitute
-    if image_directory_path:
-        return features.index.to_series().map(
-            lambda path: _join_or_substitute(image_directory_path, path)
-        )
+    # Read the numeric columns, and the string columns needed for identifiers
+    table = _read_table(args, file_paths)
 
-    # If image_dir_sequence is set, form complete image-paths for each feature-row using a six digit
-    # sequence to join or substitute
-    if image_directory_sequence:
-        number_rows = len(features.index)
-        sequence = pd.Series(range(0, number_rows))
-        return sequence.map(
-            lambda number: _join_or_substitute(
-                image_directory_sequence, "{:06d}".format(number)
-            )
-        )
+    # Extract or create identifiers for the data-frame
+    features = _add_row_names(table.features, table.identifiers())
 
+    positions = table.sampled.positions if table.sampled is not None else None
 
-def _join_or_substitute(image_directory: str, path: str) -> str:
-    """Derives paths to images by either joining path to image_dir or substituting path into it.
+    if entry is not None:
+        entry.store_features(features, positions)
+        return entry.load_features(), entry.load_positions()
+    else:
+        return features, positions
 
-    The sibustition occurs if the path contains a sub-string `PLACEHOLDER_FOR_SUBSTITUTION`.
 
-    Both paths are normed so that directory-seperators match the execution environment.
+def _read_table(args: argparse.Namespace, file_paths: List[str]) -> ParsedTable:
+    """Reads the CSV file(s) from the file-system, combining the rows of several files in order."""
 
-    Args:
-        image_directory: either the absolute path to a directory OR a such a path with a placeholder
-            :code:`PLACEHOLDER_FOR_SUBSTITUTION` which can be substituted.
-        path: the relative-path to an image.
+    # Determine which columns to parse from the header and first rows of the first file
+    if not is_binary(file_paths[0]):
+        columns = select_columns(
+            file_paths[0],
+            args.encoding,
+            args.include_columns,
+            args.exclude_columns,
+        )
+    else:
+        columns = None
+
+    table = read_shards(
+        file_paths,
+        functools.partial(_read_single_table, args=args, columns=columns),
+        args.number_workers,
+    )
+
+    if args.reservoir_size is not None:
+        # Each shard retains its own sample, so combine into a single sample
+        return retain_smallest_keys(table, args.reservoir_size)
+    else:
+        return table
 
-    Returns:
-        either the relative-path joined to image_dir or the relative-path substituted into image_dir
-            in place of :code:`PLACEHOLDER_FOR_SUBSTITUTION`.
 
+def _read_single_table(
+    shard_index: int,
+    file_path_to_csv: str,
+    args: argparse.Namespace,
+    columns: Optional[SelectedColumns],
+) -> ParsedTable:
+    """Reads a CSV file, either entirely or in chunks of :code:`args.chunk_size` rows.
+
+    A binary file is instead opened memory-mapped, and :code:`columns` is ignored.
+
+    :code:`shard_index` is the position of the file among all shards, from which the random keys for
+    any sample of its rows are derived.
     """
-    if PLACEHOLDER_FOR_SUBSTITUTION in image_directory:
-        return os.path.normpath(image_directory).replace(
-            PLACEHOLDER_FOR_SUBSTITUTION, os.path.normpath(path), 1
+    if is_binary(file_path_to_csv):
+        table = read_binary(file_path_to_csv, args.encoding)
+        if args.reservoir_size is not None:
+            return sample_rows(
+                table, shard_index, args.reservoir_size, Sampling(args.seed)
+            )
+        else:
+            return table
+    elif args.reservoir_size is not None:
+        return read_csv_reservoir(
+            file_path_to_csv,
+            args.encoding,
+            args.chunk_size or DEFAULT_CHUNK_SIZE_RESERVOIR,
+            columns,
+            args.reservoir_size,
+            Sampling(args.seed),
+            shard_index,
+        )
+    elif args.chunk_size is not None:
+        return read_csv_chunked(
+            file_path_to_csv, args.encoding, args.chunk_size, columns
         )
     else:
-        return os.path.join(image_directory, path)
+        return split_numeric_and_string(
+            _read_csv(
+                file_path_to_csv,
+                args.encoding,
+                args.engine,
+                columns.names_to_read(),
+            ),
+            columns.features,
+        )
+
+
+def _read_csv(
+    file_path_to_csv: str, encoding: Optional[str], engine: str, columns: List[str]
+) -> pd.DataFrame:
+    """Reads the CSV from the file-system with a particular encoding and parser.
+
+    Args:
+        file_path_to_csv: the path to the CSV file.
+        encoding: the encoding of the CSV file, or None to use the default.
+        engine: the parser to use, one of :const:`ENGINES`, case-insensitive.
+        columns: the names of the columns to parse.
+
+    Returns:
+        a data-frame with the columns, text and number, in the order they occur in the file.
+    """
+    engine = engine.casefold()
+    if engine == ENGINES[1]:
+        try:
+            return read_csv_arrow(file_path_to_csv, encoding, columns)
+        except ImportError:
+            print(
+                "The pyarrow package is not installed, so falling back to the '{}' engine.".format(
+                    ENGINES[0]
+                )
+            )
+        except ValueError as err:
+            # Errors from pyarrow when parsing derive from ValueError
+            print(
+                "pyarrow cannot parse {}, so falling back to the '{}' engine.".format(
+                    file_path_to_csv, ENGINES[0]
+                )
+            )
+            print(err)
+    elif engine != ENGINES[0]:
+        raise ValueError("Unknown engine for reading a CSV file: {}".format(engine))
+
+    return pd.read_csv(
+        file_path_to_csv,
+        index_col=None,
+        header=0,
+        encoding=encoding,
+        usecols=columns,
+    )
 
 
 def _add_row_names(features: pd.DataFrame, row_names: pd.Series) -> pd.DataFrame:
-    """Adds a series as row-names to a data-frame."""
-    features[COLUMN_NAME_IDENTIFIER] = row_names
-    features.set_index(COLUMN_NAME_IDENTIFIER, inplace=True)
+    """Assigns a series as row-names to a data-frame, without copying the feature-values."""
+    features.index = pd.Index(row_names, name=COLUMN_NAME_IDENTIFIER)
     return features
 
 
+def _derive_group_label_maybe_cached(
+    features: pd.DataFrame, max_label_index: int, entry: Optional[CacheEntry]
+) -> pd.Series:
+    """Like :func:`_derive_group_label_from_identifiers` but reusing labels in the cache, if possible."""
+    if entry is None:
+        return _derive_group_label_from_identifiers(features, max_label_index)
+
+    labels = entry.load_labels(max_label_index)
+    if labels is None:
+        labels = _derive_group_label_from_identifiers(features, max_label_index)
+        entry.store_labels(labels, max_label_index)
+    return labels
+
+
 def _derive_group_label_from_identifiers(
     features: pd.DataFrame, max_label_index: int
 ) -> pd.Series:
     """Derives the first group (leftmost group in name) from the names of a data-frame."""
     return pd.Series(
-        list(labels_from_identifiers(features.index.values, max_label_index)),
-        dtype="category",
+        labels_from_identifiers(features.index, max_label_index),
         index=features.index,
     )
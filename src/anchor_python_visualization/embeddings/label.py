@@ -8,45 +8,143 @@ __version__ = "0.1"
 
 
 import dataclasses
-import random
-from typing import Optional
+import functools
+from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
 
 from .exceptions import InsufficientRowsException
+from .sampling import Sampling
 
+FEATURE_DTYPE = np.float32
+"""The type of each element in the matrix of feature-values."""
 
-@dataclasses.dataclass(frozen=True)
+LABEL_CODE_DTYPE = np.int32
+"""The type of each code, indexing into the categories of labels."""
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
 class LabelledFeatures:
-    """Maintains separate data-frames for embeddings and labels, but linked in order and count.
+    """Maintains feature-values, labels and (optionally) image-paths, linked in order and count.
+
+    Each is stored compactly as arrays, with the same number of rows, ordered identically. The
+    data-frame and series representations (:attr:`features`, :attr:`labels` and
+    :attr:`image_paths`) are only created when first accessed, and do not copy the arrays.
 
-    Both data-frames must have the same number of rows, ordred identically.
+    Subsets (e.g. samples) are taken with NumPy index-arrays. A subset taken with a slice is a view,
+    without copying.
     """
 
-    features: pd.DataFrame
-    """Data-frame containing only feature-values (numeric) with each row assigned an identifier."""
+    values: np.ndarray
+    """A C-contiguous matrix of feature-values, of type :const:`FEATURE_DTYPE`, with a row per item."""
 
-    labels: pd.Series
-    """Series with labels for each item in ``df_features``.
+    identifiers: pd.Index
+    """An identifier for each item (i.e. row of :attr:`values`)."""
 
-    The series must have the same size and order as ``embeddings``.
-    """
+    feature_names: pd.Index
+    """A name for each feature (i.e. column of :attr:`values`)."""
 
-    image_paths: Optional[pd.Series] = None
-    """Optional series with a path to an image for each item.
+    label_codes: np.ndarray
+    """The label of each item, as an index into :attr:`label_categories`, of type :const:`LABEL_CODE_DTYPE`."""
 
-    The series must have the same size and order as ``embeddings``.
-    """
+    label_categories: pd.Index
+    """The unique labels, in the order referred to by :attr:`label_codes`."""
+
+    paths: Optional[np.ndarray] = None
+    """Optional array with a path to an image for each item."""
+
+    @classmethod
+    def from_data_frame(
+        cls,
+        features: pd.DataFrame,
+        labels: pd.Series,
+        image_paths: Optional[pd.Series] = None,
+    ) -> LabelledFeatures:
+        """Creates from a data-frame of feature-values and series of labels and image-paths.
+
+        The feature-values are only copied if they are not already a C-contiguous matrix of type
+        :const:`FEATURE_DTYPE`.
+
+        Args:
+            features: feature-values (numeric) with each row assigned an identifier.
+            labels: a label for each row in :code:`features`, in the same order.
+            image_paths: optionally, a path to an image for each row in :code:`features`, in the same
+                order.
+
+        Returns:
+            a newly created :class:`LabelledFeatures`.
+        """
+        categorical = pd.Categorical(labels)
+        return cls(
+            np.ascontiguousarray(features.to_numpy(), dtype=FEATURE_DTYPE),
+            features.index,
+            features.columns,
+            categorical.codes.astype(LABEL_CODE_DTYPE, copy=False),
+            categorical.categories,
+            image_paths.to_numpy(dtype=object) if image_paths is not None else None,
+        )
+
+    @functools.cached_property
+    def features(self) -> pd.DataFrame:
+        """Data-frame containing only feature-values (numeric) with each row assigned an identifier."""
+        return pd.DataFrame(
+            self.values,
+            index=self.identifiers,
+            columns=self.feature_names,
+            copy=False,
+        )
+
+    @functools.cached_property
+    def labels(self) -> pd.Series:
+        """Series with a label for each row in :attr:`features`, in the same order."""
+        return pd.Series(
+            pd.Categorical.from_codes(self.label_codes, self.label_categories),
+            index=self.identifiers,
+        )
+
+    @functools.cached_property
+    def image_paths(self) -> Optional[pd.Series]:
+        """Optional series with a path to an image for each row in :attr:`features`, in the same order."""
+        if self.paths is not None:
+            return pd.Series(self.paths, index=self.identifiers, copy=False)
+        else:
+            return None
 
     def number_items(self) -> int:
-        """Returns the number of items (i.e. rows) in the data-frames/series."""
-        return len(self.features.index)
+        """Returns the number of items (i.e. rows) in the matrix/series."""
+        return self.values.shape[0]
+
+    def subset(self, indices: Union[np.ndarray, slice]) -> LabelledFeatures:
+        """Takes identical rows from the feature-values, labels and image-paths.
+
+        Args:
+            indices: the (zero-based) positions of the rows to take, in order, or a slice.
 
-    def sample_without_replacement(self, sample_size: int) -> LabelledFeatures:
-        """Samples without replacement (taking identical rows from each member data-frame/series).
+        Returns:
+            a newly created :class:`LabelledFeatures` containing only these rows. It is a view, if
+            :code:`indices` is a slice.
+        """
+        return LabelledFeatures(
+            self.values[indices],
+            self.identifiers[indices],
+            self.feature_names,
+            self.label_codes[indices],
+            self.label_categories,
+            self.paths[indices] if self.paths is not None else None,
+        )
+
+    def sample_without_replacement(
+        self, sample_size: int, sampling: Optional[Sampling] = None
+    ) -> LabelledFeatures:
+        """Samples without replacement (taking identical rows from each member array).
+
+        The sampled rows retain their original order.
 
         Args:
           sample_size: number of items to sample
+          sampling: how to sample, e.g. with a seed, or stratified by label. If None, uniformly with
+            a fresh seed.
 
         Returns:
             a newly created :class:`LabelledFeatures` containing the sample.
@@ -63,12 +161,6 @@ class LabelledFeatures:
             # Nothing to do
             return self
         else:
-            indices = random.sample(range(number_rows), sample_size)
-            image_paths = (
-                self.image_paths.iloc[indices] if self.image_paths is not None else None
-            )
-            return LabelledFeatures(
-                self.features.iloc[indices, :],
-                self.labels.iloc[indices],
-                image_paths,
-            )
+            if sampling is None:
+                sampling = Sampling()
+            return self.subset(sampling.select(self.label_codes, sample_size))
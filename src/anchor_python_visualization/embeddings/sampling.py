@@ -0,0 +1,135 @@
+"""How rows are randomly sampled from embeddings, reproducibly and optionally stratified by label."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import Optional
+
+import numpy as np
+
+SAMPLING_STRATEGIES = ["uniform", "stratified"]
+"""Unique strings to select how rows are sampled.
+
+All are lower-case.
+
+* :code:`uniform` - each row is equally likely to be sampled.
+* :code:`stratified` - each label is sampled in proportion to its number of rows, but with at least
+  :attr:`Sampling.minimum_per_label` rows (or all its rows, if fewer), so rare labels are retained.
+"""
+
+DEFAULT_SAMPLING_STRATEGY = "uniform"
+"""The default choice to use in :const:`SAMPLING_STRATEGIES`."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Sampling:
+    """How to randomly sample rows without replacement."""
+
+    seed: Optional[int] = None
+    """A seed for the random number generator, so samples are reproducible. If None, a fresh seed."""
+
+    strategy: str = DEFAULT_SAMPLING_STRATEGY
+    """One of :const:`SAMPLING_STRATEGIES`, case-insensitive."""
+
+    minimum_per_label: int = 1
+    """The minimum number of rows sampled for each label, when stratified."""
+
+    def generator(self, *streams: int) -> np.random.Generator:
+        """Creates a random number generator from :attr:`seed`.
+
+        Args:
+            streams: optional integers, which are combined with the seed, to derive independent
+                generators for different purposes (e.g. different files).
+
+        Returns:
+            a newly-created generator, which is seeded identically on each call, if :attr:`seed`
+            is set.
+        """
+        if self.seed is not None:
+            return np.random.default_rng([self.seed, *streams])
+        else:
+            return np.random.default_rng()
+
+    def select(self, label_codes: np.ndarray, sample_size: int) -> np.ndarray:
+        """Selects the rows to sample.
+
+        Args:
+            label_codes: an integer code for the label of each row.
+            sample_size: the number of rows to sample, which must not exceed the number of rows.
+
+        Returns:
+            the (zero-based) positions of the sampled rows, in ascending order.
+
+        Raises:
+            ValueError: if the strategy is unknown, or if a stratified sample cannot include
+                :attr:`minimum_per_label` rows of each label.
+        """
+        strategy = self.strategy.casefold()
+        generator = self.generator()
+        if strategy == SAMPLING_STRATEGIES[0]:
+            indices = generator.choice(len(label_codes), sample_size, replace=False)
+        elif strategy == SAMPLING_STRATEGIES[1]:
+            indices = _select_stratified(
+                label_codes, sample_size, self.minimum_per_label, generator
+            )
+        else:
+            raise ValueError("Unknown sampling strategy: {}".format(self.strategy))
+        indices.sort()
+        return indices
+
+
+def _select_stratified(
+    label_codes: np.ndarray,
+    sample_size: int,
+    minimum_per_label: int,
+    generator: np.random.Generator,
+) -> np.ndarray:
+    """Selects rows so that each label is sampled proportionally, but with a minimum.
+
+    The rows are shuffled within each label (by sorting on random keys), and the first rows for each
+    label are selected, up to the number allocated to it.
+    """
+    _, group_of_row, counts = np.unique(
+        label_codes, return_inverse=True, return_counts=True
+    )
+    allocated = _allocate(counts, sample_size, minimum_per_label)
+
+    # Order by group, and randomly within each group
+    order = np.lexsort((generator.random(len(label_codes)), group_of_row))
+
+    # The position of each (ordered) row within its group
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(len(order)) - np.repeat(starts, counts)
+
+    return order[rank < np.repeat(allocated, counts)]
+
+
+def _allocate(counts: np.ndarray, sample_size: int, minimum: int) -> np.ndarray:
+    """Allocates how many rows to sample from each group, given how many rows each has.
+
+    Each group is first allocated the minimum (or all its rows, if fewer), and the remainder of
+    :code:`sample_size` is allocated in proportion to the rows each group has left, using the largest
+    remainders to round.
+    """
+    guaranteed = np.minimum(counts, minimum)
+    remaining = sample_size - guaranteed.sum()
+    if remaining < 0:
+        raise ValueError(
+            f"A sample of {sample_size} rows cannot include {minimum} rows of each of the"
+            f" {len(counts)} labels."
+        )
+
+    available = counts - guaranteed
+    if remaining == 0:
+        return guaranteed
+
+    proportional = remaining * available / available.sum()
+    extra = np.floor(proportional).astype(np.int64)
+    shortfall = remaining - extra.sum()
+    if shortfall > 0:
+        largest_remainders = np.argsort(extra - proportional, kind="stable")[:shortfall]
+        extra[largest_remainders] += 1
+    return guaranteed + extra
@@ -1,9 +1,42 @@
 """Methods for projecting a feature space to lower dimensionality."""
+from anchor_python_visualization.projection._cache import (
+    DEFAULT_MAX_SIZE_MEGABYTES,
+    CachedProjection,
+)
+from anchor_python_visualization.projection._fit_on_sample import (
+    FitOnSample,
+    LoadedProjection,
+)
+from anchor_python_visualization.projection._multiple import (
+    MultipleProjections,
+    split_projections,
+)
+from anchor_python_visualization.projection._options import parse_options
 from anchor_python_visualization.projection.factory import (
     DEFAULT_IDENTIFIER,
     IDENTIFIERS,
+    create_multiple,
     create_projector,
 )
+from anchor_python_visualization.projection.fitted import (
+    FittedProjection,
+    load_fitted,
+)
 from anchor_python_visualization.projection.projector import Projector
 
-__all__ = ["DEFAULT_IDENTIFIER", "IDENTIFIERS", "create_projector", "Projector"]
+__all__ = [
+    "DEFAULT_MAX_SIZE_MEGABYTES",
+    "CachedProjection",
+    "DEFAULT_IDENTIFIER",
+    "IDENTIFIERS",
+    "create_multiple",
+    "create_projector",
+    "FitOnSample",
+    "FittedProjection",
+    "load_fitted",
+    "LoadedProjection",
+    "MultipleProjections",
+    "parse_options",
+    "Projector",
+    "split_projections",
+]
@@ -0,0 +1,200 @@
+"""A persistent cache on the file-system of projections, keyed by their inputs."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+import hashlib
+import os
+import tempfile
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .fitted import FittedProjection
+from .projector import Projector
+
+DEFAULT_MAX_SIZE_MEGABYTES: int = 1024
+"""The default maximum total size of the projections in a cache."""
+
+EXTENSION_ENTRY: str = ".npz"
+"""The extension of the file storing each cached projection."""
+
+_NUMBER_ROWS_HASH: int = 1 << 16
+"""The number of rows of feature-values that are hashed at a time."""
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedProjection(Projector):
+    """Reuses a projection from a cache on the file-system, or otherwise projects and stores it.
+
+    Each projection is keyed by a hash of the feature-values (and their names) and of the
+    parameters of :attr:`projector` (its :func:`repr`, which for a dataclass includes each field),
+    as well as the size and modification time of any files it reads (see
+    :meth:`Projector.paths_read`, e.g. a fitted projection). The row names are not part of the key,
+    and are instead assigned to the cached projection.
+
+    A projection that writes files (see :meth:`Projector.paths_written`, e.g. saving a fitted
+    projection) is never cached, as reusing it would not write them.
+
+    When the total size of the cached projections exceeds :attr:`max_size_megabytes`, the least
+    recently used projections are removed.
+    """
+
+    projector: Projector
+    """The projection to perform (and cache)."""
+
+    directory: str
+    """The directory where the projections are stored, each as a separate file."""
+
+    max_size_megabytes: Optional[int] = DEFAULT_MAX_SIZE_MEGABYTES
+    """The maximum total size of all cached projections. If None, projections are never removed."""
+
+    # Overriding a method in a base class
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        return self._project_cached(
+            features, None, lambda: self.projector.project(features)
+        )
+
+    # Overriding a method in a base class
+    def project_labelled(
+        self, features: pd.DataFrame, label_codes: np.ndarray
+    ) -> pd.DataFrame:
+        # As the labels may affect the projection (e.g. a stratified sample), they are also hashed
+        return self._project_cached(
+            features,
+            label_codes,
+            lambda: self.projector.project_labelled(features, label_codes),
+        )
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        return self.projector.fit(features)
+
+    # Overriding a method in a base class
+    def fit_project(
+        self, features: pd.DataFrame
+    ) -> Tuple[FittedProjection, pd.DataFrame]:
+        return self.projector.fit_project(features)
+
+    # Overriding a method in a base class
+    def paths_read(self) -> List[str]:
+        return self.projector.paths_read()
+
+    # Overriding a method in a base class
+    def paths_written(self) -> List[str]:
+        return self.projector.paths_written()
+
+    def _project_cached(
+        self,
+        features: pd.DataFrame,
+        label_codes: Optional[np.ndarray],
+        project: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Reuses a cached projection if it exists, or otherwise calls :code:`project` and stores it."""
+        if self.projector.paths_written():
+            print(
+                "Not caching the projection, as it writes: {}".format(
+                    ", ".join(self.projector.paths_written())
+                )
+            )
+            return project()
+
+        path = os.path.join(
+            self.directory,
+            _key(features, self.projector, label_codes) + EXTENSION_ENTRY,
+        )
+        if os.path.isfile(path):
+            print("Reusing the cached projection at: {}".format(path))
+            # Marks the entry as recently used
+            os.utime(path)
+            return _load(path, features.index)
+
+        projected = project()
+        _store(projected, path)
+        if self.max_size_megabytes is not None:
+            _evict_least_recently_used(self.directory, self.max_size_megabytes << 20)
+        return projected
+
+
+def _key(
+    features: pd.DataFrame, projector: Projector, label_codes: Optional[np.ndarray]
+) -> str:
+    """A hash of the feature-values (and their names and type), the projector's parameters and any labels.
+
+    Also of the size and modification time of each file the projector reads.
+    """
+    matrix = features.to_numpy()
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(projector).encode("utf-8"))
+    for path in projector.paths_read():
+        digest.update(repr(_describe_file(path)).encode("utf-8"))
+    digest.update(repr((matrix.shape, str(matrix.dtype))).encode("utf-8"))
+    digest.update(repr(list(map(str, features.columns))).encode("utf-8"))
+    for start in range(0, len(matrix), _NUMBER_ROWS_HASH):
+        digest.update(
+            np.ascontiguousarray(matrix[start : start + _NUMBER_ROWS_HASH]).data
+        )
+    if label_codes is not None:
+        digest.update(np.ascontiguousarray(label_codes).data)
+    return digest.hexdigest()
+
+
+def _describe_file(path: str) -> Optional[Tuple[int, int]]:
+    """The size and modification time of a file, or None if it does not exist."""
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return status.st_size, status.st_mtime_ns
+
+
+def _load(path: str, index: pd.Index) -> pd.DataFrame:
+    """Loads a cached projection, assigning row names."""
+    with np.load(path) as entry:
+        return pd.DataFrame(entry["projected"], columns=entry["columns"], index=index)
+
+
+def _store(projected: pd.DataFrame, path: str) -> None:
+    """Stores a projection, writing to a temporary file and then renaming it.
+
+    So a partially written projection is never read.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as file:
+            np.savez(
+                file,
+                projected=projected.to_numpy(),
+                columns=np.array(list(map(str, projected.columns))),
+            )
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def _evict_least_recently_used(directory: str, max_size_bytes: int) -> None:
+    """Removes the least recently used (modified) projections, until the total size is within a limit."""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(EXTENSION_ENTRY):
+            status = entry.stat()
+            entries.append((status.st_mtime_ns, status.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another process may have removed it concurrently
+            pass
+        total -= size
@@ -0,0 +1,159 @@
+"""T-SNE projection with approximate nearest neighbors and FFT-accelerated gradients, using openTSNE."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ._derive_utilities import derive_projected
+from ._fitted_estimator import FittedEstimator
+from ._tsne import (
+    ITERATIONS_RELAXATION,
+    TSNEProjection,
+    _calculate_perplexity,
+    _interpolate_new,
+)
+from .fitted import FittedProjection
+
+NEIGHBORS_FFT_TSNE = "auto"
+"""How the nearest neighbors are searched, as in openTSNE.
+
+:code:`auto` searches exactly for few rows, and otherwise approximately (e.g. :code:`annoy` or
+:code:`pynndescent`).
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class FFTTSNEProjection(TSNEProjection):
+    """Projects to two-dimensions using T-SNE, scaling to millions of rows.
+
+    Unlike :class:`TSNEProjection` (exact neighbors and Barnes-Hut gradients on a single core),
+    this uses `openTSNE <https://opentsne.readthedocs.io>`_ with approximate nearest neighbors and
+    FFT-interpolated gradients, both across several cores. This requires the openTSNE package.
+
+    As with :class:`TSNEProjection`, it is preceded by a PCA projection when
+    ``num(embeddings) > pre_reduction_components``.
+
+    It produces embeddings TSNE0 and TSNE1.
+    """
+
+    neighbors: str = NEIGHBORS_FFT_TSNE
+    """How the nearest neighbors are searched, as in openTSNE."""
+
+    number_jobs: int = -1
+    """The number of threads to use, or -1 to use all cores."""
+
+    # Overriding a method in a base class
+    def fit_project(
+        self, features: pd.DataFrame
+    ) -> Tuple[FittedProjection, pd.DataFrame]:
+        """Fits T-SNE, placing further rows by optimizing only their positions, as in openTSNE.
+
+        The fitted rows keep their optimized positions.
+        """
+        self._check_fittable()
+        pre_reduction, reduced = self._fit_pre_reduction(features)
+        embedding = self._create(reduced).fit(reduced.to_numpy())
+        return (
+            FittedEstimator(embedding, "TSNE", pre_reduction=pre_reduction),
+            derive_projected(features, np.asarray(embedding), "TSNE"),
+        )
+
+    # Overriding a method in a base class
+    def _project_reduced(self, reduced: pd.DataFrame) -> np.ndarray:
+        # Not copied, if all columns have the same type
+        return np.asarray(self._create(reduced).fit(reduced.to_numpy()))
+
+    # Overriding a method in a base class
+    def _project_sweep(
+        self, reduced: pd.DataFrame, perplexities: List[int]
+    ) -> List[np.ndarray]:
+        """Projects the features (after any reduction by PCA) with each perplexity in turn.
+
+        The nearest neighbors are searched once, for the largest perplexity, and the affinities are
+        recalculated from them for each perplexity. Each optimization already uses several cores.
+        """
+        from openTSNE import affinity, initialization
+
+        matrix = reduced.to_numpy()
+        affinities = affinity.PerplexityBasedNN(
+            matrix,
+            perplexity=max(perplexities),
+            method=self.neighbors,
+            n_jobs=self.number_jobs,
+            random_state=0,
+            verbose=True,
+        )
+        # Every projection starts identically, from the first principal components
+        start = initialization.pca(matrix, random_state=0)
+
+        layouts = []
+        for perplexity in perplexities:
+            affinities.set_perplexity(perplexity)
+            embedding = self._create(reduced).fit(
+                affinities=affinities, initialization=start
+            )
+            layouts.append(np.asarray(embedding))
+        return layouts
+
+    # Overriding a method in a base class
+    def _place_new(
+        self, reduced: pd.DataFrame, positions: np.ndarray, previous: np.ndarray
+    ) -> np.ndarray:
+        """Places new rows near their nearest previous rows, and optimizes their positions.
+
+        Unless :attr:`relax_previous`, only the new rows are optimized (against the previous rows,
+        which remain in place), as openTSNE does when adding rows to an existing projection.
+        """
+        matrix = reduced.to_numpy()
+        if self.relax_previous:
+            # Without early exaggeration, so rows move little from where they start
+            tsne = self._create(
+                reduced, early_exaggeration_iter=0, n_iter=ITERATIONS_RELAXATION
+            )
+            return np.asarray(
+                tsne.fit(
+                    matrix, initialization=_interpolate_new(matrix, positions, previous)
+                )
+            )
+
+        from openTSNE import TSNEEmbedding, affinity
+
+        existing = TSNEEmbedding(
+            positions[previous],
+            affinity.PerplexityBasedNN(
+                matrix[previous],
+                perplexity=_calculate_perplexity(
+                    reduced.iloc[np.flatnonzero(previous)], self.perplexity
+                ),
+                method=self.neighbors,
+                n_jobs=self.number_jobs,
+                random_state=0,
+            ),
+            negative_gradient_method="fft",
+            n_jobs=self.number_jobs,
+        )
+        placed = positions.copy()
+        placed[~previous] = np.asarray(existing.transform(matrix[~previous]))
+        return placed
+
+    def _create(self, reduced: pd.DataFrame, **parameters: Any) -> Any:
+        """Creates the (unfitted) T-SNE from openTSNE, with any additional parameters."""
+        from openTSNE import TSNE
+
+        return TSNE(
+            n_components=2,
+            perplexity=_calculate_perplexity(reduced, self.perplexity),
+            neighbors=self.neighbors,
+            negative_gradient_method="fft",
+            n_jobs=self.number_jobs,
+            random_state=0,
+            verbose=True,
+            **parameters,
+        )
@@ -0,0 +1,138 @@
+"""Fits a projection on a sample of rows, and then projects all rows with it."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from anchor_python_visualization import embeddings
+
+from .fitted import FittedProjection, load_fitted
+from .projector import Projector
+
+
+@dataclasses.dataclass(frozen=True)
+class FitOnSample(Projector):
+    """Fits a projection on a (random) sample of rows, and then projects all rows in batches.
+
+    So only the sample pays the cost of fitting, and the remaining rows are projected cheaply. The
+    sampled rows keep the projection they were fitted with (see :meth:`Projector.fit_project`). If
+    there are no more rows than :attr:`sample_size` (and the fitted projection is not saved), all
+    rows are projected as usual.
+
+    When the labels are known, the sample may be stratified by label (see :attr:`sampling`).
+    """
+
+    projector: Projector
+    """The projection to fit on the sample, which must support :meth:`Projector.fit`."""
+
+    sample_size: Optional[int] = None
+    """The (maximum) number of rows to fit on. If None, all rows are fitted on."""
+
+    sampling: embeddings.Sampling = embeddings.Sampling()
+    """How the sample is selected."""
+
+    save_path: Optional[str] = None
+    """If set, the fitted projection is saved to this path, to project further rows later."""
+
+    # Overriding a method in a base class
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        return self.project_labelled(
+            features, np.zeros(len(features.index), dtype=np.int32)
+        )
+
+    # Overriding a method in a base class
+    def project_labelled(
+        self, features: pd.DataFrame, label_codes: np.ndarray
+    ) -> pd.DataFrame:
+        sample = self._select(label_codes)
+        if len(sample) == len(features.index) and self.save_path is None:
+            return self.projector.project(features)
+
+        fitted, projected_sample = self.projector.fit_project(features.iloc[sample])
+        self._save(fitted)
+
+        # The sampled rows keep the projection they were fitted with, and only the remaining rows
+        # are projected by the fitted projection
+        remaining = np.ones(len(features.index), dtype=bool)
+        remaining[sample] = False
+        if not remaining.any():
+            return projected_sample
+
+        projected_remaining = fitted.transform(
+            features.iloc[np.flatnonzero(remaining)]
+        ).to_numpy()
+        projection = np.empty(
+            (len(features.index), projected_remaining.shape[1]),
+            dtype=projected_remaining.dtype,
+        )
+        projection[sample] = projected_sample.to_numpy()
+        projection[remaining] = projected_remaining
+        return pd.DataFrame(
+            projection, columns=projected_sample.columns, index=features.index
+        )
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        sample = self._select(np.zeros(len(features.index), dtype=np.int32))
+        fitted = self.projector.fit(features.iloc[sample])
+        self._save(fitted)
+        return fitted
+
+    # Overriding a method in a base class
+    def paths_read(self) -> List[str]:
+        return self.projector.paths_read()
+
+    # Overriding a method in a base class
+    def paths_written(self) -> List[str]:
+        saved = [self.save_path] if self.save_path is not None else []
+        return saved + self.projector.paths_written()
+
+    def _select(self, label_codes: np.ndarray) -> np.ndarray:
+        """Selects the rows to fit on, given the label of each row."""
+        number_rows = len(label_codes)
+        if self.sample_size is None or number_rows <= self.sample_size:
+            return np.arange(number_rows)
+
+        print(
+            "Fitting the projection on a sample of {} rows from a total of {} rows".format(
+                self.sample_size, number_rows
+            )
+        )
+        return self.sampling.select(label_codes, self.sample_size)
+
+    def _save(self, fitted: FittedProjection) -> None:
+        """Saves the fitted projection, if a path is set."""
+        if self.save_path is not None:
+            print("Saving the fitted projection to: {}".format(self.save_path))
+            fitted.save(self.save_path)
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadedProjection(Projector):
+    """Projects rows with a projection fitted earlier, and saved with :meth:`FittedProjection.save`.
+
+    So new embeddings are placed into an existing projection, without fitting again.
+    """
+
+    path: str
+    """The path to load the fitted projection from."""
+
+    # Overriding a method in a base class
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(features).transform(features)
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        """Loads the fitted projection, ignoring :code:`features`."""
+        return load_fitted(self.path)
+
+    # Overriding a method in a base class
+    def paths_read(self) -> List[str]:
+        return [self.path]
@@ -0,0 +1,105 @@
+"""Projects further rows with an estimator that has been fitted."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+from ._derive_utilities import derive_projected
+from .fitted import FittedProjection
+
+DEFAULT_BATCH_SIZE_TRANSFORM = 10000
+"""The default (maximum) number of rows that are projected at a time."""
+
+
+@dataclasses.dataclass(frozen=True)
+class FittedEstimator(FittedProjection):
+    """Projects rows in batches, with a fitted estimator that has a :code:`transform` method.
+
+    e.g. an estimator from scikit-learn, umap-learn or openTSNE. Only a single batch of rows is
+    converted at a time, and each is projected directly into a preallocated output.
+    """
+
+    estimator: Any
+    """The fitted estimator."""
+
+    feature_prefix: str
+    """The prefix of the name of each projected feature, followed by its index e.g. PCA0, PCA1."""
+
+    dtype: Optional[np.dtype] = None
+    """If set, the feature-values are converted to this type, before projection."""
+
+    mean: Optional[np.ndarray] = None
+    """If set, subtracted from the feature-values, before projection."""
+
+    pre_reduction: Optional[FittedProjection] = None
+    """If set, a projection that occurs beforehand, whose output is projected by :attr:`estimator`."""
+
+    batch_size: int = DEFAULT_BATCH_SIZE_TRANSFORM
+    """The (maximum) number of rows that are projected at a time."""
+
+    # Overriding a method in a base class
+    def transform(self, features: pd.DataFrame) -> pd.DataFrame:
+        if self.pre_reduction is not None:
+            matrix = self.pre_reduction.transform(features).to_numpy()
+        else:
+            # Not copied, if all columns have the same type
+            matrix = features.to_numpy()
+
+        projection = None
+        for start in range(0, len(matrix), self.batch_size):
+            batch = matrix[start : start + self.batch_size]
+            if self.dtype is not None:
+                batch = batch.astype(self.dtype, copy=False)
+            if self.mean is not None:
+                batch = batch - self.mean
+
+            projected = np.asarray(self.estimator.transform(batch))
+            if projection is None:
+                projection = np.empty(
+                    (len(matrix), projected.shape[1]), dtype=projected.dtype
+                )
+            projection[start : start + len(batch)] = projected
+
+        # Convert back into a data-frame, assigning feature-names for each component
+        return derive_projected(features, projection, self.feature_prefix)
+
+
+class NeighborInterpolation:
+    """Places rows as a weighted average of the projections of their nearest fitted rows.
+
+    This allows rows to be projected out-of-sample, for projection methods (e.g. t-SNE in scikit-learn)
+    that can only project the rows they are fitted on. Each neighbor is weighted by the inverse of
+    its distance.
+    """
+
+    def __init__(
+        self, fitted: np.ndarray, projected: np.ndarray, number_neighbors: int
+    ):
+        """Constructor
+
+        Args:
+            fitted: the feature-values of the fitted rows.
+            projected: the projection of each of the fitted rows.
+            number_neighbors: how many of the nearest fitted rows to average, unless there are too
+                few.
+        """
+        self._projected = projected
+        self._neighbors = NearestNeighbors(
+            n_neighbors=min(number_neighbors, len(fitted))
+        ).fit(fitted)
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        """Projects rows, as a weighted average of the projections of their nearest fitted rows."""
+        distances, indices = self._neighbors.kneighbors(features)
+        # A row identical to a fitted row is placed (almost) exactly on it
+        weights = 1.0 / np.maximum(distances, np.finfo(np.float32).eps)
+        weights /= weights.sum(axis=1, keepdims=True)
+        return np.einsum("ij,ijk->ik", weights, self._projected[indices])
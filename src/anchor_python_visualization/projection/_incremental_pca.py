@@ -0,0 +1,77 @@
+"""Incremental PCA projection, fitted over batches of rows."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import List, Tuple
+
+import pandas as pd
+from sklearn import decomposition
+
+from ._fitted_estimator import FittedEstimator
+from .fitted import FittedProjection
+from .projector import Projector
+
+
+@dataclasses.dataclass(frozen=True)
+class IncrementalPCAProjection(Projector):
+    """Projects using PCA to a lower dimensional feature-space, processing only a batch of rows at a time.
+
+    The PCA is fitted over successive batches of rows, and then each batch is projected in a second
+    pass directly into a preallocated output. So only a single batch is ever converted or copied,
+    and the feature-values may be memory-mapped (e.g. from a binary file or the cache) and larger
+    than memory.
+
+    Produces embeddings PCA0, PCA1, PCA2 etc.
+    """
+
+    number_components: int = 2
+    """Target number of dimensions for the PCA projection"""
+
+    batch_size: int = 10000
+    """The (maximum) number of rows in each batch."""
+
+    # Overriding a method in a base class
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(features).transform(features)
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        # Not copied, if all columns have the same type (e.g. memory-mapped)
+        matrix = features.to_numpy()
+
+        pca = decomposition.IncrementalPCA(n_components=self.number_components)
+        for start, end in _batches(
+            len(matrix), self.batch_size, self.number_components
+        ):
+            pca.partial_fit(matrix[start:end])
+
+        print(
+            "Total Explained variation: {}".format(pca.explained_variance_ratio_.sum())
+        )
+        return FittedEstimator(pca, "PCA", batch_size=self.batch_size)
+
+
+def _batches(
+    number_rows: int, batch_size: int, minimum_size: int
+) -> List[Tuple[int, int]]:
+    """Divides rows into successive batches, each with at least :code:`minimum_size` rows.
+
+    Args:
+        number_rows: the total number of rows.
+        batch_size: the maximum number of rows in a batch, unless this is less than
+            :code:`minimum_size`.
+        minimum_size: the minimum number of rows in a batch. A final batch with fewer rows is
+            combined with the preceding batch.
+
+    Returns:
+        the start (inclusive) and end (exclusive) row of each batch, in order.
+    """
+    batch_size = max(batch_size, minimum_size)
+    starts = list(range(0, number_rows, batch_size))
+    if len(starts) > 1 and number_rows - starts[-1] < minimum_size:
+        del starts[-1]
+    return list(zip(starts, starts[1:] + [number_rows]))
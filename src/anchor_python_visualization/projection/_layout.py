@@ -0,0 +1,44 @@
+"""Reads and writes a projection (layout) to a CSV file, so a later projection can start from it."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def read_previous_positions(
+    path: str, index: pd.Index
+) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """Reads the position of each row in a previous layout, if the row (and layout) exist.
+
+    Args:
+        path: the path to a CSV file, as written by :func:`write_layout`.
+        index: the row names, whose positions are read, matched as strings.
+
+    Returns:
+        the position of each row (or NaN, if it is not in the layout) or None if the layout does not
+        exist, and whether each row is in the layout.
+    """
+    if not os.path.isfile(path):
+        return None, np.zeros(len(index), dtype=bool)
+
+    layout = pd.read_csv(path, index_col=0)
+    layout.index = layout.index.astype(str)
+    positions = layout.reindex(index.astype(str)).to_numpy(dtype=np.float64)
+    return positions, ~np.isnan(positions).any(axis=1)
+
+
+def write_layout(projected: pd.DataFrame, path: str) -> None:
+    """Writes a layout to a CSV file, with the name of each row as the first column.
+
+    It is written to a temporary file, and then renamed, so a partially written layout is never read.
+    """
+    temporary = path + ".tmp"
+    projected.to_csv(temporary, index=True, index_label="identifier")
+    os.replace(temporary, path)
@@ -0,0 +1,264 @@
+"""Performs several projections concurrently, sharing a single copy of the feature-values."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .projector import Projector
+
+SEPARATOR_PROJECTION: str = "/"
+"""Separates the name of a projection from the name of each of its columns e.g. :code:`pca/PCA0`."""
+
+NAME_SINGLE_PROJECTION: str = "embedding"
+"""The name of a projection, when its columns have no name of a projection as a prefix."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _SharedFeatures:
+    """Describes feature-values in shared memory, so a worker process can access them without copying."""
+
+    memory_name: str
+    """The name of the block of shared memory."""
+
+    shape: Tuple[int, int]
+    """The number of rows and columns of the matrix of feature-values."""
+
+    dtype: np.dtype
+    """The type of each feature-value."""
+
+    columns: List[str]
+    """The name of each column."""
+
+    index: pd.Index
+    """The name of each row, as a projection may depend upon them (e.g. to match a previous layout)."""
+
+
+@dataclasses.dataclass(frozen=True)
+class MultipleProjections(Projector):
+    """Performs several projections, each in a separate worker process, and combines their columns.
+
+    The feature-values are placed once in shared memory, which each worker accesses without
+    copying. Each column of the combined projection is named after its projection, followed by
+    :const:`SEPARATOR_PROJECTION` and the name of the column e.g. :code:`pca/PCA0`. See
+    :func:`split_projections` to separate them again.
+    """
+
+    projectors: Tuple[Projector, ...]
+    """The projections to perform."""
+
+    names: Tuple[str, ...]
+    """A unique name for each projection in :attr:`projectors`, in the same order."""
+
+    number_workers: Optional[int] = None
+    """The maximum number of worker processes. If None, the number of processors."""
+
+    # Overriding a method in a base class
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        return self._project_all(features, None)
+
+    # Overriding a method in a base class
+    def project_labelled(
+        self, features: pd.DataFrame, label_codes: np.ndarray
+    ) -> pd.DataFrame:
+        return self._project_all(features, label_codes)
+
+    # Overriding a method in a base class
+    def paths_read(self) -> List[str]:
+        return [
+            path for projector in self.projectors for path in projector.paths_read()
+        ]
+
+    # Overriding a method in a base class
+    def paths_written(self) -> List[str]:
+        return [
+            path for projector in self.projectors for path in projector.paths_written()
+        ]
+
+    def _project_all(
+        self, features: pd.DataFrame, label_codes: Optional[np.ndarray]
+    ) -> pd.DataFrame:
+        """Performs each projection, concurrently if there are several, and combines the columns."""
+        if len(self.projectors) == 1 or self.number_workers == 1:
+            projections = [
+                _project(projector, features, label_codes)
+                for projector in self.projectors
+            ]
+        else:
+            projections = self._project_concurrently(features, label_codes)
+
+        return combine_projections(dict(zip(self.names, projections)), features.index)
+
+    def _project_concurrently(
+        self, features: pd.DataFrame, label_codes: Optional[np.ndarray]
+    ) -> List[pd.DataFrame]:
+        """Performs each projection in a separate worker process, with the features in shared memory."""
+        # Not copied, if all columns have the same type (e.g. memory-mapped)
+        matrix = features.to_numpy()
+
+        memory = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        try:
+            shared = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=memory.buf)
+            shared[:] = matrix
+            del shared
+
+            description = _SharedFeatures(
+                memory.name,
+                matrix.shape,
+                matrix.dtype,
+                list(map(str, features.columns)),
+                features.index,
+            )
+            print("Performing {} projections in parallel".format(len(self.projectors)))
+            # Spawned rather than forked, as forking after threads have started (e.g. by a
+            # preceding projection) may deadlock
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_workers_for(
+                    self.number_workers, len(self.projectors)
+                ),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _project_shared, description, projector, label_codes
+                    )
+                    for projector in self.projectors
+                ]
+                return [future.result() for future in futures]
+        finally:
+            _close(memory)
+            memory.unlink()
+
+
+def combine_projections(
+    projections: Dict[str, pd.DataFrame], index: pd.Index
+) -> pd.DataFrame:
+    """Combines the columns of several projections, each prefixed by the name of its projection.
+
+    Args:
+        projections: the projections (each with the same number of rows), keyed by name.
+        index: the row names to assign to the combined projection.
+
+    Returns:
+        a data-frame with the columns of each projection in turn, which :func:`split_projections`
+        separates again.
+    """
+    return pd.concat(
+        [
+            projected.set_axis(
+                [
+                    name + SEPARATOR_PROJECTION + str(column)
+                    for column in projected.columns
+                ],
+                axis=1,
+            ).set_axis(index, axis=0)
+            for name, projected in projections.items()
+        ],
+        axis=1,
+    )
+
+
+def split_projections(projected: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Separates the columns of each projection, as combined by :class:`MultipleProjections`.
+
+    Args:
+        projected: a data-frame of projected embeddings.
+
+    Returns:
+        the columns of each projection (without the name of the projection), keyed by the name of
+        the projection, in the order they first occur. If the columns have no names of projections
+        (i.e. a single projection), they are unchanged and keyed by :const:`NAME_SINGLE_PROJECTION`.
+    """
+    columns = list(map(str, projected.columns))
+    if not all(SEPARATOR_PROJECTION in column for column in columns):
+        return {NAME_SINGLE_PROJECTION: projected}
+
+    split: Dict[str, List[int]] = {}
+    for index, column in enumerate(columns):
+        name = column.rpartition(SEPARATOR_PROJECTION)[0]
+        split.setdefault(name, []).append(index)
+
+    return {
+        name: projected.iloc[:, indices].set_axis(
+            [columns[index][len(name) + 1 :] for index in indices], axis=1
+        )
+        for name, indices in split.items()
+    }
+
+
+def _project(
+    projector: Projector, features: pd.DataFrame, label_codes: Optional[np.ndarray]
+) -> pd.DataFrame:
+    """Performs a projection, passing the labels, if they are known."""
+    if label_codes is not None:
+        return projector.project_labelled(features, label_codes)
+    else:
+        return projector.project(features)
+
+
+def _project_shared(
+    description: _SharedFeatures,
+    projector: Projector,
+    label_codes: Optional[np.ndarray],
+) -> pd.DataFrame:
+    """Performs a projection in a worker process, on feature-values in shared memory.
+
+    The row names of the projection are not transferred back from the worker, and are assigned
+    afterwards.
+    """
+    memory = shared_memory.SharedMemory(name=description.memory_name)
+    matrix = features = None
+    try:
+        matrix = np.ndarray(
+            description.shape, dtype=description.dtype, buffer=memory.buf
+        )
+        features = pd.DataFrame(
+            matrix, columns=description.columns, index=description.index, copy=False
+        )
+        projected = _project(projector, features, label_codes)
+        # Ensure the projection does not refer to the shared memory, which is about to be closed
+        projected = projected.set_axis(
+            pd.RangeIndex(len(projected.index)), axis=0
+        ).copy()
+    finally:
+        del features, matrix
+        _close(memory)
+    return projected
+
+
+def _close(memory: shared_memory.SharedMemory) -> None:
+    """Closes shared memory, unless views of it still exist.
+
+    This occurs when a projection raises an error, whose traceback still refers to the
+    feature-values. The memory is then instead released when the views are garbage-collected, so
+    that the original error is reported.
+    """
+    try:
+        memory.close()
+    except BufferError:
+        pass
+
+
+def number_workers_for(number_workers: Optional[int], number_projections: int) -> int:
+    """The number of worker processes, which is never more than the number of projections.
+
+    Args:
+        number_workers: the maximum number of worker processes. If None, the number of processors.
+        number_projections: the number of projections to perform in parallel.
+
+    Returns:
+        the number of worker processes to use.
+    """
+    if number_workers is None:
+        number_workers = os.cpu_count() or 1
+    return min(number_workers, number_projections)
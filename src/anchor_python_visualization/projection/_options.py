@@ -0,0 +1,126 @@
+"""Creates a projector with options specified as strings, e.g. from the command-line."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+import typing
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+T = TypeVar("T")
+
+SEPARATOR_OPTION: str = "="
+"""Separates the name of an option from its value e.g. :code:`solver=randomized`."""
+
+SEPARATOR_SEQUENCE: str = ","
+"""Separates successive elements of an option with several values e.g. :code:`perplexities=5,30,50`."""
+
+_VALUES_TRUE = ["true", "yes", "1"]
+"""Case-insensitive strings that indicate a boolean option is true."""
+
+_VALUES_FALSE = ["false", "no", "0"]
+"""Case-insensitive strings that indicate a boolean option is false."""
+
+_VALUE_NONE = "none"
+"""A case-insensitive string that indicates an optional option is unset."""
+
+
+def parse_options(pairs: Optional[List[str]]) -> Dict[str, str]:
+    """Parses options, each in the form :code:`name=value`.
+
+    Args:
+        pairs: the options, each a name and a value separated by :const:`SEPARATOR_OPTION`, or None.
+
+    Returns:
+        a dictionary mapping each name to its (unconverted) value.
+
+    Raises:
+        ValueError: if an option has no separator.
+    """
+    options = {}
+    for pair in pairs or []:
+        name, separator, value = pair.partition(SEPARATOR_OPTION)
+        if not separator:
+            raise ValueError(
+                "An option must be of the form name{}value, but is: {}".format(
+                    SEPARATOR_OPTION, pair
+                )
+            )
+        options[name.strip()] = value.strip()
+    return options
+
+
+def create_with_options(cls: Type[T], options: Dict[str, str]) -> T:
+    """Creates a dataclass, converting each option to the type of the field with the same name.
+
+    Args:
+        cls: the dataclass to create.
+        options: a value (as a string) for some of the fields of the dataclass. Other fields keep
+            their default values.
+
+    Returns:
+        a newly created instance of :code:`cls`.
+
+    Raises:
+        ValueError: if an option does not correspond to a field, cannot be converted to its type, or
+            repeats a value in a sequence.
+    """
+    types = typing.get_type_hints(cls)
+    names = [field.name for field in dataclasses.fields(cls) if field.init]
+
+    arguments = {}
+    for name, value in options.items():
+        if name not in names:
+            raise ValueError(
+                "Unknown option '{}' for {}. Valid options are: {}".format(
+                    name, cls.__name__, ", ".join(names)
+                )
+            )
+        arguments[name] = _convert(value, types[name], name)
+    return cls(**arguments)
+
+
+def _convert(value: str, to_type: Any, name: str) -> Any:
+    """Converts a string to a particular type, including :code:`Optional` types."""
+    arguments = typing.get_args(to_type)
+    if typing.get_origin(to_type) is typing.Union and type(None) in arguments:
+        if value.casefold() == _VALUE_NONE:
+            return None
+        to_type = next(argument for argument in arguments if argument is not type(None))
+
+    if typing.get_origin(to_type) is tuple:
+        element_type = typing.get_args(to_type)[0]
+        elements = tuple(
+            _convert(element.strip(), element_type, name)
+            for element in value.split(SEPARATOR_SEQUENCE)
+        )
+        if len(set(elements)) != len(elements):
+            raise ValueError(
+                "The option '{}' cannot repeat a value: {}".format(name, value)
+            )
+        return elements
+
+    try:
+        if to_type is bool:
+            return _convert_bool(value)
+        else:
+            return to_type(value)
+    except ValueError as error:
+        raise ValueError(
+            "The option '{}' cannot be {}: {}".format(name, value, error)
+        ) from error
+
+
+def _convert_bool(value: str) -> bool:
+    """Converts a string to a boolean."""
+    value = value.casefold()
+    if value in _VALUES_TRUE:
+        return True
+    elif value in _VALUES_FALSE:
+        return False
+    else:
+        raise ValueError(
+            "expected one of {}".format(", ".join(_VALUES_TRUE + _VALUES_FALSE))
+        )
@@ -6,13 +6,23 @@ __license__ = "MIT"
 __version__ = "0.1"
 
 import dataclasses
+from typing import Any, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from sklearn import decomposition
 
 from ._derive_utilities import derive_projected
+from ._fitted_estimator import FittedEstimator
+from .fitted import FittedProjection
 from .projector import Projector
 
+SOLVER_TRUNCATED = "truncated"
+"""Selects a truncated SVD, which does not require the feature-values to be centered."""
+
+SOLVERS_UNCENTERED = ["auto", "randomized", "arpack", SOLVER_TRUNCATED]
+"""The solvers that a truncated SVD supports, so are allowed when not centering."""
+
 
 @dataclasses.dataclass(frozen=True)
 class PCAProjection(Projector):
@@ -24,11 +34,35 @@ class PCAProjection(Projector):
     number_components: int = 2
     """Target number of dimensions for the PCA projection"""
 
+    solver: str = "auto"
+    """The solver used for the singular value decomposition, as in :class:`sklearn.decomposition.PCA`.
+
+    e.g. :code:`randomized` to approximate only the first few components, which is much faster for
+    many features. Alternatively :const:`SOLVER_TRUNCATED` for a (randomized) truncated SVD as in
+    :class:`sklearn.decomposition.TruncatedSVD`.
+    """
+
+    oversamples: int = 10
+    """Additional random vectors to sample, beyond :attr:`number_components`, for randomized solvers."""
+
+    power_iterations: Optional[int] = None
+    """The number of power iterations for randomized solvers. If None, scikit-learn's default."""
+
+    single_precision: bool = True
+    """Whether to compute in single-precision (rather than double-precision), using half the memory."""
+
+    center: bool = True
+    """Whether to subtract the mean of each feature (as PCA requires), but never scale.
+
+    If False, a truncated SVD occurs on the feature-values unchanged, which only supports the
+    solvers in :const:`SOLVERS_UNCENTERED` (randomized, unless :code:`arpack`).
+    """
+
     # Overriding a method in a base class
     def project(self, features: pd.DataFrame) -> pd.DataFrame:
 
-        pca = decomposition.PCA(n_components=self.number_components)
-        projection = pca.fit_transform(features)
+        pca, matrix, _ = self._prepare(features)
+        projection = pca.fit_transform(matrix)
 
         print(
             "Total Explained variation: {}".format(pca.explained_variance_ratio_.sum())
@@ -36,3 +70,64 @@ class PCAProjection(Projector):
 
         # Convert back into a data-frame, assigning feature-names for each component
         return derive_projected(features, projection, "PCA")
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        pca, matrix, mean = self._prepare(features)
+        pca.fit(matrix)
+
+        print(
+            "Total Explained variation: {}".format(pca.explained_variance_ratio_.sum())
+        )
+        return FittedEstimator(pca, "PCA", matrix.dtype, mean)
+
+    def _prepare(
+        self, features: pd.DataFrame
+    ) -> Tuple[Any, np.ndarray, Optional[np.ndarray]]:
+        """Creates the (unfitted) estimator, and the matrix of feature-values to fit it to.
+
+        Returns:
+            the estimator, the matrix (centered beforehand, if the estimator does not center) and the
+            mean subtracted to center it beforehand (if any).
+
+        Raises:
+            ValueError: if not centering, with a solver that a truncated SVD does not support.
+        """
+        solver = self.solver.casefold()
+        if not self.center and solver not in SOLVERS_UNCENTERED:
+            raise ValueError(
+                "The solver '{}' is not supported without centering. Valid solvers are: {}".format(
+                    self.solver, ", ".join(SOLVERS_UNCENTERED)
+                )
+            )
+
+        matrix = features.to_numpy(
+            dtype=np.float32 if self.single_precision else np.float64
+        )
+
+        if self.center and solver != SOLVER_TRUNCATED:
+            pca = decomposition.PCA(
+                n_components=self.number_components,
+                svd_solver=solver,
+                n_oversamples=self.oversamples,
+                iterated_power=_or_default(self.power_iterations, "auto"),
+                random_state=0,
+            )
+            return pca, matrix, None
+        else:
+            mean = matrix.mean(axis=0) if self.center else None
+            if mean is not None:
+                matrix = matrix - mean
+            pca = decomposition.TruncatedSVD(
+                n_components=self.number_components,
+                algorithm="arpack" if solver == "arpack" else "randomized",
+                n_oversamples=self.oversamples,
+                n_iter=_or_default(self.power_iterations, 5),
+                random_state=0,
+            )
+            return pca, matrix, mean
+
+
+def _or_default(value: Optional[int], default: Union[int, str]) -> Union[int, str]:
+    """The value, unless it is None, in which case the default."""
+    return value if value is not None else default
@@ -5,11 +5,25 @@ __copyright__ = "Copyright (C) 2021 Owen Feehan"
 __license__ = "MIT"
 __version__ = "0.1"
 
+import concurrent.futures
+import dataclasses
+import functools
+import multiprocessing
+from typing import List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from sklearn import decomposition
 from sklearn.manifold import TSNE
+from sklearn.neighbors import NearestNeighbors
 
 from ._derive_utilities import derive_projected
+from ._fitted_estimator import FittedEstimator, NeighborInterpolation
+from ._layout import read_previous_positions, write_layout
+from ._multiple import combine_projections, number_workers_for
 from ._pca import PCAProjection
+from .fitted import FittedProjection
 from .projector import Projector
 
 MAX_NUMBER_FEATURES_TSNE = 50
@@ -23,44 +37,462 @@ PERPLEXITY_TSNE = 30
 """The perplexity used by TSNE unlesss there are too few rows."""
 
 
+PREFIX_SWEEP = "perplexity="
+"""Prefixes the perplexity, to name each projection, when projecting with several perplexities."""
+
+
+SOLVER_PRE_REDUCTION = "randomized"
+"""The solver used by the PCA projection beforehand, which approximates only the first components."""
+
+
+NUMBER_NEIGHBORS_INTERPOLATION = 10
+"""The number of nearest fitted rows, whose projections are averaged to place a row out-of-sample."""
+
+
+ITERATIONS_RELAXATION = 250
+"""The number of iterations to optimize a projection that starts from a previous projection."""
+
+
+ITERATIONS_PLACEMENT = 100
+"""The number of iterations to optimize the positions of new rows, against the previous rows."""
+
+
+LEARNING_RATE_PLACEMENT = 1.0
+"""The learning rate to optimize the positions of new rows, against the previous rows."""
+
+
+_ITERATIONS_PERPLEXITY = 64
+"""The number of iterations of the binary search for affinities that match the perplexity."""
+
+
+_MAX_PAIRS_PLACEMENT = 1 << 22
+"""The maximum number of pairs of new and previous rows, that are repelled at a time."""
+
+
+@dataclasses.dataclass(frozen=True)
 class TSNEProjection(Projector):
     """Projects to two-dimensions using T-SNE
 
-    This is preceded by a PCA projection when ``num(embeddings) > MAX_NUM_FEATURES_TSNE``.
+    This is preceded by a PCA projection when ``num(embeddings) > pre_reduction_components``.
 
     It produces embeddings TSNE0 and TSNE1.
     """
 
+    pre_reduction_components: Optional[int] = MAX_NUMBER_FEATURES_TSNE
+    """If there are more features than this, they are first reduced to this many by PCA.
+
+    If None, T-SNE always occurs on all features.
+    """
+
+    perplexity: int = PERPLEXITY_TSNE
+    """The perplexity used by TSNE, unless there are too few rows."""
+
+    perplexities: Optional[Tuple[int, ...]] = None
+    """If set, a projection occurs for each of these perplexities (instead of :attr:`perplexity`).
+
+    The nearest neighbors are searched only once, for the largest perplexity, and the affinities for
+    each perplexity are derived from them. Each projection is named :code:`perplexity=` followed by
+    its perplexity, as in :func:`combine_projections`.
+    """
+
+    previous_layout: Optional[str] = None
+    """If set, a CSV file with a previous projection, from which the projection starts, if it exists.
+
+    Rows with the same names as in the previous projection keep their previous positions, and other
+    (new) rows are placed near their nearest previous rows, and then optimized against the previous
+    rows. So when rows are appended (e.g. daily), the projection is fast and stable. Afterwards, the
+    projection is written to this path, for the next time.
+    """
+
+    relax_previous: bool = False
+    """When starting from :attr:`previous_layout`, whether all rows are afterwards optimized (lightly)
+    together, rather than the previous rows remaining at their previous positions.
+
+    This recalculates the affinities between all rows, but optimizes without early exaggeration and
+    for only :const:`ITERATIONS_RELAXATION` iterations.
+    """
+
+    number_workers: Optional[int] = None
+    """The maximum number of worker processes to optimize :attr:`perplexities` in parallel.
+
+    If None, the number of processors.
+    """
+
     # Overriding a method in a base class
     def project(self, features: pd.DataFrame) -> pd.DataFrame:
 
         # If there are many embeddings, then use PCA first before T-SNE as per recommendation in
         # documentation
         # https://scikit-learn.org/stable/modules/generated/sklearn.manifold.TSNE.html
-        features = _maybe_project(features)
+        reduced = self._maybe_pre_reduce(features)
 
-        perplexity = _calculate_perplexity(features)
+        if self.perplexities is not None:
+            if self.previous_layout is not None:
+                raise ValueError(
+                    "A projection for several perplexities cannot start from a previous projection."
+                )
+            layouts = self._project_sweep(
+                reduced,
+                [
+                    _calculate_perplexity(reduced, perplexity)
+                    for perplexity in self.perplexities
+                ],
+            )
+            names = [PREFIX_SWEEP + str(perplexity) for perplexity in self.perplexities]
+            return combine_projections(
+                {
+                    name: derive_projected(features, layout, "TSNE")
+                    for name, layout in zip(names, layouts)
+                },
+                features.index,
+            )
 
-        tsne = TSNE(n_components=2, random_state=0, verbose=1, perplexity=perplexity)
-        projection = tsne.fit_transform(features)
+        if self.previous_layout is not None:
+            projected = derive_projected(
+                features, self._project_incremental(reduced), "TSNE"
+            )
+            write_layout(projected, self.previous_layout)
+            return projected
+
+        projection = self._project_reduced(reduced)
         # Convert back into a data-frame, assigning feature-names for each component
         return derive_projected(features, projection, "TSNE")
 
+    # Overriding a method in a base class
+    def paths_read(self) -> List[str]:
+        return self._paths_layout()
+
+    # Overriding a method in a base class
+    def paths_written(self) -> List[str]:
+        return self._paths_layout()
+
+    def _paths_layout(self) -> List[str]:
+        """The path to the previous layout (which is read, and then written), if any."""
+        return [self.previous_layout] if self.previous_layout is not None else []
+
+    def _project_incremental(self, reduced: pd.DataFrame) -> np.ndarray:
+        """Projects the features (after any reduction by PCA), starting from a previous layout."""
+        positions, previous = read_previous_positions(
+            self.previous_layout, reduced.index
+        )
+        if not previous.any():
+            print(
+                "No previous projection at {}, so projecting all rows.".format(
+                    self.previous_layout
+                )
+            )
+            return self._project_reduced(reduced)
+
+        print(
+            "Placing {} new rows into the previous projection of {} rows".format(
+                np.count_nonzero(~previous), np.count_nonzero(previous)
+            )
+        )
+        if previous.all() and not self.relax_previous:
+            return positions
+        return self._place_new(reduced, positions, previous)
+
+    def _place_new(
+        self, reduced: pd.DataFrame, positions: np.ndarray, previous: np.ndarray
+    ) -> np.ndarray:
+        """Places new rows near their nearest previous rows, and optimizes their positions.
+
+        Only the new rows are optimized, against the previous rows, which remain in place (see
+        :func:`_optimize_new`). If :attr:`relax_previous`, all rows are then optimized (lightly)
+        from these positions.
+
+        Args:
+            reduced: the features (after any reduction by PCA) of all rows.
+            positions: the previous position of each row, or NaN for new rows.
+            previous: whether each row has a previous position.
+
+        Returns:
+            the position of each row.
+        """
+        matrix = reduced.to_numpy()
+        perplexity = _calculate_perplexity(reduced, self.perplexity)
+        start = _optimize_new(
+            matrix, _interpolate_new(matrix, positions, previous), previous, perplexity
+        )
+        if not self.relax_previous:
+            return start
+
+        # Without early exaggeration, and with a smaller learning rate and fewer iterations than
+        # usual, so rows move little from where they start
+        tsne = TSNE(
+            n_components=2,
+            init=start,
+            early_exaggeration=1.0,
+            learning_rate=max(len(matrix) / 48, 50),
+            max_iter=ITERATIONS_RELAXATION,
+            random_state=0,
+            verbose=1,
+            perplexity=perplexity,
+        )
+        return tsne.fit_transform(matrix)
+
+    def _project_reduced(self, reduced: pd.DataFrame) -> np.ndarray:
+        """Projects the features, after any reduction by PCA."""
+        perplexity = _calculate_perplexity(reduced, self.perplexity)
+
+        tsne = TSNE(n_components=2, random_state=0, verbose=1, perplexity=perplexity)
+        return tsne.fit_transform(reduced)
+
+    def _project_sweep(
+        self, reduced: pd.DataFrame, perplexities: List[int]
+    ) -> List[np.ndarray]:
+        """Projects the features (after any reduction by PCA) with each perplexity.
+
+        The nearest neighbor graph is computed once, with as many neighbors as the largest
+        perplexity requires, and each projection is optimized in a separate worker process.
+        """
+        matrix = reduced.to_numpy()
+        # Each row is included as its own neighbor, which scikit-learn expects and then discards
+        number_neighbors = min(len(matrix), 3 * max(perplexities) + 2)
+        graph = (
+            NearestNeighbors(n_neighbors=number_neighbors)
+            .fit(matrix)
+            .kneighbors_graph(matrix, mode="distance")
+        )
+        # As scikit-learn uses squared euclidean distances
+        graph.data **= 2
+
+        # Every projection starts identically, from the first principal components
+        initialization = decomposition.PCA(2, random_state=0).fit_transform(matrix)
+        initialization = initialization / np.std(initialization[:, 0]) * 1e-4
+
+        optimize = functools.partial(_optimize_precomputed, graph, initialization)
+        if len(perplexities) == 1 or self.number_workers == 1:
+            return [optimize(perplexity) for perplexity in perplexities]
+
+        print(
+            "Optimizing a projection for each of {} perplexities in parallel".format(
+                len(perplexities)
+            )
+        )
+        # Spawned rather than forked, as forking after threads have started may deadlock
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=number_workers_for(self.number_workers, len(perplexities)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            return list(executor.map(optimize, perplexities))
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        return self.fit_project(features)[0]
+
+    # Overriding a method in a base class
+    def fit_project(
+        self, features: pd.DataFrame
+    ) -> Tuple[FittedProjection, pd.DataFrame]:
+        """Fits T-SNE, placing further rows by interpolating from their nearest fitted rows.
+
+        T-SNE in scikit-learn cannot project rows it was not fitted on, so instead each row is placed
+        at a weighted average of the projections of its nearest fitted rows. The fitted rows keep
+        their optimized positions.
+        """
+        self._check_fittable()
+        pre_reduction, reduced = self._fit_pre_reduction(features)
+
+        perplexity = _calculate_perplexity(reduced, self.perplexity)
+
+        tsne = TSNE(n_components=2, random_state=0, verbose=1, perplexity=perplexity)
+        matrix = reduced.to_numpy()
+        projection = tsne.fit_transform(matrix)
+        interpolation = NeighborInterpolation(
+            matrix, projection, NUMBER_NEIGHBORS_INTERPOLATION
+        )
+        return (
+            FittedEstimator(interpolation, "TSNE", pre_reduction=pre_reduction),
+            derive_projected(features, projection, "TSNE"),
+        )
+
+    def _check_fittable(self) -> None:
+        """Raises an error if a projection occurs for several perplexities, or from a previous
+        layout, as it cannot be fitted."""
+        if self.perplexities is not None or self.previous_layout is not None:
+            raise ValueError(
+                "A projection for several perplexities, or from a previous projection, cannot be"
+                " fitted separately."
+            )
+
+    def _maybe_pre_reduce(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Reduces the number of columns by PCA projection if there are too many."""
+        pca = self._pre_reduction(features)
+        if pca is not None:
+            return pca.project(features)
+        else:
+            return features
+
+    def _fit_pre_reduction(
+        self, features: pd.DataFrame
+    ) -> Tuple[Optional[FittedProjection], pd.DataFrame]:
+        """Fits a PCA projection to reduce the number of columns, if there are too many.
+
+        Returns:
+            the fitted PCA projection (if any), and the features reduced by it.
+        """
+        pca = self._pre_reduction(features)
+        if pca is not None:
+            fitted = pca.fit(features)
+            return fitted, fitted.transform(features)
+        else:
+            return None, features
+
+    def _pre_reduction(self, features: pd.DataFrame) -> Optional[PCAProjection]:
+        """The PCA projection to reduce the number of columns beforehand, if there are too many."""
+        if (
+            self.pre_reduction_components is not None
+            and len(features.columns) > self.pre_reduction_components
+        ):
+            # PCA cannot produce more components than there are rows
+            number_components = min(self.pre_reduction_components, len(features.index))
+            return PCAProjection(number_components, SOLVER_PRE_REDUCTION)
+        else:
+            return None
+
+
+def _interpolate_new(
+    matrix: np.ndarray, positions: np.ndarray, previous: np.ndarray
+) -> np.ndarray:
+    """Places each new row at a weighted average of the positions of its nearest previous rows."""
+    placed = positions.copy()
+    if not previous.all():
+        interpolation = NeighborInterpolation(
+            matrix[previous], positions[previous], NUMBER_NEIGHBORS_INTERPOLATION
+        )
+        placed[~previous] = interpolation.transform(matrix[~previous])
+    return placed
+
+
+def _optimize_new(
+    matrix: np.ndarray, positions: np.ndarray, previous: np.ndarray, perplexity: int
+) -> np.ndarray:
+    """Optimizes the positions of new rows, against the previous rows, which remain in place.
+
+    As in openTSNE, when adding rows to an existing projection, each new row is attracted to its
+    nearest previous rows (with affinities that match the perplexity), and repelled by all previous
+    rows, but the new rows neither attract nor repel each other.
+
+    Args:
+        matrix: the features (after any reduction by PCA) of all rows.
+        positions: the position of each row, from which the new rows start.
+        previous: whether each row has a previous position.
+        perplexity: the perplexity, that determines how many previous rows attract each new row.
+
+    Returns:
+        the position of each row.
+    """
+    if previous.all():
+        return positions
+
+    existing = positions[previous]
+    number_neighbors = min(3 * perplexity, len(existing))
+    distances, neighbors = (
+        NearestNeighbors(n_neighbors=number_neighbors)
+        .fit(matrix[previous])
+        .kneighbors(matrix[~previous])
+    )
+    affinities = _affinities_for_perplexity(distances**2, perplexity)
+
+    placed = positions.copy()
+    new = positions[~previous]
+    # The gradient is calculated for a batch of new rows at a time, to limit memory
+    batch_size = max(_MAX_PAIRS_PLACEMENT // len(existing), 1)
+    for start in range(0, len(new), batch_size):
+        batch = slice(start, start + batch_size)
+        for _ in range(ITERATIONS_PLACEMENT):
+            new[batch] -= LEARNING_RATE_PLACEMENT * _gradient_new(
+                new[batch], existing, affinities[batch], neighbors[batch]
+            )
+    placed[~previous] = new
+    return placed
+
+
+def _affinities_for_perplexity(
+    squared_distances: np.ndarray, perplexity: int
+) -> np.ndarray:
+    """The affinity of each row to each of its neighbors, as a gaussian of their distance.
+
+    The precision of the gaussian for each row is found by a binary search, so that the entropy of
+    the affinities matches the perplexity (as in T-SNE), and the affinities of each row sum to one.
+
+    Args:
+        squared_distances: the squared distance from each row (rows) to each of its neighbors
+            (columns).
+        perplexity: the perplexity to match.
+
+    Returns:
+        the affinities, with the same shape as :code:`squared_distances`.
+    """
+    # Relative to the nearest neighbor, for numerical stability
+    distances = squared_distances - squared_distances.min(axis=1, keepdims=True)
+    target = np.log(perplexity)
+
+    precision = np.ones(len(distances))
+    lower = np.zeros(len(distances))
+    upper = np.full(len(distances), np.inf)
+    for _ in range(_ITERATIONS_PERPLEXITY):
+        affinities = np.exp(-distances * precision[:, np.newaxis])
+        total = affinities.sum(axis=1)
+        affinities /= total[:, np.newaxis]
+        entropy = np.log(total) + precision * (distances * affinities).sum(axis=1)
+
+        # A greater precision reduces the entropy
+        too_broad = entropy > target
+        lower = np.where(too_broad, precision, lower)
+        upper = np.where(too_broad, upper, precision)
+        precision = np.where(np.isinf(upper), 2 * precision, (lower + upper) / 2)
+    return affinities
+
+
+def _gradient_new(
+    new: np.ndarray, existing: np.ndarray, affinities: np.ndarray, neighbors: np.ndarray
+) -> np.ndarray:
+    """The gradient of the T-SNE objective for the positions of new rows, against fixed rows.
+
+    Args:
+        new: the position of each new row.
+        existing: the position of each previous row.
+        affinities: the affinity of each new row to each of its nearest previous rows.
+        neighbors: the index (in :code:`existing`) of each of the nearest previous rows.
+
+    Returns:
+        the gradient for each new row, with the same shape as :code:`new`.
+    """
+    # Attraction to the nearest previous rows
+    offset = new[:, np.newaxis] - existing[neighbors]
+    kernel = 1.0 / (1.0 + np.sum(offset**2, axis=2))
+    attraction = np.einsum("ij,ijk->ik", affinities * kernel, offset)
+
+    # Repulsion from all previous rows
+    offset = new[:, np.newaxis] - existing[np.newaxis]
+    kernel = 1.0 / (1.0 + np.sum(offset**2, axis=2))
+    repulsion = np.einsum("ij,ijk->ik", kernel**2, offset) / kernel.sum(
+        axis=1, keepdims=True
+    )
+    return 4 * (attraction - repulsion)
+
 
-def _maybe_project(features: pd.DataFrame) -> pd.DataFrame:
-    """Reduces the number of columns by PCA projection if there are too many."""
-    number_columns = len(features.columns)
-    if number_columns > MAX_NUMBER_FEATURES_TSNE:
-        pca = PCAProjection(2)
-        pca.project(features)
-    else:
-        return features
+def _optimize_precomputed(
+    graph: sparse.csr_matrix, initialization: np.ndarray, perplexity: int
+) -> np.ndarray:
+    """Optimizes a T-SNE projection from a precomputed nearest neighbor graph."""
+    tsne = TSNE(
+        n_components=2,
+        metric="precomputed",
+        init=initialization,
+        random_state=0,
+        verbose=1,
+        perplexity=perplexity,
+    )
+    return tsne.fit_transform(graph)
 
 
-def _calculate_perplexity(features: pd.DataFrame) -> int:
+def _calculate_perplexity(features: pd.DataFrame, perplexity: int) -> int:
     """Adjust the perplexity if there are too few values.
 
     TSNE requires perplexity to be no greater than the number of inputted rows.
     """
     number_rows = len(features.index)
-    return min(PERPLEXITY_TSNE, number_rows - 1)
+    return min(perplexity, number_rows - 1)
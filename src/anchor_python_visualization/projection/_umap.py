@@ -0,0 +1,83 @@
+"""UMAP projection."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import dataclasses
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+
+from ._derive_utilities import derive_projected
+from ._fitted_estimator import FittedEstimator
+from .fitted import FittedProjection
+from .projector import Projector
+
+NUMBER_NEIGHBORS_UMAP = 15
+"""The number of neighbors used by UMAP, unless there are too few rows."""
+
+
+@dataclasses.dataclass(frozen=True)
+class UMAPProjection(Projector):
+    """Projects to a lower dimensional feature-space using `UMAP <https://umap-learn.readthedocs.io>`_.
+
+    The (approximate) nearest neighbor graph is constructed, and the embedding optimized, across
+    several cores. This requires the umap-learn package.
+
+    It produces embeddings UMAP0, UMAP1 etc.
+    """
+
+    number_components: int = 2
+    """Target number of dimensions for the projection."""
+
+    number_neighbors: int = NUMBER_NEIGHBORS_UMAP
+    """The size of the local neighborhood (:code:`n_neighbors` in umap-learn), unless there are too few rows.
+
+    Larger values preserve more global structure, and smaller values more local structure.
+    """
+
+    min_distance: float = 0.1
+    """How tightly points may be packed together in the projection (:code:`min_dist` in umap-learn)."""
+
+    number_jobs: int = -1
+    """The number of threads to use, or -1 to use all cores."""
+
+    seed: Optional[int] = None
+    """If set, a seed so the projection is reproducible, but then only a single thread is used."""
+
+    # Overriding a method in a base class
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        # Not copied, if all columns have the same type
+        projection = self._create(features).fit_transform(features.to_numpy())
+        # Convert back into a data-frame, assigning feature-names for each component
+        return derive_projected(features, projection, "UMAP")
+
+    # Overriding a method in a base class
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        return self.fit_project(features)[0]
+
+    # Overriding a method in a base class
+    def fit_project(
+        self, features: pd.DataFrame
+    ) -> Tuple[FittedProjection, pd.DataFrame]:
+        """Fits UMAP, with the fitted rows keeping their optimized positions."""
+        umap = self._create(features)
+        umap.fit(features.to_numpy())
+        return FittedEstimator(umap, "UMAP"), derive_projected(
+            features, umap.embedding_, "UMAP"
+        )
+
+    def _create(self, features: pd.DataFrame) -> Any:
+        """Creates the (unfitted) UMAP from umap-learn."""
+        from umap import UMAP
+
+        return UMAP(
+            n_components=self.number_components,
+            n_neighbors=min(self.number_neighbors, len(features.index) - 1),
+            min_dist=self.min_distance,
+            n_jobs=self.number_jobs,
+            random_state=self.seed,
+            verbose=True,
+        )
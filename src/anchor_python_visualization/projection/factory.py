@@ -5,13 +5,20 @@ __copyright__ = "Copyright (C) 2021 Owen Feehan"
 __license__ = "MIT"
 __version__ = "0.1"
 
-from typing import Optional
+import dataclasses
+import os
+from typing import Dict, List, Optional
 
-from ._pca import PCAProjection
-from ._tsne import TSNEProjection
+from ._multiple import MultipleProjections, number_workers_for
+from ._options import (
+    SEPARATOR_OPTION,
+    SEPARATOR_SEQUENCE,
+    create_with_options,
+    parse_options,
+)
 from .projector import Projector
 
-IDENTIFIERS = ["t-sne", "pca", "none"]
+IDENTIFIERS = ["t-sne", "pca", "none", "incremental-pca", "fft-t-sne", "umap"]
 """Unique strings to use as command-line-arguments to select a :class:`Projector`.
 
 All are lower-case.
@@ -22,21 +29,130 @@ DEFAULT_IDENTIFIER = "t-sne"
 """The default choice to use in :const:`IDENTIFIERS`."""
 
 
-def create_projector(identifier: str) -> Optional[Projector]:
+SEPARATOR_IDENTIFIER: str = ":"
+"""Separates an identifier from its options, when several projections are specified.
+
+e.g. :code:`t-sne:perplexity=5,pre_reduction_components=20`.
+"""
+
+
+SEPARATOR_OPTIONS: str = ","
+"""Separates successive options (each :code:`name=value`), when several projections are specified.
+
+As this is identical to :const:`SEPARATOR_SEQUENCE`, an element without a :const:`SEPARATOR_OPTION`
+continues the value of the preceding option e.g. :code:`t-sne:perplexities=5,30,pre_reduction_components=20`.
+"""
+
+
+def create_projector(
+    identifier: str, options: Optional[Dict[str, str]] = None
+) -> Optional[Projector]:
     """Creates a projection method from an identifier.
 
     Args:
         identifier: string that is one of :const:`IDENTIFIERS`, case-insensitive.
+        options: values (as strings) for fields of the projection method, which otherwise keep their
+            default values e.g. :code:`{"pre_reduction_components": "50"}` for t-SNE.
 
     Returns:
         a newly created projection method, or none at all.
     """
+    # Each projection method is only imported when selected, as their dependencies (e.g. scikit-learn)
+    # are slow to import
     identifier = identifier.casefold()
+    options = options or {}
     if identifier == IDENTIFIERS[0]:
-        return TSNEProjection()
+        from ._tsne import TSNEProjection
+
+        return create_with_options(TSNEProjection, options)
     elif identifier == IDENTIFIERS[1]:
-        return PCAProjection()
+        from ._pca import PCAProjection
+
+        return create_with_options(PCAProjection, options)
     elif identifier == IDENTIFIERS[2]:
+        if options:
+            raise ValueError("No options are accepted, when there is no projection.")
         return None
+    elif identifier == IDENTIFIERS[3]:
+        from ._incremental_pca import IncrementalPCAProjection
+
+        return create_with_options(IncrementalPCAProjection, options)
+    elif identifier == IDENTIFIERS[4]:
+        from ._fft_tsne import FFTTSNEProjection
+
+        return create_with_options(FFTTSNEProjection, options)
+    elif identifier == IDENTIFIERS[5]:
+        from ._umap import UMAPProjection
+
+        return create_with_options(UMAPProjection, options)
     else:
         raise ValueError("Unknown identifier for projection: {}".format(identifier))
+
+
+def create_multiple(
+    specifications: List[str], number_workers: Optional[int] = None
+) -> MultipleProjections:
+    """Creates several projection methods, to be performed concurrently.
+
+    Args:
+        specifications: each an identifier (one of :const:`IDENTIFIERS`, except :code:`none`),
+            optionally followed by :const:`SEPARATOR_IDENTIFIER` and options separated by
+            :const:`SEPARATOR_OPTIONS` e.g. :code:`t-sne:perplexity=5`. Each specification also
+            names its projection, and identical specifications are only projected once.
+        number_workers: the maximum number of worker processes. If None, the number of processors.
+            Any processes a projection itself creates (e.g. a t-SNE with several perplexities) share
+            these, unless its :code:`number_workers` option is set.
+
+    Returns:
+        a newly created projection method, that combines the columns of each projection.
+
+    Raises:
+        ValueError: if an identifier is unknown or :code:`none`, or an option is invalid.
+    """
+    projectors = {}
+    for specification in specifications:
+        identifier, _, options = specification.partition(SEPARATOR_IDENTIFIER)
+        projector = create_projector(
+            identifier.strip(), parse_options(_split_options(options))
+        )
+        if projector is None:
+            raise ValueError(
+                "Each of several projections must project, but is: {}".format(
+                    specification
+                )
+            )
+        projectors[specification] = projector
+
+    # Divide the processes among the projections performed concurrently
+    total = number_workers or os.cpu_count() or 1
+    share = max(1, total // number_workers_for(total, len(projectors)))
+    return MultipleProjections(
+        tuple(_limit_workers(projector, share) for projector in projectors.values()),
+        tuple(projectors.keys()),
+        number_workers,
+    )
+
+
+def _limit_workers(projector: Projector, number_workers: int) -> Projector:
+    """Limits the worker processes a projection creates itself, unless its option is already set."""
+    if (
+        any(field.name == "number_workers" for field in dataclasses.fields(projector))
+        and projector.number_workers is None
+    ):
+        return dataclasses.replace(projector, number_workers=number_workers)
+    else:
+        return projector
+
+
+def _split_options(options: str) -> List[str]:
+    """Splits options (each :code:`name=value`) separated by :const:`SEPARATOR_OPTIONS`.
+
+    An element without :const:`SEPARATOR_OPTION` is another value of the preceding option.
+    """
+    pairs: List[str] = []
+    for element in options.split(SEPARATOR_OPTIONS) if options else []:
+        if SEPARATOR_OPTION not in element and pairs:
+            pairs[-1] += SEPARATOR_SEQUENCE + element
+        else:
+            pairs.append(element)
+    return pairs
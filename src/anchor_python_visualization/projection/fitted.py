@@ -0,0 +1,62 @@
+"""Abstract base class for a projection that has been fitted, and can project further rows."""
+
+__author__ = "Owen Feehan"
+__copyright__ = "Copyright (C) 2021 Owen Feehan"
+__license__ = "MIT"
+__version__ = "0.1"
+
+import pickle
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+
+class FittedProjection(ABC):
+    """Projects rows to lower dimensionality, as fitted (e.g. on a sample) by a :class:`Projector`.
+
+    It can be saved, and loaded later, so that further rows (e.g. new batches of embeddings) are
+    placed into the same projection, without fitting again.
+    """
+
+    @abstractmethod
+    def transform(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Projects rows, while preserving a data-frame with identical row names.
+
+        Args:
+            features: data_frame containing only numerical embeddings (as columns), identical to
+                those that were fitted, and with labelled row.names.
+
+        Returns:
+            a data-frame of embeddings with identical order and row names, but changed columns.
+        """
+        pass
+
+    def save(self, path: str) -> None:
+        """Saves to a file, so it can be loaded later with :func:`load_fitted`.
+
+        Args:
+            path: the path to write to, which is replaced if it exists.
+        """
+        with open(path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_fitted(path: str) -> FittedProjection:
+    """Loads a projection saved with :meth:`FittedProjection.save`.
+
+    As this unpickles the file, only load files from a trusted source.
+
+    Args:
+        path: the path to read from.
+
+    Returns:
+        the loaded projection.
+
+    Raises:
+        ValueError: if the file does not contain a fitted projection.
+    """
+    with open(path, "rb") as file:
+        fitted = pickle.load(file)
+    if not isinstance(fitted, FittedProjection):
+        raise ValueError("{} does not contain a fitted projection.".format(path))
+    return fitted
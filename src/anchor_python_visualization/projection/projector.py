@@ -6,9 +6,13 @@ __license__ = "MIT"
 __version__ = "0.1"
 
 from abc import ABC
+from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
 
+from .fitted import FittedProjection
+
 
 class Projector(ABC):
     """Projects the feature-space to lower dimensionality."""
@@ -24,3 +28,77 @@ class Projector(ABC):
             a data-frame of embeddings with identical order and row names, but changed columns.
         """
         pass
+
+    def project_labelled(
+        self, features: pd.DataFrame, label_codes: np.ndarray
+    ) -> pd.DataFrame:
+        """Performs projection, with the label of each row available e.g. to stratify a sample.
+
+        By default, the labels are ignored, and this is identical to :meth:`project`.
+
+        Args:
+            features: data_frame containing only numerical embeddings (as columns) and with labelled
+            row.names
+            label_codes: an integer code for the label of each row.
+
+        Returns:
+            a data-frame of embeddings with identical order and row names, but changed columns.
+        """
+        return self.project(features)
+
+    def fit(self, features: pd.DataFrame) -> FittedProjection:
+        """Fits the projection, so that it can later project these or other rows.
+
+        Args:
+            features: data_frame containing only numerical embeddings (as columns) and with labelled
+            row.names
+
+        Returns:
+            the fitted projection.
+
+        Raises:
+            NotImplementedError: if the projection method cannot project rows it was not fitted on.
+        """
+        raise NotImplementedError(
+            "{} cannot be fitted separately from projecting.".format(
+                self.__class__.__name__
+            )
+        )
+
+    def fit_project(
+        self, features: pd.DataFrame
+    ) -> Tuple[FittedProjection, pd.DataFrame]:
+        """Fits the projection, and also projects the rows it is fitted on.
+
+        Some projections (e.g. T-SNE) place the rows they are fitted on while fitting, better than
+        projecting them afterwards. By default, they are projected afterwards, like any other rows.
+
+        Args:
+            features: data_frame containing only numerical embeddings (as columns) and with labelled
+            row.names
+
+        Returns:
+            the fitted projection, and a data-frame of embeddings with identical order and row names
+            to :code:`features`, but changed columns.
+
+        Raises:
+            NotImplementedError: if the projection method cannot project rows it was not fitted on.
+        """
+        fitted = self.fit(features)
+        return fitted, fitted.transform(features)
+
+    def paths_read(self) -> List[str]:
+        """Paths to files that the projection reads, besides the feature-values.
+
+        e.g. a fitted projection to load. A cached projection is only reused while these files are
+        unchanged. By default, none.
+        """
+        return []
+
+    def paths_written(self) -> List[str]:
+        """Paths to files that the projection writes, as a side-effect of projecting.
+
+        e.g. a fitted projection to save. A projection that writes files is never cached, as reusing
+        it would not write them. By default, none.
+        """
+        return []
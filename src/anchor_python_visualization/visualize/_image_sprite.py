@@ -5,15 +5,41 @@ __copyright__ = "Copyright (C) 2021 Owen Feehan"
 __license__ = "MIT"
 __version__ = "0.1"
 
-from typing import List, Tuple
+import concurrent.futures
+import functools
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy as np
 import pandas as pd
 
+NUMBER_CHANNELS = 3
+"""The number of channels in the sprite (BGR), to which every image is converted."""
+
+_REDUCED_DECODES: List[Tuple[int, int]] = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+"""Each factor a JPEG can be reduced by while decoding, and the corresponding flag, largest first."""
+
+_JPEG_START = b"\xff\xd8"
+"""The first bytes of a JPEG file."""
+
+_JPEG_MARKERS_FRAME = [
+    marker for marker in range(0xC0, 0xD0) if marker not in (0xC4, 0xC8, 0xCC)
+]
+"""The JPEG markers that begin a start-of-frame segment, which describes the size of the image."""
+
+_JPEG_MARKERS_STANDALONE = [0x01] + list(range(0xD0, 0xD8))
+"""The JPEG markers that have no segment (or length) following them."""
+
 
 def create_sprite_at(
-    image_paths: pd.Series, sprite_path: str, image_size_in_sprite: Tuple[int, int]
+    image_paths: pd.Series,
+    sprite_path: str,
+    image_size_in_sprite: Tuple[int, int],
+    number_workers: Optional[int] = None,
 ) -> None:
     """Creates an image-sprite in the format expected by TensorBoard.
 
@@ -26,38 +52,106 @@ def create_sprite_at(
     The sprite **must** always be of square dimensionality, so any unused patches are left blank at
     the end.
 
+    The images are read and scaled concurrently, on a pool of threads, as OpenCV releases the GIL
+    while decoding and scaling. Each is written directly into its patch of the sprite, which is
+    allocated once, so only the sprite and an image per thread are ever in memory.
+
     Args:
         image_paths: a series of ordered image-paths for each image that should exist in the sprite.
         sprite_path: the path to write the sprite to
-        image_size_in_sprite: the size of each image inside the sprite
+        image_size_in_sprite: the size of each image inside the sprite, as width and height.
+        number_workers: the maximum number of threads to read and scale images with. If None, as
+            chosen by :class:`concurrent.futures.ThreadPoolExecutor`.
     """
-    images = []
-    for i in range(len(image_paths)):
-        path = image_paths[i]
-
-        print(
-            "Add image {} of {} to sprite from {}".format(i + 1, len(image_paths), path)
+    sprite = _allocate_sprite(len(image_paths), image_size_in_sprite)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=number_workers) as executor:
+        # Completes in the same order as the paths
+        placed = executor.map(
+            functools.partial(
+                _read_and_place, sprite=sprite, image_size=image_size_in_sprite
+            ),
+            range(len(image_paths)),
+            image_paths,
         )
-        images.append(_read_and_scale(path, image_size_in_sprite))
+        for i, path in enumerate(placed):
+            print(
+                "Add image {} of {} to sprite from {}".format(
+                    i + 1, len(image_paths), path
+                )
+            )
+
+    cv2.imwrite(sprite_path, sprite)
+
+
+def _allocate_sprite(number_images: int, image_size: Tuple[int, int]) -> np.ndarray:
+    """Allocates an empty sprite, with a square of patches sufficient for a number of images."""
+    number_images_in_axis = _number_images_in_an_axis(number_images)
+    return np.zeros(
+        (
+            number_images_in_axis * image_size[1],
+            number_images_in_axis * image_size[0],
+            NUMBER_CHANNELS,
+        ),
+        np.uint8,
+    )
+
+
+def _number_images_in_an_axis(number_images: int) -> int:
+    """Calculates the number of images to place along one axis of the square.
+
+    i.e. width or height.
+    """
+    return int(np.ceil(np.sqrt(number_images)))
+
+
+def _read_and_place(
+    index: int, path: str, sprite: np.ndarray, image_size: Tuple[int, int]
+) -> str:
+    """Reads, scales and converts an image, and writes it into its patch of the sprite.
+
+    Each patch is written by only a single thread.
+
+    Returns:
+        the path of the image.
+    """
+    image = _read_and_scale(path, image_size)
+    if image is not None:
+        _patch(sprite, index, image_size)[:] = image
+    return path
+
+
+def _patch(sprite: np.ndarray, index: int, image_size: Tuple[int, int]) -> np.ndarray:
+    """The patch of the sprite for the image at a particular index (a view, not a copy)."""
+    width, height = image_size
+    row, column = divmod(index, sprite.shape[1] // width)
+    return sprite[
+        row * height : (row + 1) * height, column * width : (column + 1) * width
+    ]
 
-    cv2.imwrite(sprite_path, _create_sprite(images))
 
+def _read_and_scale(path: str, scale_to_size: Tuple[int, int]) -> Optional[np.ndarray]:
+    """Reads an image at a path, scales to a particular size, and converts to 8-bit BGR.
 
-def _read_and_scale(path: str, scale_to_size: Tuple[int, int]) -> np.ndarray:
-    """Reads an image at a path and scales to a particular size"""
+    Returns:
+        the scaled image, or None if an error occurred (including an image that cannot be converted),
+        when its patch is left empty.
+    """
     try:
-        return cv2.resize(_read_with_unicode_path(path), scale_to_size)
-    except (cv2.error, OSError) as err:
+        return _convert_to_bgr(
+            cv2.resize(_read_with_unicode_path(path, scale_to_size), scale_to_size)
+        )
+    except (cv2.error, OSError, ValueError) as err:
         print(
             "An error occurred reading-and-scaling, replacing with an empty thumbnail: {}".format(
                 path
             )
         )
         print(err)
-        return np.zeros((scale_to_size[0], scale_to_size[1], 3), np.uint8)
+        return None
 
 
-def _read_with_unicode_path(path: str) -> str:
+def _read_with_unicode_path(path: str, minimum_size: Tuple[int, int]) -> np.ndarray:
     """Reads an image contains a path even if it is unicode.
 
     OpenCV has a problem reading paths which have non-trivial encoding (e.g. unicode). So a
@@ -65,63 +159,102 @@ def _read_with_unicode_path(path: str) -> str:
 
     See https://stackoverflow.com/questions/43185605/how-do-i-read-an-image-from-a-path-with-unicode-characters/43185606
 
+    A JPEG is decoded at a reduced resolution (a half, quarter or eighth), when it remains at
+    least :code:`minimum_size`, which is much faster than decoding at full resolution.
+
     Args:
         path: path to image file to be opened.
+        minimum_size: the minimum width and height of the image, if decoded at a reduced resolution.
 
     Returns:
         an opened image (assuming it is uint8). It will be in BGR format when three channels.
     """
-    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    data = np.fromfile(path, dtype=np.uint8)
+    return cv2.imdecode(data, _decode_flags(data, minimum_size))
 
 
-def _create_sprite(images: List[np.ndarray]) -> np.ndarray:
-    """Creates the sprite by tiling into a square image.
-
-    Any padding is added as needed to complete the square.
-    """
-    data = np.array(images)
-
-    data = _convert_grayscale_to_bgr_if_needed(data)
+def _decode_flags(data: np.ndarray, minimum_size: Tuple[int, int]) -> int:
+    """The flags to decode an image with, reducing the resolution of a JPEG as much as possible."""
+    size = _jpeg_size(memoryview(data))
+    if size is not None:
+        for factor, flag in _REDUCED_DECODES:
+            if (
+                size[0] // factor >= minimum_size[0]
+                and size[1] // factor >= minimum_size[1]
+            ):
+                # Like IMREAD_UNCHANGED, any orientation in the EXIF metadata is ignored
+                return flag | cv2.IMREAD_IGNORE_ORIENTATION
+    return cv2.IMREAD_UNCHANGED
 
-    # Number of images in width and height
-    number_images = _number_images_in_an_axis(data)
 
-    data_padded = _pad_as_needed(data, number_images)
-    return _reshape_into_tiled_square(data_padded, number_images)
+def _jpeg_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    """The width and height of a JPEG, read from its start-of-frame segment without decoding.
 
-
-def _number_images_in_an_axis(data: np.ndarray) -> int:
-    """Calculates the number of images to place along one axis of the square.
-
-    i.e. width or height.
+    Returns:
+        the width and height, or None if the data is not a JPEG (or is malformed).
     """
-    return int(np.ceil(np.sqrt(data.shape[0])))
-
-
-def _pad_as_needed(data: np.ndarray, n: int) -> np.ndarray:
-    """Adds additional empty pixels to ensure a sufficient number to complete the square image.
-
-    The padding occurs with 0-values.
+    if data[: len(_JPEG_START)] != _JPEG_START:
+        return None
+
+    offset = len(_JPEG_START)
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Padding before a marker
+            offset += 1
+        elif marker in _JPEG_MARKERS_STANDALONE:
+            offset += 2
+        elif marker in _JPEG_MARKERS_FRAME:
+            height = int.from_bytes(data[offset + 5 : offset + 7], "big")
+            width = int.from_bytes(data[offset + 7 : offset + 9], "big")
+            return width, height
+        else:
+            # Skip the segment, whose length includes the two bytes of the length itself
+            offset += 2 + int.from_bytes(data[offset + 2 : offset + 4], "big")
+    return None
+
+
+def _convert_to_bgr(image: np.ndarray) -> np.ndarray:
+    """Converts an image to 8-bit BGR, from grayscale (with or without a channel axis or alpha), BGR or
+    BGRA.
+
+    Any other bit-depth is first converted to 8-bit, see :func:`_convert_to_uint8`.
+
+    Raises:
+        ValueError: if the image has any other number of channels.
     """
-
-    # Number of voxels to pad (respectively before and after) in each dimension
-    padding = ((0, n**2 - data.shape[0]), (0, 0), (0, 0), (0, 0))
-    return np.pad(data, padding, mode="constant", constant_values=0)
-
-
-def _convert_grayscale_to_bgr_if_needed(data: np.ndarray) -> np.ndarray:
-    """If data is grayscale then convert it into BGR"""
-    if len(data.shape) == 3:
-        return np.tile(data[..., np.newaxis], (1, 1, 1, 3))
+    image = _convert_to_uint8(image)
+    if image.ndim == 2 or image.shape[2] == 1:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    elif image.shape[2] == 2:
+        # Grayscale with alpha, which is discarded
+        return cv2.cvtColor(np.ascontiguousarray(image[:, :, 0]), cv2.COLOR_GRAY2BGR)
+    elif image.shape[2] == NUMBER_CHANNELS:
+        return image
+    elif image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
     else:
-        return data
-
-
-def _reshape_into_tiled_square(data: np.ndarray, n: int) -> np.ndarray:
-    """Manipulate shape of the numpy arrays so it becomes one large square 3-channel image."""
+        raise ValueError(
+            "An image with {} channels cannot be converted to BGR.".format(
+                image.shape[2]
+            )
+        )
 
-    data = data.reshape((n, n) + data.shape[1:])
 
-    data = data.transpose((0, 2, 1, 3, 4))
+def _convert_to_uint8(image: np.ndarray) -> np.ndarray:
+    """Converts an image to 8-bit, as the sprite is.
 
-    return data.reshape((n * data.shape[1], n * data.shape[3]) + data.shape[4:])
+    A 16-bit image keeps its most significant 8 bits. Any other bit-depth (e.g. floating-point) is
+    rescaled so its minimum and maximum intensities become 0 and 255.
+    """
+    if image.dtype == np.uint8:
+        return image
+    elif image.dtype == np.uint16:
+        return (image >> 8).astype(np.uint8)
+    else:
+        return cv2.normalize(
+            image.astype(np.float32), None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U
+        )
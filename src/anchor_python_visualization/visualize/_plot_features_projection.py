@@ -34,13 +34,19 @@ class PlotFeaturesProjection(VisualizeFeaturesScheme):
     # Overriding a method in a base class
     def visualize_data_frame(self, features: embeddings.LabelledFeatures) -> None:
 
-        df_projected = self._projector.project(features.features)
-
-        _plot_first_two_dimensions_projection(df_projected, features.labels)
+        df_projected = self._projector.project_labelled(
+            features.features, features.label_codes
+        )
+
+        projections = projection.split_projections(df_projected)
+        for name, df_projection in projections.items():
+            _plot_first_two_dimensions_projection(
+                df_projection, features.labels, name if len(projections) > 1 else None
+            )
 
 
 def _plot_first_two_dimensions_projection(
-    df: pd.DataFrame, labels: Optional[pd.Series] = None
+    df: pd.DataFrame, labels: Optional[pd.Series] = None, title: Optional[str] = None
 ) -> None:
 
     # Makes the identifiers a normal column
@@ -56,5 +62,6 @@ def _plot_first_two_dimensions_projection(
         y=df.columns[1],
         color="label" if labels is not None else None,
         hover_name="identifier",
+        title=title,
     )
     fig.show()
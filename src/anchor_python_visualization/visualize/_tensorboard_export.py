@@ -5,12 +5,13 @@ __copyright__ = "Copyright (C) 2021 Owen Feehan"
 __license__ = "MIT"
 __version__ = "0.1"
 
+import dataclasses
 import os
-from typing import Optional
+import re
+from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorboard.plugins import projector
 
 from anchor_python_visualization import embeddings, projection
 
@@ -21,8 +22,13 @@ from .visualize_features_scheme import VisualizeFeaturesScheme
 IMAGE_SIZE_IN_SPRITE = (64, 64)
 
 FILENAME_METADATA = "metadata.tsv"
-FILENAME_FEATURES = "embeddings.ckpt"
 FILENAME_IMAGE_SPRITE = "sprite.png"
+FILENAME_PROJECTOR_CONFIG = "projector_config.pbtxt"
+
+# Each embedding is written as a raw float32 tensor with this extension, which TensorBoard reads directly, unless
+# the bytes happen to be valid UTF-8 text, when TensorBoard would misread them as tab-separated values.
+EXTENSION_TENSOR_BINARY = ".bytes"
+EXTENSION_TENSOR_TEXT = ".tsv"
 
 # Max sprite size is apparently 8192 x 8192 pixels, so this is the maximum number of images that can
 # be supported
@@ -42,7 +48,11 @@ class TensorBoardExport(VisualizeFeaturesScheme):
 
     If the embeddings have more rows than MAX_NUMBER_IMAGES_ALLOWED_IN_SPRITE then a random-sample
     (without replacement) is taken to reduce the number the embeddings to
-    MAX_NUMBER_IMAGES_ALLOWED_IN_SPRITE. Note this introduces non-deterministic behaviour.
+    MAX_NUMBER_IMAGES_ALLOWED_IN_SPRITE. Note this introduces non-deterministic behaviour, unless
+    a seed is specified for the sampling.
+
+    Neither TensorFlow nor TensorBoard is required to export. Each embedding is written as a raw
+    float32 tensor file, and the projector-config is written directly as text.
 
     Thanks to the TensorBoard tutorial
     https://www.tensorflow.org/tensorboard/tensorboard_projector_plugin
@@ -52,45 +62,59 @@ class TensorBoardExport(VisualizeFeaturesScheme):
     """
 
     def __init__(
-        self, projector_method: Optional[projection.Projector], output_path: str
+        self,
+        projector_method: Optional[projection.Projector],
+        output_path: str,
+        sampling: Optional[embeddings.Sampling] = None,
+        sprite_workers: Optional[int] = None,
     ):
         """Constructor
 
         Args:
             projector_method: optional projection to reduce dimensionality before export
             output_path: where to write the "log-dir" for tensorboard
+            sampling: how to sample rows, if there are too many for the sprite. If None, uniformly
+                with a fresh seed.
+            sprite_workers: the maximum number of threads to read and scale images for the sprite
+                with. If None, as chosen by :class:`concurrent.futures.ThreadPoolExecutor`.
         """
         self._projector = projector_method
         self._output_path = _create_dir_or_throw(output_path)
+        self._sampling = sampling
+        self._sprite_workers = sprite_workers
 
     # Overriding a base class
     def visualize_data_frame(self, features: embeddings.LabelledFeatures) -> None:
-
         print("Exporting tensorboard logs to: {}".format(self._output_path))
 
-        features = _sample_if_needed(features)
+        features = _sample_if_needed(features, self._sampling)
 
         path_metadata = self._resolved_path(FILENAME_METADATA)
-        path_features = self._resolved_path(FILENAME_FEATURES)
 
         _write_labels(features.labels, path_metadata)
 
-        _save_embedding_as_checkpoint(
-            self._maybe_project(features.features), path_features
+        tensors = [
+            _write_tensor(embedding, name, self._resolved_path(_file_name(name)))
+            for name, embedding in projection.split_projections(
+                self._maybe_project(features)
+            ).items()
+        ]
+
+        _write_projector_config(
+            tensors,
+            path_metadata,
+            self._maybe_create_sprite(features.image_paths),
+            self._resolved_path(FILENAME_PROJECTOR_CONFIG),
         )
 
-        projector_config = _create_projector_config(
-            path_metadata, self._maybe_create_sprite(features.image_paths)
-        )
-
-        projector.visualize_embeddings(self._output_path, projector_config)
-
-    def _maybe_project(self, data_frame: pd.DataFrame) -> pd.DataFrame:
-        """Apply a projection to the data-frame, if a projection is selected."""
+    def _maybe_project(self, features: embeddings.LabelledFeatures) -> pd.DataFrame:
+        """Apply a projection to the feature-values, if a projection is selected."""
         if self._projector is not None:
-            return self._projector.project(data_frame)
+            return self._projector.project_labelled(
+                features.features, features.label_codes
+            )
         else:
-            return data_frame
+            return features.features
 
     def _maybe_create_sprite(self, image_paths: Optional[pd.Series]) -> Optional[str]:
         """Creates a sprite image with thumbnails for many different images, if selected.
@@ -103,7 +127,9 @@ class TensorBoardExport(VisualizeFeaturesScheme):
         """
         if image_paths is not None:
             sprite_path = self._resolved_path(FILENAME_IMAGE_SPRITE)
-            create_sprite_at(image_paths, sprite_path, IMAGE_SIZE_IN_SPRITE)
+            create_sprite_at(
+                image_paths, sprite_path, IMAGE_SIZE_IN_SPRITE, self._sprite_workers
+            )
             return sprite_path
         else:
             return None
@@ -121,7 +147,7 @@ class TensorBoardExport(VisualizeFeaturesScheme):
 
 
 def _sample_if_needed(
-    features: embeddings.LabelledFeatures,
+    features: embeddings.LabelledFeatures, sampling: Optional[embeddings.Sampling]
 ) -> embeddings.LabelledFeatures:
     """Randomly samples if needed.
 
@@ -137,32 +163,87 @@ def _sample_if_needed(
             f"Sampling {MAX_NUMBER_IMAGES_ALLOWED_IN_SPRITE} rows from a total of {num_rows} rows"
             "in the feature-table as this is the maximum image-sprite"
         )
-        return features.sample_without_replacement(MAX_NUMBER_IMAGES_ALLOWED_IN_SPRITE)
+        return features.sample_without_replacement(
+            MAX_NUMBER_IMAGES_ALLOWED_IN_SPRITE, sampling
+        )
     else:
         return features
 
 
-def _create_projector_config(
-    path_metadata: str, path_sprite: Optional[str]
-) -> projector.ProjectorConfig:
-    """Creates a projector-config as needed to show the embedding in Tensorboard."""
-    config = projector.ProjectorConfig()
-    embedding = config.embeddings.add()
-    embedding.tensor_name = "embedding/.ATTRIBUTES/VARIABLE_VALUE"
-    embedding.metadata_path = path_metadata
+@dataclasses.dataclass(frozen=True)
+class _Tensor:
+    """A file with an embedding, as referred to by the projector-config."""
+
+    name: str
+    """The name of the embedding, as displayed by TensorBoard."""
+
+    path: str
+    """The path to the file."""
+
+    shape: Tuple[int, int]
+    """The number of rows and columns in the embedding."""
+
+
+def _write_tensor(
+    embedding: pd.DataFrame, name: str, path_without_extension: str
+) -> _Tensor:
+    """Writes an embedding as a raw float32 tensor, or as tab-separated values if it would be misread.
+
+    TensorBoard first attempts to read a tensor file as text, so only if this fails (as it almost
+    always does for raw bytes) is it read as a raw tensor.
+    """
+    tensor = np.ascontiguousarray(embedding.to_numpy(), dtype=np.float32)
+    data = tensor.tobytes()
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        path = path_without_extension + EXTENSION_TENSOR_BINARY
+        with open(path, "wb") as file:
+            file.write(data)
+    else:
+        path = path_without_extension + EXTENSION_TENSOR_TEXT
+        np.savetxt(path, tensor, delimiter="\t", fmt="%.9g")
+    return _Tensor(name, path, tensor.shape)
+
+
+def _write_projector_config(
+    tensors: List[_Tensor], path_metadata: str, path_sprite: Optional[str], path: str
+) -> None:
+    """Writes a projector-config (in protobuf text format) as needed to show each embedding in TensorBoard.
+
+    All embeddings share the same metadata and sprite.
+    """
+    lines = []
+    for tensor in tensors:
+        lines.append("embeddings {")
+        lines.append("  tensor_name: {}".format(_quote(tensor.name)))
+        lines.extend("  tensor_shape: {}".format(size) for size in tensor.shape)
+        lines.append("  tensor_path: {}".format(_quote(tensor.path)))
+        lines.append("  metadata_path: {}".format(_quote(path_metadata)))
+
+        if path_sprite is not None:
+            lines.append("  sprite {")
+            lines.append("    image_path: {}".format(_quote(path_sprite)))
+            lines.extend(
+                "    single_image_dim: {}".format(size) for size in IMAGE_SIZE_IN_SPRITE
+            )
+            lines.append("  }")
+
+        lines.append("}")
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
 
-    if path_sprite is not None:
-        embedding.sprite.image_path = path_sprite
-        embedding.sprite.single_image_dim.extend(IMAGE_SIZE_IN_SPRITE)
 
-    return config
+def _quote(text: str) -> str:
+    """Quotes a string, escaping as needed for the protobuf text format."""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return '"{}"'.format(escaped)
 
 
-def _save_embedding_as_checkpoint(embedding: pd.DataFrame, path: str) -> None:
-    """Saves the feature embedding as a checkpointed tensor."""
-    weights = tf.Variable(tf.convert_to_tensor(embedding.to_numpy()))
-    checkpoint = tf.train.Checkpoint(embedding=weights)
-    checkpoint.save(path)
+def _file_name(name: str) -> str:
+    """The name of the file (without extension) for an embedding, with only letters, digits and underscores."""
+    return re.sub(r"\W", "_", name)
 
 
 def _write_labels(labels: pd.Series, path: str) -> None:
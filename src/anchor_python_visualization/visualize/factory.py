@@ -7,10 +7,8 @@ __version__ = "0.1"
 
 from typing import Optional
 
-from anchor_python_visualization import projection
+from anchor_python_visualization import embeddings, projection
 
-from ._plot_features_projection import PlotFeaturesProjection
-from ._tensorboard_export import TensorBoardExport
 from .visualize_features_scheme import VisualizeFeaturesScheme
 
 IDENTIFIERS = ["plot", "tensorboard"]
@@ -28,6 +26,8 @@ def create_method(
     identifier: Optional[str],
     projector: Optional[projection.Projector],
     output_path: Optional[str],
+    sampling: Optional[embeddings.Sampling] = None,
+    sprite_workers: Optional[int] = None,
 ) -> VisualizeFeaturesScheme:
     """
     Creates a visualize-embeddings method from an identifier.
@@ -36,6 +36,9 @@ def create_method(
         identifier: string that is one of :const:`IDENTIFIERS`, case-insensitive.
         projector: method for performing projection into smaller dimensionality.
         output_path: a path for writing any relevant output.
+        sampling: how to sample rows, for methods that can only visualize a limited number.
+        sprite_workers: the maximum number of threads to read and scale thumbnails with, for methods
+            that show thumbnails. If None, as chosen by :class:`concurrent.futures.ThreadPoolExecutor`.
 
     Returns:
         a newly created instance corresponding to the identifier.
@@ -43,18 +46,23 @@ def create_method(
     if projector is None:
         raise ValueError("No projector specified.")
 
+    # Each method is only imported when selected, as their dependencies (e.g. plotly or OpenCV)
+    # are slow to import
     if identifier is None:
-        return PlotFeaturesProjection(projector)
+        identifier = DEFAULT_IDENTIFIER
 
     identifier = identifier.casefold()
 
     if identifier == IDENTIFIERS[0]:
+        from ._plot_features_projection import PlotFeaturesProjection
+
         return PlotFeaturesProjection(projector)
     elif identifier == IDENTIFIERS[1]:
-
         if output_path is None:
             raise ValueError("An output-path is required but not specified.")
 
-        return TensorBoardExport(projector, output_path)
+        from ._tensorboard_export import TensorBoardExport
+
+        return TensorBoardExport(projector, output_path, sampling, sprite_workers)
     else:
         raise ValueError("Unknown identifier for projection: {}".format(identifier))
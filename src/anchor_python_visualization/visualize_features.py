@@ -23,6 +23,57 @@ Projection methods
  * `t-SNE <https://en.wikipedia.org/wiki/T-distributed_stochastic_neighbor_embedding>`_ **(default)**
  * `PCA <https://en.wikipedia.org/wiki/Principal_component_analysis>`_
  * `none` - unchanged dimensionality for the embeddings.
+ * `incremental-PCA` - PCA fitted and projected over batches of rows, so memory-mapped embeddings (e.g. from a
+   binary matrix) need not fit into memory.
+ * `FFT-t-SNE` - t-SNE with approximate nearest neighbors and FFT-accelerated gradients across all cores, using
+   `openTSNE <https://opentsne.readthedocs.io>`_, which scales to millions of embeddings. Requires the
+   ``opentsne`` extra.
+ * `UMAP <https://umap-learn.readthedocs.io>`_ - a faster non-linear projection, with the neighbor graph
+   constructed across all cores, that also preserves more global structure. Requires the ``umap`` extra.
+
+`-po` or `--projection_options` sets options for the projection method, each as ``name=value``:
+
+ * `t-SNE` - ``pre_reduction_components`` (default 50) reduces embeddings with more features to this many by
+   (randomized) PCA beforehand, or ``none`` to disable. ``perplexity`` (default 30). ``perplexities`` (e.g.
+   ``perplexities=5,30,50``) instead projects once for each perplexity, searching the nearest neighbors only once
+   and optimizing each projection in parallel (using up to ``number_workers`` processes, by default the number of
+   processors), shown as separate projections (as with ``--projections``).
+   ``previous_layout`` (a path to a CSV file) starts from a previous projection, if it exists, so when rows are
+   appended (e.g. daily) the projection is fast and stable. Previous rows keep their positions, new rows are placed
+   near their nearest previous rows and then optimized against the previous rows (which stay in place), and the
+   projection is then written to the file for next time. ``relax_previous`` (default false) afterwards also
+   optimizes all rows from these positions, without early exaggeration and for only a quarter of the usual
+   iterations, but recalculating the affinities between all rows.
+ * `FFT-t-SNE` - as for `t-SNE`, and ``neighbors`` (as in openTSNE, default ``auto``) and ``number_jobs``
+   (default -1, all cores).
+ * `UMAP` - ``number_components`` (default 2), ``number_neighbors`` (default 15), ``min_distance`` (default 0.1),
+   ``number_jobs`` (default -1, all cores) and ``seed`` (default none, otherwise reproducible but single-threaded).
+ * `PCA` - ``number_components`` (default 2), ``solver`` (as in scikit-learn e.g. ``randomized``, or ``truncated``
+   for a truncated SVD), ``oversamples`` and ``power_iterations`` (for randomized solvers), ``single_precision``
+   (default true) and ``center`` (default true, otherwise a truncated SVD of the unchanged embeddings, which only
+   supports the ``auto``, ``randomized``, ``arpack`` or ``truncated`` solvers).
+ * `incremental-PCA` - ``number_components`` (default 2) and ``batch_size`` (default 10000 rows).
+
+``--projections`` performs several projection methods in parallel (instead of ``--projection``), each in a
+separate process using up to ``--number_workers`` processes, e.g. to compare layouts. Each is an identifier, optionally
+followed by a colon and options separated by commas, e.g. ``pca t-sne:perplexity=5 t-sne:perplexity=50``. The
+embeddings are placed once in shared memory, rather than copied to each process. `plot` shows a separate plot for
+each projection, and `TensorBoard` exports each as a separate embedding in the same log directory.
+
+``--fit_sample_size`` fits the projection on a sample of rows (selected as by ``--sampling``, so optionally
+stratified by label), and then projects all rows with it, in batches. So only the sample pays the cost of fitting.
+Projection methods that cannot project further rows directly (`t-SNE`) place each row at a weighted average of
+its nearest rows in the sample.
+
+``--fitted_output`` saves the fitted projection to a file, and ``--fitted_input`` loads it in a later run (instead
+of ``--projection``), so new embeddings are placed into the existing projection without fitting again.
+
+``--projection_cache`` caches each projection in a directory, keyed by the embeddings and the projection method
+and its options. A later run (e.g. to export or plot differently) then reuses the projection, rather than
+projecting again. The least recently used projections are removed, when their total size exceeds
+``--projection_cache_size`` megabytes. The key also includes the size and modification time of any
+``--fitted_input`` or ``previous_layout``, and a projection is never cached with ``--fitted_output`` or
+``previous_layout``, as these files are written when projecting.
 
 Visualization methods
 ----------------------
@@ -40,6 +91,9 @@ is substituted respectively:
  * with an index from an incrementing six digit integer with leading zeros, corresponding to row order, or,
  * the unique identifier for the embedding.
 
+The thumbnails are read and scaled in parallel, using up to ``--sprite_workers`` threads (e.g. more than the number of
+processors, when reading from a network drive).
+
 
 Structure of the CSV File
 -------------------------
@@ -52,6 +106,16 @@ The CSV file should have:
    * one column called :const:`~embeddings.COLUMN_NAME_IDENTIFIER` with unique identifiers for each
      embedding.
 
+The CSV file may also be split into several files (shards) with identical columns, by specifying a directory
+(containing the shards as ``.csv`` files) or a wildcard pattern (e.g. ``D:\someDirectory\part_*.csv``) instead of
+a single file. The shards are read in parallel using up to ``--number_workers`` processes, and combined in
+alphabetical order of path.
+
+Alternatively, the embeddings may be a binary matrix (with a row per data-item) in a ``.npy``, ``.npz``, ``.h5`` or
+``.hdf5`` file, which is memory-mapped rather than parsed. Identifiers are then read from an optional CSV file with the
+same name but the extension ``.identifiers.csv`` (e.g. ``features.identifiers.csv`` for ``features.npy``), with a
+row for each row in the matrix.
+
 Otherwise:
 
   * the *numeric* columns are treated as feature-values
@@ -64,6 +128,27 @@ a maximum number of groups to be read from the left (if positive) or to be exclu
 ``--encoding`` specifies the encoding of the CSV file as per
 `Python's standard encodings <https://docs.python.org/3/library/codecs.html#standard-encodings>`_.
 
+``--engine`` selects the parser used to read the CSV file: ``c`` (pandas, single-threaded) **(default)** or
+``pyarrow`` (Apache Arrow, multi-threaded), which falls back to ``c`` if the pyarrow package is not installed.
+
+Only the numeric columns, and the columns needed to determine identifiers, are parsed from the CSV file.
+``--include_columns`` and ``--exclude_columns`` further restrict which numeric columns are used as feature-values,
+each with one or more wildcard patterns e.g. ``intensity.*``. Excluding a column does not change the identifiers.
+
+``--chunk_size`` streams the CSV file in chunks of this many rows, converting the feature-values to
+single-precision as they are read. This reduces peak memory for large CSV files.
+
+``--cache_directory`` caches the parsed feature-values, identifiers and labels in a directory. Later runs on
+the same (unchanged) CSV file open the cached feature-values memory-mapped, instead of parsing the CSV again.
+
+When there are more rows than can be visualized (e.g. the maximum number of thumbnails in a sprite for
+`TensorBoard`), a random sample of rows is taken. ``--seed`` makes the sample reproducible, and ``--sampling``
+selects either ``uniform`` **(default)** or ``stratified`` sampling. Stratified sampling retains at least
+``--minimum_per_label`` rows of each label, so rare labels are not removed.
+
+``--reservoir_size`` retains only a uniform random sample of this many rows, while the CSV file is streamed in
+chunks, so a very large CSV file never needs to be loaded entirely.
+
 -------------
 Example Usage
 -------------
@@ -125,7 +210,8 @@ __version__ = "0.1"
 
 
 import argparse
-from typing import List
+import dataclasses
+from typing import List, Optional
 
 from anchor_python_visualization import embeddings, projection, visualize
 
@@ -137,17 +223,78 @@ def main():
     input_features = embeddings.load_features(args)
 
     visualize_scheme = visualize.create_method(
-        args.method, projection.create_projector(args.projection), args.output
+        args.method,
+        _create_projector(args),
+        args.output,
+        embeddings.Sampling(args.seed, args.sampling, args.minimum_per_label),
+        args.sprite_workers,
     )
     visualize_scheme.visualize_data_frame(input_features)
 
 
+def _create_projector(args: argparse.Namespace) -> Optional[projection.Projector]:
+    """Creates the projection method(s), fitted on a sample or loaded if selected, and maybe cached."""
+    if args.projections is not None:
+        if args.fitted_input is not None or args.fitted_output is not None:
+            raise ValueError(
+                "A fitted projection cannot be loaded or saved, with several projections."
+            )
+        multiple = projection.create_multiple(args.projections, args.number_workers)
+        projector = dataclasses.replace(
+            multiple,
+            projectors=tuple(
+                _maybe_fit_on_sample(projector, args)
+                for projector in multiple.projectors
+            ),
+        )
+    elif args.fitted_input is not None:
+        projector = _maybe_fit_on_sample(
+            projection.LoadedProjection(args.fitted_input), args
+        )
+    else:
+        projector = _maybe_fit_on_sample(
+            projection.create_projector(
+                args.projection, projection.parse_options(args.projection_options)
+            ),
+            args,
+        )
+
+    if projector is not None and args.projection_cache is not None:
+        return projection.CachedProjection(
+            projector, args.projection_cache, args.projection_cache_size
+        )
+    else:
+        return projector
+
+
+def _maybe_fit_on_sample(
+    projector: Optional[projection.Projector], args: argparse.Namespace
+) -> Optional[projection.Projector]:
+    """Fits the projection on a sample (or saves it after fitting), if selected."""
+    if projector is not None and (
+        args.fit_sample_size is not None or args.fitted_output is not None
+    ):
+        return projection.FitOnSample(
+            projector,
+            args.fit_sample_size,
+            embeddings.Sampling(args.seed, args.sampling, args.minimum_per_label),
+            args.fitted_output,
+        )
+    else:
+        return projector
+
+
 def _arg_parse() -> argparse.Namespace:
     """Parse arguments."""
     parser = argparse.ArgumentParser(
         description="Visualize a CSV file with different embeddings."
     )
-    parser.add_argument("file_path_to_csv", type=str, help="file-path to a csv file")
+    parser.add_argument(
+        "file_path_to_csv",
+        type=str,
+        help="file-path to a csv file, or a directory or wildcard pattern of csv files (shards) to combine,"
+        " or to a binary matrix (.npy, .npz, .h5 or .hdf5)",
+    )
     _add_method_via_choices(
         parser,
         "-m",
@@ -164,6 +311,51 @@ def _arg_parse() -> argparse.Namespace:
         projection.DEFAULT_IDENTIFIER,
         "projecting embeddings to smaller dimensionality",
     )
+    parser.add_argument(
+        "-po",
+        "--projection_options",
+        nargs="+",
+        help="options for the projection method, each as name=value e.g. pre_reduction_components=50",
+    )
+    parser.add_argument(
+        "-pm",
+        "--projections",
+        nargs="+",
+        help="if set, several projection methods to perform in parallel (instead of --projection), each as"
+        " identifier:name=value,name=value e.g. pca t-sne:perplexity=5 t-sne:perplexity=50",
+    )
+    parser.add_argument(
+        "-fs",
+        "--fit_sample_size",
+        type=int,
+        help="if set, the projection is fitted on a sample of this many rows (selected as by --sampling),"
+        " and then all rows are projected with it",
+    )
+    parser.add_argument(
+        "-fo",
+        "--fitted_output",
+        help="if set, a path to save the fitted projection to, so later embeddings can be projected with it",
+    )
+    parser.add_argument(
+        "-fi",
+        "--fitted_input",
+        help="if set, a path to load a fitted projection from (saved with --fitted_output), to project with"
+        " instead of --projection, without fitting again",
+    )
+    parser.add_argument(
+        "-pc",
+        "--projection_cache",
+        help="if set, a directory to cache projections in, so a later run with identical embeddings and"
+        " projection method reuses the projection",
+    )
+    parser.add_argument(
+        "-ps",
+        "--projection_cache_size",
+        default=projection.DEFAULT_MAX_SIZE_MEGABYTES,
+        type=int,
+        help="maximum total size in megabytes of the projections in the cache, removing the least recently"
+        " used. Defaults to {}.".format(projection.DEFAULT_MAX_SIZE_MEGABYTES),
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -185,6 +377,13 @@ def _arg_parse() -> argparse.Namespace:
             embeddings.PLACEHOLDER_FOR_SUBSTITUTION
         ),
     )
+    parser.add_argument(
+        "-sw",
+        "--sprite_workers",
+        type=int,
+        help="maximum number of threads to read and scale thumbnails with in parallel. Defaults to a few more"
+        " than the number of processors.",
+    )
     parser.add_argument(
         "-e",
         "--encoding",
@@ -192,6 +391,75 @@ def _arg_parse() -> argparse.Namespace:
         help="encoding to use when reading the CSV file"
         " (see https://docs.python.org/3/library/codecs.html#standard-encodings for choices)",
     )
+    _add_method_via_choices(
+        parser,
+        "-en",
+        "--engine",
+        embeddings.ENGINES,
+        embeddings.DEFAULT_ENGINE,
+        "parsing the CSV file (unless it is read in chunks)",
+    )
+    parser.add_argument(
+        "-ic",
+        "--include_columns",
+        nargs="+",
+        help="if set, only numeric columns matching at least one of these wildcard patterns are used as"
+        " feature-values",
+    )
+    parser.add_argument(
+        "-xc",
+        "--exclude_columns",
+        nargs="+",
+        help="numeric columns matching any of these wildcard patterns are not used as feature-values",
+    )
+    parser.add_argument(
+        "-cs",
+        "--chunk_size",
+        type=int,
+        help="if set, the CSV file is streamed in chunks of this many rows, with feature-values converted to"
+        " single-precision as they are read",
+    )
+    parser.add_argument(
+        "-cd",
+        "--cache_directory",
+        help="if set, a directory to cache the parsed CSV file in, so later runs need not parse it again",
+    )
+    parser.add_argument(
+        "-w",
+        "--number_workers",
+        type=int,
+        help="maximum number of processes to read shards, or perform several projections, with in parallel."
+        " Defaults to the number of processors. Several projections share these with any processes they"
+        " create themselves (e.g. t-SNE with several perplexities).",
+    )
+    parser.add_argument(
+        "-r",
+        "--reservoir_size",
+        type=int,
+        help="if set, only a uniform random sample of this many rows is retained, as the CSV file is streamed"
+        " in chunks",
+    )
+    _add_method_via_choices(
+        parser,
+        "-sm",
+        "--sampling",
+        embeddings.SAMPLING_STRATEGIES,
+        embeddings.DEFAULT_SAMPLING_STRATEGY,
+        "sampling rows, when there are too many to visualize",
+    )
+    parser.add_argument(
+        "-sp",
+        "--minimum_per_label",
+        default=1,
+        type=int,
+        help="minimum number of rows to sample for each label, when sampling is stratified",
+    )
+    parser.add_argument(
+        "-s",
+        "--seed",
+        type=int,
+        help="seed for the random number generator when sampling rows, so that the sample is reproducible",
+    )
     parser.add_argument(
         "-l",
         "--max_label_index",
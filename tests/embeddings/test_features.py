@@ -0,0 +1,332 @@
+"""Tests :mod:`features`."""
+import argparse
+import mmap
+import os
+import pathlib
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anchor_python_visualization.embeddings import LabelledFeatures, load_features
+
+_PATH_FEATURES: str = os.path.join(
+    os.path.dirname(__file__), "..", "resources", "features.csv"
+)
+"""Path to a CSV file with features to load."""
+
+
+def test_chunked_identical_to_entire() -> None:
+    """Tests that reading in chunks produces the same features, identifiers and labels."""
+    entire = _load()
+    chunked = _load(chunk_size=4)
+
+    assert chunked.features.dtypes.eq(np.float32).all()
+    np.testing.assert_allclose(
+        chunked.features.to_numpy(), entire.features.to_numpy(), rtol=1e-6
+    )
+    assert chunked.features.columns.equals(entire.features.columns)
+    assert chunked.features.index.equals(entire.features.index)
+    assert chunked.labels.equals(entire.labels)
+
+
+def test_chunked_releases_overestimated_rows(tmp_path: pathlib.Path) -> None:
+    """Tests that reading in chunks keeps no memory for rows overestimated from blank lines."""
+    path = str(tmp_path / "blank_lines.csv")
+    with open(_PATH_FEATURES) as file:
+        lines = file.read().splitlines()
+    with open(path, "w") as file:
+        file.write("\n".join(lines + [""] * (10 * len(lines))))
+
+    chunked = _load(file_path_to_csv=path, chunk_size=4)
+
+    _assert_identical(chunked, _load(chunk_size=4))
+    assert _allocated_bytes(chunked.values) == chunked.values.nbytes
+
+
+def test_cached_identical_to_uncached(tmp_path: pathlib.Path) -> None:
+    """Tests that storing in, and then reusing the cache produces the same features and labels."""
+    uncached = _load()
+    for _ in range(2):
+        cached = _load(cache_directory=str(tmp_path))
+
+        np.testing.assert_array_equal(
+            cached.features.to_numpy(), uncached.features.to_numpy()
+        )
+        assert cached.features.columns.equals(uncached.features.columns)
+        assert cached.features.index.equals(uncached.features.index)
+        assert cached.labels.equals(uncached.labels)
+
+
+def test_cached_memory_mapped_without_copying(tmp_path: pathlib.Path) -> None:
+    """Tests that the cached feature-values are used (memory-mapped) without converting their type."""
+    for _ in range(2):
+        cached = _load(cache_directory=str(tmp_path))
+        assert cached.values.dtype == np.float32
+        assert _is_memory_mapped(cached.values)
+
+
+@pytest.mark.parametrize("path", [_PATH_FEATURES, None])
+def test_pyarrow_identical_to_c(path: str, tmp_path: pathlib.Path) -> None:
+    """Tests that the pyarrow engine produces the same features, identifiers and labels as the C engine.
+
+    When :code:`path` is None, a file with dates and missing strings is used instead.
+    """
+    pytest.importorskip("pyarrow")
+    if path is None:
+        path = _write_csv_with_dates(tmp_path)
+
+    _assert_identical(
+        _load(file_path_to_csv=path, engine="pyarrow"), _load(file_path_to_csv=path)
+    )
+
+
+def test_pyarrow_falls_back_when_missing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that the pyarrow engine falls back to the C engine, when pyarrow is not installed."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    _assert_identical(_load(engine="pyarrow"), _load())
+
+
+def test_include_and_exclude_columns() -> None:
+    """Tests that patterns restrict the feature-values, but not the identifiers."""
+    entire = _load()
+    for chunk_size in [None, 4]:
+        restricted = _load(
+            include_columns=["image", "intensity.channel0.*"],
+            exclude_columns=["image", "*.sum"],
+            chunk_size=chunk_size,
+        )
+        assert list(restricted.features.columns) == [
+            column
+            for column in entire.features.columns
+            if column.startswith("intensity.channel0.") and not column.endswith(".sum")
+        ]
+        assert restricted.features.index.equals(entire.features.index)
+
+
+def test_free_text_columns_skipped(tmp_path: pathlib.Path) -> None:
+    """Tests that string columns other than the left-most are not parsed."""
+    path = str(tmp_path / "text.csv")
+    pd.DataFrame(
+        {
+            "name": ["a/x", "a/y", "b/z"],
+            "value": [1.5, 2.5, 3.5],
+            "comment": ["some", "free", "text"],
+        }
+    ).to_csv(path, index=False)
+
+    for engine in ["c", "pyarrow"]:
+        loaded = _load(file_path_to_csv=path, engine=engine)
+        assert list(loaded.features.columns) == ["value"]
+        assert list(loaded.features.index) == ["a/x", "a/y", "b/z"]
+        assert list(loaded.labels) == ["a", "a", "b"]
+
+
+@pytest.mark.parametrize("pattern", [False, True])
+def test_shards_identical_to_single_file(pattern: bool, tmp_path: pathlib.Path) -> None:
+    """Tests that shards in a directory, or matching a pattern, load identically to a single file."""
+    _write_shards(pd.read_csv(_PATH_FEATURES), tmp_path)
+
+    path = str(tmp_path / "part_*.csv") if pattern else str(tmp_path)
+    for chunk_size in [None, 2]:
+        _assert_identical(
+            _load(file_path_to_csv=path, chunk_size=chunk_size, number_workers=2),
+            _load(chunk_size=chunk_size),
+        )
+
+
+def test_existing_file_with_wildcard_characters(tmp_path: pathlib.Path) -> None:
+    """Tests that an existing file whose name contains wildcard characters is not treated as a pattern."""
+    path = str(tmp_path / "features[1].csv")
+    pd.read_csv(_PATH_FEATURES).to_csv(path, index=False)
+
+    _assert_identical(_load(file_path_to_csv=path), _load())
+
+
+def test_shards_identifiers_unique_globally(tmp_path: pathlib.Path) -> None:
+    """Tests that identifiers unique in each shard, but not across shards, are replaced."""
+    shard = pd.DataFrame({"name": ["a/x", "a/y"], "value": [1.5, 2.5]})
+    _write_shards(pd.concat([shard, shard]), tmp_path)
+
+    loaded = _load(file_path_to_csv=str(tmp_path))
+    assert list(loaded.features.index) == ["0", "1", "2", "3"]
+
+
+@pytest.mark.parametrize("shards", [False, True])
+def test_reservoir_sample_of_entire(shards: bool, tmp_path: pathlib.Path) -> None:
+    """Tests that sampling while reading retains rows identical to reading entirely.
+
+    The identifiers are created (as the names are not unique), so refer to positions in the file.
+    """
+    data_frame = pd.DataFrame(
+        {"name": ["a/x", "b/y"] * 20, "other": 1.0, "value": np.arange(40) / 4}
+    )
+    if shards:
+        _write_shards(data_frame, tmp_path)
+        path = str(tmp_path)
+    else:
+        path = str(tmp_path / "features.csv")
+        data_frame.to_csv(path, index=False)
+
+    entire = _load(file_path_to_csv=path)
+    samples = [
+        _load(
+            file_path_to_csv=path,
+            reservoir_size=10,
+            seed=7,
+            chunk_size=chunk_size,
+            image_sequence="<IMAGE>.png",
+        )
+        for chunk_size in [3, 50]
+    ]
+
+    # Identical for any chunk-size, as the seed is fixed
+    _assert_identical(samples[0], samples[1])
+
+    sample = samples[0]
+    assert sample.number_items() == 10
+    assert sample.features.index.is_unique
+    pd.testing.assert_frame_equal(
+        sample.features, entire.features.loc[sample.features.index].astype(np.float32)
+    )
+    assert list(sample.image_paths) == [
+        "{:06d}.png".format(int(identifier)) for identifier in sample.identifiers
+    ]
+
+
+def test_reservoir_shards_with_identical_names(tmp_path: pathlib.Path) -> None:
+    """Tests that shards with identical names (in different directories) are sampled independently."""
+    for shard in range(2):
+        directory = tmp_path / "shard{}".format(shard)
+        directory.mkdir()
+        pd.DataFrame(
+            {"name": "a/x", "value": shard * 100 + np.arange(20, dtype=float)}
+        ).to_csv(directory / "part.csv", index=False)
+
+    sample = _load(
+        file_path_to_csv=str(tmp_path / "**" / "part.csv"), reservoir_size=20, seed=3
+    )
+
+    positions = [
+        {int(value) % 100 for value in sample.values[:, 0] if value // 100 == shard}
+        for shard in range(2)
+    ]
+    assert positions[0] != positions[1]
+
+
+@pytest.mark.parametrize(
+    "extension,compressed",
+    [(".npy", False), (".npz", False), (".npz", True), (".h5", False), (".h5", True)],
+)
+def test_binary_identical_to_csv(
+    extension: str, compressed: bool, tmp_path: pathlib.Path
+) -> None:
+    """Tests that a binary matrix with a sidecar produces the same features as a CSV file.
+
+    The matrix should be memory-mapped, unless it is compressed.
+    """
+    entire = _load(chunk_size=4)
+    path = _write_binary(entire, tmp_path / ("features" + extension), compressed)
+
+    binary = _load(file_path_to_csv=path)
+    np.testing.assert_array_equal(binary.values, entire.values)
+    assert _is_memory_mapped(binary.values) != compressed
+    assert binary.identifiers.equals(entire.identifiers)
+    pd.testing.assert_series_equal(binary.labels, entire.labels)
+    assert list(binary.feature_names[:2]) == ["feature0", "feature1"]
+
+    sample = _load(file_path_to_csv=path, reservoir_size=3, seed=5)
+    assert sample.number_items() == 3
+    np.testing.assert_array_equal(
+        sample.values, entire.features.loc[sample.identifiers].to_numpy()
+    )
+
+
+def _write_binary(
+    features: LabelledFeatures, path: pathlib.Path, compressed: bool
+) -> str:
+    """Writes the feature-values as a binary matrix and the identifiers as a sidecar CSV file."""
+    if path.suffix == ".npy":
+        np.save(path, features.values)
+    elif path.suffix == ".npz":
+        save = np.savez_compressed if compressed else np.savez
+        save(path, features=features.values, other=np.zeros(2))
+    else:
+        h5py = pytest.importorskip("h5py")
+        with h5py.File(path, "w") as file:
+            file.create_dataset("other", data=np.zeros(2))
+            file.create_dataset(
+                "features",
+                data=features.values,
+                compression="gzip" if compressed else None,
+            )
+
+    pd.DataFrame({"name": features.identifiers}).to_csv(
+        path.with_suffix(".identifiers.csv"), index=False
+    )
+    return str(path)
+
+
+def _is_memory_mapped(array: np.ndarray) -> bool:
+    """Whether an array is a view of a memory-mapped file."""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def _allocated_bytes(array: np.ndarray) -> int:
+    """The number of bytes allocated for the array that an array is (perhaps) a view of."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array.nbytes
+
+
+def _write_shards(data_frame: pd.DataFrame, directory: pathlib.Path) -> None:
+    """Writes a data-frame as several CSV files, each with two rows."""
+    for index in range(0, len(data_frame), 2):
+        data_frame.iloc[index : index + 2].to_csv(
+            directory / "part_{:03d}.csv".format(index), index=False
+        )
+
+
+def _write_csv_with_dates(directory: pathlib.Path) -> str:
+    """Writes a CSV file where the left-most string column is unique only if dates are not parsed."""
+    path = str(directory / "dates.csv")
+    pd.DataFrame(
+        {
+            "date": ["2021-01-01", "2021-01-01T00:00:00", "2021-01-02"],
+            "name": ["a/x", "", "b/z"],
+            "value": [1.5, 2.5, 3.5],
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+def _assert_identical(first: LabelledFeatures, second: LabelledFeatures) -> None:
+    """Asserts two loaded features have identical features, identifiers and labels."""
+    pd.testing.assert_frame_equal(first.features, second.features)
+    pd.testing.assert_series_equal(first.labels, second.labels)
+
+
+def _load(**kwargs) -> LabelledFeatures:
+    """Loads the features from the resources, with default arguments unless overridden."""
+    arguments = {
+        "file_path_to_csv": _PATH_FEATURES,
+        "encoding": None,
+        "engine": "c",
+        "chunk_size": None,
+        "cache_directory": None,
+        "include_columns": None,
+        "exclude_columns": None,
+        "number_workers": None,
+        "reservoir_size": None,
+        "seed": None,
+        "max_label_index": 1,
+        "image_path": None,
+        "image_sequence": None,
+    }
+    arguments.update(kwargs)
+    return load_features(argparse.Namespace(**arguments))
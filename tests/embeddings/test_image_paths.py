@@ -0,0 +1,73 @@
+"""Tests :mod:`_image_paths`."""
+import os
+from typing import List
+
+import pandas as pd
+import pytest
+
+from anchor_python_visualization.embeddings._image_paths import (
+    PLACEHOLDER_FOR_SUBSTITUTION,
+    maybe_image_paths,
+)
+
+_IDENTIFIERS: List[str] = [
+    "a/b.png",
+    "a\\c.png",
+    "d.png",
+    "./e.png",
+    "f//g.png",
+    "h/../i.png",
+    "j/",
+    "/k/l.png",
+    "",
+]
+"""Identifiers (relative paths) including some that are changed by normalization."""
+
+_DIRECTORIES: List[str] = [
+    "/images",
+    "/images/",
+    "",
+    "/images/prefix_{}.png".format(PLACEHOLDER_FOR_SUBSTITUTION),
+    "/images//./{}_suffix".format(PLACEHOLDER_FOR_SUBSTITUTION),
+]
+"""Directories, or templates with a placeholder, to derive the paths from."""
+
+
+@pytest.mark.parametrize("directory", _DIRECTORIES)
+def test_image_path(directory: str) -> None:
+    """Tests joining or substituting each identifier, matching deriving each path individually."""
+    paths = maybe_image_paths(pd.Index(_IDENTIFIERS), directory, None)
+    if not directory:
+        # An empty directory is treated as not being set
+        assert paths is None
+        return
+
+    assert list(paths) == [
+        _join_or_substitute(directory, identifier) for identifier in _IDENTIFIERS
+    ]
+    assert list(paths.index) == _IDENTIFIERS
+
+
+@pytest.mark.parametrize("directory", _DIRECTORIES[:2] + _DIRECTORIES[3:])
+def test_image_sequence(directory: str) -> None:
+    """Tests joining or substituting a zero-padded sequence."""
+    paths = maybe_image_paths(pd.Index(_IDENTIFIERS), None, directory)
+    assert list(paths) == [
+        _join_or_substitute(directory, "{:06d}".format(number))
+        for number in range(len(_IDENTIFIERS))
+    ]
+
+
+def test_neither() -> None:
+    """Tests that no paths are derived, when neither a directory nor a sequence is specified."""
+    assert maybe_image_paths(pd.Index(_IDENTIFIERS), None, None) is None
+
+
+def _join_or_substitute(image_directory: str, path: str) -> str:
+    """Derives a path to an image individually, by joining it to a directory or substituting it."""
+    if PLACEHOLDER_FOR_SUBSTITUTION in image_directory:
+        return os.path.normpath(image_directory).replace(
+            PLACEHOLDER_FOR_SUBSTITUTION, os.path.normpath(path), 1
+        )
+    else:
+        return os.path.join(image_directory, path)
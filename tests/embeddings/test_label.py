@@ -0,0 +1,74 @@
+"""Tests :mod:`label`."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from anchor_python_visualization.embeddings import (
+    InsufficientRowsException,
+    LabelledFeatures,
+)
+
+_NUMBER_ROWS: int = 20
+"""Number of rows in the features to test."""
+
+
+def test_round_trip_from_data_frame() -> None:
+    """Tests that the data-frame and series are recreated identically, with compact arrays."""
+    features, labels, image_paths = _create_data_frame_and_series()
+    labelled = LabelledFeatures.from_data_frame(features, labels, image_paths)
+
+    assert labelled.values.dtype == np.float32
+    assert labelled.values.flags.c_contiguous
+    assert labelled.label_codes.dtype == np.int32
+
+    pd.testing.assert_frame_equal(labelled.features, features.astype(np.float32))
+    pd.testing.assert_series_equal(labelled.labels, labels.astype("category"))
+    pd.testing.assert_series_equal(labelled.image_paths, image_paths, check_dtype=False)
+
+
+def test_subset_by_slice_is_view() -> None:
+    """Tests that a subset taken by a slice does not copy the feature-values."""
+    labelled = LabelledFeatures.from_data_frame(*_create_data_frame_and_series())
+    subset = labelled.subset(slice(5, 10))
+
+    assert np.shares_memory(subset.values, labelled.values)
+    assert list(subset.identifiers) == list(labelled.identifiers[5:10])
+
+
+def test_sample_without_replacement() -> None:
+    """Tests that sampling takes identical rows from the features, labels and image-paths."""
+    labelled = LabelledFeatures.from_data_frame(*_create_data_frame_and_series())
+    sample = labelled.sample_without_replacement(8)
+
+    assert sample.number_items() == 8
+    assert sample.identifiers.is_unique
+    assert sample.identifiers.is_monotonic_increasing
+    pd.testing.assert_frame_equal(
+        sample.features, labelled.features.loc[sample.identifiers]
+    )
+    pd.testing.assert_series_equal(
+        sample.labels, labelled.labels.loc[sample.identifiers]
+    )
+    pd.testing.assert_series_equal(
+        sample.image_paths, labelled.image_paths.loc[sample.identifiers]
+    )
+
+    with pytest.raises(InsufficientRowsException):
+        labelled.sample_without_replacement(_NUMBER_ROWS + 1)
+
+
+def _create_data_frame_and_series():
+    """Creates feature-values, labels and image-paths, with identifiers in ascending order."""
+    identifiers = pd.Index(
+        ["item{:02d}".format(i) for i in range(_NUMBER_ROWS)], name="identifier"
+    )
+    features = pd.DataFrame(
+        np.random.rand(_NUMBER_ROWS, 3), index=identifiers, columns=list("ABC")
+    )
+    labels = pd.Series(
+        ["group{}".format(i % 3) for i in range(_NUMBER_ROWS)], index=identifiers
+    )
+    image_paths = pd.Series(
+        ["/images/{}.png".format(name) for name in identifiers], index=identifiers
+    )
+    return features, labels, image_paths
@@ -0,0 +1,62 @@
+"""Tests :mod:`_labels`."""
+import sys
+from typing import List
+
+import pandas as pd
+import pytest
+
+from anchor_python_visualization.embeddings._labels import labels_from_identifiers
+
+_IDENTIFIERS: List[str] = [
+    "a/b/c",
+    "a\\b\\d",
+    "a/e",
+    "f",
+    "",
+    "/g",
+    "h/",
+    "i//j",
+]
+"""Identifiers with differing numbers of groups and separators."""
+
+
+@pytest.mark.parametrize("max_label_index", [-4, -2, -1, 0, 1, 2, 4])
+@pytest.mark.parametrize("with_pyarrow", [True, False])
+def test_labels_from_identifiers(
+    max_label_index: int, with_pyarrow: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests the labels and their categories match splitting and joining each identifier in turn."""
+    if with_pyarrow:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    labels = labels_from_identifiers(pd.Index(_IDENTIFIERS), max_label_index)
+
+    expected = pd.Categorical(
+        [_label_for(identifier, max_label_index) for identifier in _IDENTIFIERS]
+    )
+    assert list(labels) == list(expected)
+    assert list(labels.categories) == list(expected.categories)
+
+
+def _label_for(identifier: str, max_label_index: int) -> str:
+    """Derives the label for a single identifier, by splitting and joining its groups."""
+    groups = identifier.replace("\\", "/").split("/")
+    return "/".join(groups[0:max_label_index])
+
+
+def test_labels_from_identifiers_in_chunks() -> None:
+    """Tests labels derived from identifiers that are backed by several chunks of Arrow strings."""
+    pytest.importorskip("pyarrow")
+    middle = len(_IDENTIFIERS) // 2
+    identifiers = pd.concat(
+        [
+            pd.Series(_IDENTIFIERS[:middle], dtype="string[pyarrow]"),
+            pd.Series(_IDENTIFIERS[middle:], dtype="string[pyarrow]"),
+        ],
+        ignore_index=True,
+    )
+
+    labels = labels_from_identifiers(pd.Index(identifiers), 1)
+    assert list(labels) == [_label_for(identifier, 1) for identifier in _IDENTIFIERS]
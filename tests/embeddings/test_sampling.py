@@ -0,0 +1,36 @@
+"""Tests :mod:`sampling`."""
+import numpy as np
+import pytest
+
+from anchor_python_visualization.embeddings import Sampling
+
+_LABEL_CODES: np.ndarray = np.repeat([0, 1, 2], [1000, 98, 2])
+"""The codes of labels for each row, where some labels are much rarer than others."""
+
+
+@pytest.mark.parametrize("strategy", ["uniform", "Stratified"])
+def test_seed_reproducible(strategy: str) -> None:
+    """Tests that an identical seed produces an identical sample, and different seeds do not."""
+    first = Sampling(seed=3, strategy=strategy).select(_LABEL_CODES, 50)
+    second = Sampling(seed=3, strategy=strategy).select(_LABEL_CODES, 50)
+    other = Sampling(seed=4, strategy=strategy).select(_LABEL_CODES, 50)
+
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, other)
+    assert len(np.unique(first)) == 50
+    assert np.all(np.diff(first) > 0)
+
+
+def test_stratified_retains_rare_labels() -> None:
+    """Tests that each label is sampled at least the minimum, and otherwise proportionally."""
+    indices = Sampling(seed=1, strategy="stratified", minimum_per_label=3).select(
+        _LABEL_CODES, 110
+    )
+    counts = np.bincount(_LABEL_CODES[indices], minlength=3)
+    np.testing.assert_array_equal(counts, [96, 12, 2])
+
+
+def test_stratified_minimum_too_large() -> None:
+    """Tests that an error is raised, if the sample is too small to include the minimum of each label."""
+    with pytest.raises(ValueError):
+        Sampling(strategy="stratified", minimum_per_label=4).select(_LABEL_CODES, 9)
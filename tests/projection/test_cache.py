@@ -0,0 +1,92 @@
+"""Tests :mod:`_cache`."""
+import os
+import pathlib
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from anchor_python_visualization.projection import (
+    CachedProjection,
+    FitOnSample,
+    LoadedProjection,
+    create_projector,
+)
+
+
+def test_reuses_identical_projection(tmp_path: pathlib.Path) -> None:
+    """Tests that a projection is reused for identical features, even with different row names."""
+    features = _create_data_frame(0)
+    pca = create_projector("pca")
+    cached = CachedProjection(pca, str(tmp_path))
+
+    first = cached.project(features)
+    renamed = features.set_axis(["renamed" + name for name in features.index])
+    with mock.patch.object(type(pca), "project") as project:
+        second = cached.project(renamed)
+        project.assert_not_called()
+
+    np.testing.assert_array_equal(second.to_numpy(), first.to_numpy())
+    assert list(second.columns) == list(first.columns)
+    assert second.index.equals(renamed.index)
+
+    # Different options should not reuse the projection
+    cached_other = CachedProjection(
+        create_projector("pca", {"solver": "full"}), str(tmp_path)
+    )
+    cached_other.project(features)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_evicts_least_recently_used(tmp_path: pathlib.Path) -> None:
+    """Tests that the least recently used projections are removed, when too large."""
+    cached = CachedProjection(create_projector("pca"), str(tmp_path), 1)
+
+    # Each projection is about 0.4 megabytes
+    for seed in range(5):
+        cached.project(_create_data_frame(seed, number_rows=50000))
+        sizes = [entry.stat().st_size for entry in os.scandir(tmp_path)]
+        assert sum(sizes) <= 1 << 20
+
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_loaded_projection_changed(tmp_path: pathlib.Path) -> None:
+    """Tests that a projection is not reused, after the fitted projection it loads is replaced."""
+    path = str(tmp_path / "fitted.pkl")
+    cached = CachedProjection(LoadedProjection(path), str(tmp_path / "cache"))
+    features = _create_data_frame(0)
+
+    create_projector("pca").fit(_create_data_frame(1)).save(path)
+    first = cached.project(features)
+
+    create_projector("pca").fit(_create_data_frame(2)).save(path)
+    # Ensure the modification time differs, on file-systems with a coarse resolution
+    os.utime(path, ns=(0, 0))
+    second = cached.project(features)
+
+    assert not np.allclose(second.to_numpy(), first.to_numpy())
+
+
+def test_fitted_output_not_cached(tmp_path: pathlib.Path) -> None:
+    """Tests that a projection that saves a fitted projection is performed each time, saving it."""
+    path = tmp_path / "fitted.pkl"
+    cached = CachedProjection(
+        FitOnSample(create_projector("pca"), save_path=str(path)),
+        str(tmp_path / "cache"),
+    )
+    features = _create_data_frame(0)
+
+    for _ in range(2):
+        cached.project(features)
+        assert path.is_file()
+        path.unlink()
+
+
+def _create_data_frame(seed: int, number_rows: int = 100) -> pd.DataFrame:
+    """Creates a data-frame of random feature-values."""
+    return pd.DataFrame(
+        np.random.default_rng(seed).random((number_rows, 4)),
+        index=list(map(str, range(number_rows))),
+        columns=list("ABCD"),
+    )
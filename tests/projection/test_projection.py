@@ -1,11 +1,23 @@
+import pathlib
+
 import numpy as np
 import pandas as pd
+import pytest
 
+from anchor_python_visualization import embeddings
 from anchor_python_visualization.projection import (
     IDENTIFIERS,
+    FitOnSample,
+    FittedProjection,
+    LoadedProjection,
+    MultipleProjections,
     Projector,
+    create_multiple,
     create_projector,
+    parse_options,
+    split_projections,
 )
+from anchor_python_visualization.projection._tsne import _interpolate_new
 
 _DATA_FRAME_SIZE = (100, 4)
 
@@ -36,3 +48,359 @@ def _create_data_frame() -> pd.DataFrame:
     return pd.DataFrame(
         np.random.randint(0, 100, size=_DATA_FRAME_SIZE), columns=list("ABCD")
     )
+
+
+def test_tsne_pre_reduction() -> None:
+    """Tests that t-SNE reduces many features by PCA beforehand, preserving row names."""
+    data_frame = pd.DataFrame(np.random.rand(100, 60), index=list(map(str, range(100))))
+
+    projection = create_projector("t-sne", {"pre_reduction_components": "5"})
+    reduced = projection._maybe_pre_reduce(data_frame)
+    assert reduced.shape == (100, 5)
+    assert reduced.index.equals(data_frame.index)
+
+    projected = projection.project(data_frame)
+    assert projected.shape == (100, 2)
+    assert projected.index.equals(data_frame.index)
+
+    disabled = create_projector("t-sne", {"pre_reduction_components": "None"})
+    assert disabled._maybe_pre_reduce(data_frame) is data_frame
+
+
+def test_create_projector_with_options() -> None:
+    """Tests that options are converted to the types of the fields, and unknown options rejected."""
+    projection = create_projector(
+        "PCA", parse_options(["number_components=3", "solver = randomized"])
+    )
+    assert projection.number_components == 3
+    assert projection.solver == "randomized"
+
+    with pytest.raises(ValueError):
+        create_projector("pca", {"unknown": "1"})
+
+    with pytest.raises(ValueError):
+        create_projector("pca", {"number_components": "many"})
+
+
+def test_incremental_pca_similar_to_pca() -> None:
+    """Tests that incremental PCA over batches produces (up to sign) the same projection as PCA."""
+    data_frame = pd.DataFrame(
+        np.random.rand(1003, 6) * [10, 5, 2, 1, 1, 1], index=list(map(str, range(1003)))
+    )
+
+    incremental = create_projector("incremental-PCA", {"batch_size": "100"})
+    projected = incremental.project(data_frame)
+    expected = create_projector("pca").project(data_frame)
+
+    assert projected.index.equals(data_frame.index)
+    np.testing.assert_allclose(
+        np.abs(projected.to_numpy()), np.abs(expected.to_numpy()), atol=0.05
+    )
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"single_precision": "false"},
+        {"solver": "randomized", "oversamples": "5", "power_iterations": "3"},
+        {"solver": "arpack"},
+        {"solver": "truncated"},
+        {"center": "false", "solver": "arpack"},
+    ],
+)
+def test_pca_solvers_similar(options: dict) -> None:
+    """Tests that each solver produces (up to sign) a similar projection to the default solver.
+
+    Without centering, the data-frame is already (approximately) centered.
+    """
+    data_frame = _create_correlated_data_frame(
+        offset=0 if options.get("center") == "false" else 10
+    )
+
+    projected = create_projector("pca", options).project(data_frame)
+    expected = create_projector("pca").project(data_frame)
+
+    assert projected.index.equals(data_frame.index)
+    np.testing.assert_allclose(
+        np.abs(projected.to_numpy()),
+        np.abs(expected.to_numpy()),
+        atol=0.05 * np.abs(expected.to_numpy()).max(),
+    )
+
+
+def test_pca_uncentered_unsupported_solver() -> None:
+    """Tests that a solver that a truncated SVD does not support is rejected, without centering."""
+    projector = create_projector("pca", {"center": "false", "solver": "full"})
+    with pytest.raises(ValueError):
+        projector.project(_create_correlated_data_frame(offset=0))
+
+
+def _create_correlated_data_frame(offset: float) -> pd.DataFrame:
+    """Creates a data-frame with a few dominant directions of variation, and an offset."""
+    generator = np.random.default_rng(0)
+    latent = generator.standard_normal((500, 2)) * [5, 2]
+    values = latent @ generator.standard_normal((2, 40)) + offset
+    return pd.DataFrame(
+        values + 0.01 * generator.standard_normal(values.shape),
+        index=list(map(str, range(500))),
+    )
+
+
+def test_fft_tsne_pre_reduction() -> None:
+    """Tests that FFT-accelerated t-SNE projects many features to two, preserving row names."""
+    data_frame = pd.DataFrame(np.random.rand(300, 60), index=list(map(str, range(300))))
+
+    projected = create_projector(
+        "FFT-t-SNE", {"pre_reduction_components": "10", "number_jobs": "1"}
+    ).project(data_frame)
+    assert projected.shape == (300, 2)
+    assert list(projected.columns) == ["TSNE0", "TSNE1"]
+    assert projected.index.equals(data_frame.index)
+
+
+def test_umap_options() -> None:
+    """Tests that UMAP projects to the number of components, preserving row names."""
+    data_frame = pd.DataFrame(np.random.rand(200, 10), index=list(map(str, range(200))))
+
+    projected = create_projector(
+        "UMAP", {"number_components": "3", "number_neighbors": "5", "seed": "1"}
+    ).project(data_frame)
+    assert list(projected.columns) == ["UMAP0", "UMAP1", "UMAP2"]
+    assert projected.index.equals(data_frame.index)
+
+
+@pytest.mark.parametrize(
+    "identifier", [identifier for identifier in IDENTIFIERS if identifier != "none"]
+)
+def test_fit_on_sample(identifier: str, tmp_path: pathlib.Path) -> None:
+    """Tests that each projection method can be fitted on a sample, saved, and project all rows."""
+    data_frame = _create_correlated_data_frame(offset=10)
+    path = str(tmp_path / "fitted.pickle")
+
+    sampled = FitOnSample(
+        create_projector(identifier), 200, embeddings.Sampling(seed=0), path
+    )
+    projected = sampled.project(data_frame)
+    assert projected.shape == (500, 2)
+    assert projected.index.equals(data_frame.index)
+    assert np.isfinite(projected.to_numpy()).all()
+
+    # Rows outside the sample are projected identically by the saved projection (together, as
+    # UMAP places the rows projected together, jointly)
+    remaining = np.setdiff1d(
+        np.arange(500), embeddings.Sampling(seed=0).select(np.zeros(500, np.int32), 200)
+    )
+    loaded = LoadedProjection(path).project(data_frame.iloc[remaining])
+    np.testing.assert_allclose(
+        loaded.to_numpy(), projected.to_numpy()[remaining], atol=1e-3, rtol=1e-3
+    )
+
+
+def test_fit_on_sample_keeps_fitted_projection() -> None:
+    """Tests that the sampled rows keep the projection they were fitted with, and only the other
+    rows are projected by the fitted projection."""
+    data_frame = _create_correlated_data_frame(offset=10)
+    transformed = []
+
+    class _Fitted(FittedProjection):
+        def transform(self, features: pd.DataFrame) -> pd.DataFrame:
+            transformed.append(features)
+            return pd.DataFrame(0.0, index=features.index, columns=["A0"])
+
+    class _FittingProjector(Projector):
+        def fit_project(self, features: pd.DataFrame):
+            return _Fitted(), pd.DataFrame(1.0, index=features.index, columns=["A0"])
+
+    projected = FitOnSample(
+        _FittingProjector(), 200, embeddings.Sampling(seed=0)
+    ).project(data_frame)
+    assert projected.index.equals(data_frame.index)
+
+    sample = embeddings.Sampling(seed=0).select(np.zeros(500, np.int32), 200)
+    assert (projected["A0"].to_numpy()[sample] == 1.0).all()
+    assert projected["A0"].sum() == 200
+    assert len(transformed) == 1 and len(transformed[0]) == 300
+    assert not transformed[0].index.isin(data_frame.index[sample]).any()
+
+
+def test_fit_on_stratified_sample() -> None:
+    """Tests that a stratified sample retains rare labels, and PCA fitted on all rows is unchanged."""
+    data_frame = _create_correlated_data_frame(offset=10)
+    label_codes = np.zeros(500, dtype=np.int32)
+    label_codes[:3] = 1
+
+    fitted = []
+
+    class _RecordingProjector(Projector):
+        def fit(self, features: pd.DataFrame):
+            fitted.append(features)
+            return create_projector("pca").fit(features)
+
+    FitOnSample(
+        _RecordingProjector(), 20, embeddings.Sampling(0, "stratified", 3)
+    ).project_labelled(data_frame, label_codes)
+    assert len(fitted[0]) == 20
+    assert fitted[0].index[:3].equals(data_frame.index[:3])
+
+    pca = create_projector("pca")
+    np.testing.assert_allclose(
+        pca.fit(data_frame).transform(data_frame).to_numpy(),
+        pca.project(data_frame).to_numpy(),
+        atol=1e-3,
+    )
+
+
+def test_multiple_projections_concurrently() -> None:
+    """Tests that several projections in parallel match each projection performed separately."""
+    data_frame = _create_correlated_data_frame(offset=10)
+
+    multiple = create_multiple(["pca", "pca:number_components=3", "incremental-pca"], 2)
+    projected = multiple.project(data_frame)
+    assert projected.index.equals(data_frame.index)
+
+    split = split_projections(projected)
+    assert list(split.keys()) == ["pca", "pca:number_components=3", "incremental-pca"]
+    expected = create_projector("pca", {"number_components": "3"}).project(data_frame)
+    np.testing.assert_allclose(
+        np.abs(split["pca:number_components=3"].to_numpy()),
+        np.abs(expected.to_numpy()),
+        atol=0.05 * np.abs(expected.to_numpy()).max(),
+    )
+    assert list(split["incremental-pca"].columns) == ["PCA0", "PCA1"]
+
+    with pytest.raises(ValueError):
+        create_multiple(["pca", "none"])
+
+
+def test_multiple_projections_row_names() -> None:
+    """Tests that each projection in a worker process receives the row names."""
+    data_frame = _create_correlated_data_frame(offset=10).iloc[::-1]
+
+    projected = MultipleProjections(
+        (_RowNameProjector(), _RowNameProjector()), ("a", "b"), 2
+    ).project(data_frame)
+    for name in ["a", "b"]:
+        np.testing.assert_array_equal(
+            projected[name + "/NAME0"].to_numpy(), data_frame.index.astype(float)
+        )
+
+
+def test_multiple_projections_error() -> None:
+    """Tests that an error from a projection in a worker process is reported unchanged."""
+    data_frame = _create_correlated_data_frame(offset=10)
+
+    with pytest.raises(ValueError, match=_FailingProjector.MESSAGE):
+        MultipleProjections(
+            (_FailingProjector(), create_projector("pca")), ("fail", "pca"), 2
+        ).project(data_frame)
+
+
+@pytest.mark.parametrize("identifier", ["t-sne", "fft-t-sne"])
+def test_tsne_perplexity_sweep(identifier: str) -> None:
+    """Tests that t-SNE projects once for each perplexity, reusing the nearest neighbors."""
+    data_frame = _create_correlated_data_frame(offset=10).iloc[:200]
+
+    multiple = create_multiple(
+        [identifier + ":perplexities=5,20,pre_reduction_components=10"]
+    )
+    projection = multiple.projectors[0]
+    assert projection.perplexities == (5, 20)
+    assert projection.pre_reduction_components == 10
+
+    projected = projection.project(data_frame)
+    assert projected.index.equals(data_frame.index)
+
+    split = split_projections(projected)
+    assert list(split.keys()) == ["perplexity=5", "perplexity=20"]
+    assert all(list(layout.columns) == ["TSNE0", "TSNE1"] for layout in split.values())
+    assert not np.allclose(
+        split["perplexity=5"].to_numpy(), split["perplexity=20"].to_numpy()
+    )
+
+    with pytest.raises(ValueError):
+        projection.fit(data_frame)
+
+
+def test_tsne_perplexity_sweep_workers() -> None:
+    """Tests that several projections share the worker processes, and repeated perplexities are rejected."""
+    multiple = create_multiple(
+        ["t-sne:perplexities=5,20", "t-sne:perplexity=5,number_workers=3"],
+        number_workers=4,
+    )
+    assert [projection.number_workers for projection in multiple.projectors] == [2, 3]
+
+    with pytest.raises(ValueError):
+        create_projector("t-sne", {"perplexities": "5,20,5"})
+
+
+@pytest.mark.parametrize("identifier", ["t-sne", "fft-t-sne"])
+@pytest.mark.parametrize("relax_previous", ["false", "true"])
+def test_tsne_from_previous_layout(
+    identifier: str, relax_previous: str, tmp_path: pathlib.Path
+) -> None:
+    """Tests that t-SNE places appended rows into a previous projection, keeping it stable."""
+    data_frame = _create_correlated_data_frame(offset=10).iloc[:300]
+    projection = create_projector(
+        identifier,
+        {
+            "previous_layout": str(tmp_path / "layout.csv"),
+            "relax_previous": relax_previous,
+        },
+    )
+
+    first = projection.project(data_frame.iloc[:250])
+    second = projection.project(data_frame)
+    assert second.index.equals(data_frame.index)
+    assert np.isfinite(second.to_numpy()).all()
+
+    if relax_previous == "false":
+        np.testing.assert_allclose(second.to_numpy()[:250], first.to_numpy())
+    else:
+        spread = np.ptp(first.to_numpy(), axis=0).max()
+        moved = np.linalg.norm(second.to_numpy()[:250] - first.to_numpy(), axis=1)
+        assert np.median(moved) < 0.1 * spread
+
+    # The projection is written for the next time
+    written = pd.read_csv(tmp_path / "layout.csv", index_col=0)
+    np.testing.assert_allclose(written.to_numpy(), second.to_numpy(), rtol=1e-5)
+
+
+@pytest.mark.parametrize("identifier", ["t-sne", "fft-t-sne"])
+def test_tsne_optimizes_new_rows(identifier: str, tmp_path: pathlib.Path) -> None:
+    """Tests that t-SNE optimizes appended rows from where they are first placed, and not only
+    places them near their nearest previous rows."""
+    data_frame = _create_correlated_data_frame(offset=10).iloc[:300]
+    projection = create_projector(
+        identifier, {"previous_layout": str(tmp_path / "layout.csv")}
+    )
+
+    first = projection.project(data_frame.iloc[:250]).to_numpy()
+    second = projection.project(data_frame).to_numpy()
+
+    previous = np.arange(300) < 250
+    positions = np.full((300, 2), np.nan)
+    positions[previous] = first
+    interpolated = _interpolate_new(data_frame.to_numpy(), positions, previous)
+
+    moved = np.linalg.norm(second[~previous] - interpolated[~previous], axis=1)
+    assert np.median(moved) > 0.1
+    assert np.median(moved) < 0.1 * np.ptp(first, axis=0).max()
+
+
+class _RowNameProjector(Projector):
+    """Projects each row to its name (as a number), to check the row names a projection receives."""
+
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(
+            {"NAME0": features.index.astype(float)}, index=features.index
+        )
+
+
+class _FailingProjector(Projector):
+    """Raises an error, while referring to the feature-values."""
+
+    MESSAGE = "A projection failed"
+
+    def project(self, features: pd.DataFrame) -> pd.DataFrame:
+        matrix = features.to_numpy()  # noqa: F841
+        raise ValueError(self.MESSAGE)
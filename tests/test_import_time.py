@@ -0,0 +1,74 @@
+"""Tests that :mod:`visualize_features` starts quickly, importing heavy backends only when selected."""
+import subprocess
+import sys
+import time
+from typing import List
+
+_BUDGET_SECONDS: float = 1.0
+"""The maximum time for :code:`--help` to run, including starting the interpreter."""
+
+_NUMBER_REPEATS: int = 5
+"""The number of times :code:`--help` is run, taking the fastest, to reduce noise."""
+
+_HEAVY_MODULES: List[str] = [
+    "cv2",
+    "matplotlib",
+    "openTSNE",
+    "plotly",
+    "scipy",
+    "seaborn",
+    "sklearn",
+    "tensorflow",
+    "umap",
+]
+"""Top-level modules that should not be imported, unless a method that uses them is selected."""
+
+
+def test_help_within_budget() -> None:
+    """Tests that :code:`--help` completes within the budget."""
+    # A first run compiles any modules
+    _run_help()
+
+    assert _fastest_help() < _BUDGET_SECONDS
+
+
+def test_help_imports_no_heavy_modules() -> None:
+    """Tests that :code:`--help` imports none of the heavy modules."""
+    code = (
+        "import runpy, sys\n"
+        "sys.argv = ['visualize_features', '--help']\n"
+        "try:\n"
+        "    runpy.run_module('anchor_python_visualization.visualize_features', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(' '.join(sorted({name.split('.')[0] for name in sys.modules})))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    imported = completed.stdout.splitlines()[-1].split()
+    assert not set(_HEAVY_MODULES).intersection(imported)
+
+
+def _fastest_help() -> float:
+    """The fastest time, in seconds, to run :code:`--help`, over several repeats."""
+    times = []
+    for _ in range(_NUMBER_REPEATS):
+        start = time.perf_counter()
+        _run_help()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _run_help() -> None:
+    """Runs :code:`visualize_features --help` in a separate interpreter."""
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "anchor_python_visualization.visualize_features",
+            "--help",
+        ],
+        capture_output=True,
+        check=True,
+    )
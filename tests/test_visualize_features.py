@@ -9,9 +9,7 @@ from anchor_python_utilities import file, fixture
 from anchor_python_visualization import visualize_features
 
 _EXPECTED_TENSORBOARD_FILES: List[str] = [
-    "checkpoint",
-    "embeddings.ckpt-1.data-00000-of-00001",
-    "embeddings.ckpt-1.index",
+    "embedding.bytes",
     "metadata.tsv",
     "projector_config.pbtxt",
 ]
@@ -36,6 +34,22 @@ def test_tensorboard_tsne_with_output_directory(tmp_path: pathlib.Path) -> None:
     _assert_tensorboard_files_exist(tmp_path)
 
 
+def test_tensorboard_multiple_projections(tmp_path: pathlib.Path) -> None:
+    """Tests writing TensorBoard files with several projection methods in parallel."""
+    _call_wth_features_and_output_path(
+        tmp_path, ["-m", "tensorboard", "-pm", "pca", "t-sne:perplexity=5"]
+    )
+    _assert_tensorboard_files_exist(
+        tmp_path,
+        [
+            "pca.bytes",
+            "t_sne_perplexity_5.bytes",
+            "metadata.tsv",
+            "projector_config.pbtxt",
+        ],
+    )
+
+
 def _call_wth_features_and_output_path(
     tmp_path: pathlib.Path, arguments_additional: List[str]
 ) -> None:
@@ -52,8 +66,10 @@ def _call_wth_features(arguments_additional: List[str]) -> None:
     fixture.call_with_arguments(visualize_features, [filename, *arguments_additional])
 
 
-def _assert_tensorboard_files_exist(tmp_path: pathlib.Path) -> None:
+def _assert_tensorboard_files_exist(
+    tmp_path: pathlib.Path, expected_files: List[str] = _EXPECTED_TENSORBOARD_FILES
+) -> None:
     """Asserts particular files have been created as expected for TensorBoard output."""
-    for tensorboard_file in _EXPECTED_TENSORBOARD_FILES:
+    for tensorboard_file in expected_files:
         path = pathlib.Path(os.path.join(tmp_path, tensorboard_file))
         assert path.is_file()
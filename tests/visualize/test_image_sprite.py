@@ -0,0 +1,122 @@
+"""Tests :mod:`_image_sprite`."""
+import pathlib
+
+import cv2
+import numpy as np
+import pandas as pd
+import pytest
+
+from anchor_python_visualization.visualize import _image_sprite
+from anchor_python_visualization.visualize._image_sprite import (
+    _decode_flags,
+    create_sprite_at,
+)
+
+_SIZE_IN_SPRITE = (8, 8)
+"""The size of each image in the sprite."""
+
+
+def test_sprite_in_order_with_empty_thumbnail_on_error(tmp_path: pathlib.Path) -> None:
+    """Tests that images are tiled in order (with several threads), and a missing image is empty."""
+    intensities = [10, 20, 30, 40, 50]
+    paths = [_write_image(tmp_path, intensity) for intensity in intensities]
+    paths.insert(2, str(tmp_path / "missing.png"))
+
+    sprite_path = str(tmp_path / "sprite.png")
+    create_sprite_at(pd.Series(paths), sprite_path, _SIZE_IN_SPRITE, number_workers=3)
+
+    sprite = cv2.imread(sprite_path)
+    assert sprite.shape == (24, 24, 3)
+
+    # Tiled left->right, then top->down, with two unused tiles at the end
+    expected = intensities[:2] + [0] + intensities[2:] + [0, 0]
+    for index, intensity in enumerate(expected):
+        row, column = divmod(index, 3)
+        tile = sprite[row * 8 : (row + 1) * 8, column * 8 : (column + 1) * 8]
+        assert np.all(tile == intensity)
+
+
+def test_sprite_with_mixed_channels(tmp_path: pathlib.Path) -> None:
+    """Tests that grayscale, BGR and BGRA images are each converted to BGR in the sprite."""
+    paths = [
+        _write_image(tmp_path, 10, 1),
+        _write_image(tmp_path, 20, 3),
+        _write_image(tmp_path, 30, 4),
+    ]
+
+    sprite_path = str(tmp_path / "sprite.png")
+    create_sprite_at(pd.Series(paths), sprite_path, _SIZE_IN_SPRITE)
+
+    sprite = cv2.imread(sprite_path, cv2.IMREAD_UNCHANGED)
+    assert sprite.shape == (16, 16, 3)
+    np.testing.assert_array_equal(sprite[:8, :8], 10)
+    np.testing.assert_array_equal(sprite[:8, 8:], 20)
+    np.testing.assert_array_equal(sprite[8:, :8], 30)
+    np.testing.assert_array_equal(sprite[8:, 8:], 0)
+
+
+def test_sprite_with_unusual_channels(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that a grayscale image with alpha is converted to BGR, and an image with an unsupported
+    number of channels is left empty, rather than failing the sprite."""
+    images = {
+        "gray_alpha": np.dstack(
+            [np.full((20, 30), 10, np.uint8), np.full((20, 30), 200, np.uint8)]
+        ),
+        "five_channels": np.full((20, 30, 5), 20, np.uint8),
+    }
+    monkeypatch.setattr(
+        _image_sprite, "_read_with_unicode_path", lambda path, size: images[path]
+    )
+
+    sprite_path = str(tmp_path / "sprite.png")
+    create_sprite_at(pd.Series(list(images.keys())), sprite_path, _SIZE_IN_SPRITE)
+
+    sprite = cv2.imread(sprite_path, cv2.IMREAD_UNCHANGED)
+    assert sprite.shape == (16, 16, 3)
+    np.testing.assert_array_equal(sprite[:8, :8], 10)
+    np.testing.assert_array_equal(sprite[:8, 8:], 0)
+
+
+def test_sprite_with_16_bit_image(tmp_path: pathlib.Path) -> None:
+    """Tests that a 16-bit image is converted to 8-bit, rather than its intensities wrapping."""
+    path = str(tmp_path / "image_16_bit.png")
+    cv2.imwrite(path, np.full((20, 30), 1000, np.uint16))
+
+    sprite_path = str(tmp_path / "sprite.png")
+    create_sprite_at(pd.Series([path]), sprite_path, _SIZE_IN_SPRITE)
+
+    sprite = cv2.imread(sprite_path, cv2.IMREAD_UNCHANGED)
+    assert sprite.dtype == np.uint8
+    np.testing.assert_array_equal(sprite, 1000 >> 8)
+
+
+def test_jpeg_decoded_at_reduced_resolution(tmp_path: pathlib.Path) -> None:
+    """Tests that a large JPEG is decoded at reduced resolution, giving a similar thumbnail."""
+    path = str(tmp_path / "large.jpg")
+    gradient = np.linspace(0, 255, 600, dtype=np.uint8)
+    cv2.imwrite(path, np.tile(gradient[np.newaxis, :, np.newaxis], (400, 1, 3)))
+
+    # An eighth of the width is 75 pixels, and of the height 50, so only a quarter is large enough
+    data = np.fromfile(path, dtype=np.uint8)
+    assert _decode_flags(data, (64, 64)) == (
+        cv2.IMREAD_REDUCED_COLOR_4 | cv2.IMREAD_IGNORE_ORIENTATION
+    )
+    assert _decode_flags(data, (400, 400)) == cv2.IMREAD_UNCHANGED
+
+    sprite_path = str(tmp_path / "sprite.png")
+    create_sprite_at(pd.Series([path]), sprite_path, _SIZE_IN_SPRITE)
+
+    expected = cv2.resize(cv2.imread(path), _SIZE_IN_SPRITE)
+    np.testing.assert_allclose(cv2.imread(sprite_path), expected, atol=4)
+
+
+def _write_image(
+    directory: pathlib.Path, intensity: int, number_channels: int = 3
+) -> str:
+    """Writes a larger image, with identical intensity in every pixel and channel."""
+    path = str(directory / "image_{}.png".format(intensity))
+    shape = (20, 30, number_channels) if number_channels > 1 else (20, 30)
+    cv2.imwrite(path, np.full(shape, intensity, np.uint8))
+    return path